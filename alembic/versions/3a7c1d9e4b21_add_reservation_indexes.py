@@ -0,0 +1,45 @@
+"""add reservation indexes
+
+Revision ID: 3a7c1d9e4b21
+Revises: def5df1c00be
+Create Date: 2026-10-18 09:12:04.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c1d9e4b21'
+down_revision: Union[str, Sequence[str], None] = 'def5df1c00be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_STATUSES = "status IN ('PENDING', 'CONFIRMED', 'CHECKED_IN')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservations_status_start_time', 'reservations', ['status', 'start_time'], unique=False)
+    op.create_index(
+        'ix_reservations_table_id_start_time', 'reservations', ['table_id', 'start_time'], unique=False,
+        postgresql_where=sa.text('table_id IS NOT NULL'),
+        sqlite_where=sa.text('table_id IS NOT NULL'),
+    )
+    op.create_index('ix_reservations_customer_id', 'reservations', ['customer_id'], unique=False)
+    op.create_index(
+        'ix_reservations_active_start_time', 'reservations', ['start_time'], unique=False,
+        postgresql_where=sa.text(ACTIVE_STATUSES),
+        sqlite_where=sa.text(ACTIVE_STATUSES),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_active_start_time', table_name='reservations')
+    op.drop_index('ix_reservations_customer_id', table_name='reservations')
+    op.drop_index('ix_reservations_table_id_start_time', table_name='reservations')
+    op.drop_index('ix_reservations_status_start_time', table_name='reservations')
@@ -0,0 +1,45 @@
+"""add table overlap exclusion constraint
+
+Revision ID: 5c9d2e7f1a40
+Revises: 8e2f4b6a0c13
+Create Date: 2026-10-18 11:26:09.802114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9d2e7f1a40'
+down_revision: Union[str, Sequence[str], None] = '8e2f4b6a0c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres only: refuse two live bookings of the same table whose
+    # [start_time, start_time + duration) ranges overlap. Other backends rely on
+    # the in-process availability index. Existing overlapping rows must be
+    # cleaned up before this runs.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        """
+        ALTER TABLE reservations ADD CONSTRAINT reservations_no_table_overlap
+        EXCLUDE USING gist (
+            table_id WITH =,
+            tsrange(start_time, start_time + duration_minutes * interval '1 minute') WITH &&
+        )
+        WHERE (table_id IS NOT NULL AND status NOT IN ('CANCELLED', 'NO_SHOW'))
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE reservations DROP CONSTRAINT IF EXISTS reservations_no_table_overlap')
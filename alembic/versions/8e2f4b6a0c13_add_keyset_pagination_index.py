@@ -0,0 +1,27 @@
+"""add keyset pagination index
+
+Revision ID: 8e2f4b6a0c13
+Revises: 3a7c1d9e4b21
+Create Date: 2026-10-18 10:03:47.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f4b6a0c13'
+down_revision: Union[str, Sequence[str], None] = '3a7c1d9e4b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservations_start_time_id', 'reservations', ['start_time', 'reservation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_start_time_id', table_name='reservations')
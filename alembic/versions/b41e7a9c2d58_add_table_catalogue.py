@@ -0,0 +1,46 @@
+"""add table catalogue and party size
+
+Revision ID: b41e7a9c2d58
+Revises: 5c9d2e7f1a40
+Create Date: 2026-10-18 13:05:51.270433
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7a9c2d58'
+down_revision: Union[str, Sequence[str], None] = '5c9d2e7f1a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservations', sa.Column('party_size', sa.Integer(), nullable=True))
+    op.create_table('restaurant_tables',
+    sa.Column('table_id', sa.UUID(), nullable=False),
+    sa.Column('label', sa.String(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('area', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('table_id'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('reservation_tables',
+    sa.Column('reservation_id', sa.UUID(), nullable=False),
+    sa.Column('table_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.reservation_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('reservation_id', 'table_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reservation_tables')
+    op.drop_table('restaurant_tables')
+    op.drop_column('reservations', 'party_size')
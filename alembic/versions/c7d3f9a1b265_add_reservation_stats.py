@@ -0,0 +1,73 @@
+"""add reservation stats summary tables
+
+Revision ID: c7d3f9a1b265
+Revises: b41e7a9c2d58
+Create Date: 2026-10-18 14:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.infrastructure.orm_models import stats_trigger_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3f9a1b265'
+down_revision: Union[str, Sequence[str], None] = 'b41e7a9c2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reservation_stats',
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('reservation_count', sa.BigInteger(), nullable=False),
+    sa.Column('revenue', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('status')
+    )
+    op.create_table('reservation_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('area', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('reservation_count', sa.BigInteger(), nullable=False),
+    sa.Column('revenue', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'area', 'status')
+    )
+
+    dialect = op.get_bind().dialect.name
+    # triggers first, under a lock, so no write slips in between backfill and trigger
+    if dialect == 'postgresql':
+        op.execute('LOCK TABLE reservations IN SHARE MODE')
+    for statement in stats_trigger_ddl(dialect):
+        op.execute(statement)
+
+    day = "start_time::date" if dialect == 'postgresql' else "date(start_time)"
+    op.execute(
+        f"""
+        INSERT INTO reservation_daily_stats (day, area, status, reservation_count, revenue)
+        SELECT {day}, COALESCE(table_area, ''), status, count(*), COALESCE(sum(payment_amount), 0)
+        FROM reservations GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO reservation_stats (status, reservation_count, revenue)
+        SELECT status, sum(reservation_count), sum(revenue) FROM reservation_daily_stats GROUP BY status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for name in ('reservation_stats_on_insert', 'reservation_stats_on_update', 'reservation_stats_on_delete'):
+        if postgres:
+            op.execute(f'DROP TRIGGER IF EXISTS {name} ON reservations')
+            op.execute(f'DROP FUNCTION IF EXISTS {name}()')
+        else:
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_table('reservation_daily_stats')
+    op.drop_table('reservation_stats')
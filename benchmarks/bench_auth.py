@@ -0,0 +1,46 @@
+"""Per-request cost of get_current_user's token check with and without the decoded-token cache.
+
+    python -m benchmarks.bench_auth --requests 2000 --repeat 5
+    JWT_BACKEND=pyjwt python -m benchmarks.bench_auth
+"""
+import argparse
+import json
+import os
+import time
+from datetime import timedelta
+
+from src.core.security import ALGORITHM, SECRET_KEY, create_access_token
+from src.core.tokens import TokenVerifier, build_backend
+
+
+def best_of(fn, token, requests, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(requests):
+            fn(token)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    token = create_access_token(data={"sub": "bench"}, expires_delta=timedelta(minutes=5))
+    backend = build_backend(SECRET_KEY, [ALGORITHM])
+    verifier = TokenVerifier(backend)
+    verifier.verify(token)
+
+    report = {"backend": os.getenv("JWT_BACKEND", "jose")}
+    for name, fn in (("decode", backend.decode), ("cached", verifier.verify)):
+        seconds = best_of(fn, token, args.requests, args.repeat)
+        report[name] = {"us_per_request": round(seconds / args.requests * 1e6, 2)}
+    report["speedup"] = round(report["decode"]["us_per_request"] / report["cached"]["us_per_request"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
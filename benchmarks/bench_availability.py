@@ -0,0 +1,88 @@
+"""Free-slot search over 500 tables and a year of bookings: interval index vs linear scan.
+
+    python -m benchmarks.bench_availability --tables 500 --days 365 --per-day 4
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.domain.availability import AvailabilityIndex
+
+
+def bookings(tables, days, per_day, seed=7):
+    rng = random.Random(seed)
+    first_day = datetime(2025, 1, 1)
+    for table_id in tables:
+        for day in range(days):
+            opening = first_day + timedelta(days=day, hours=11)
+            # per_day bookings spread over the day, 90-150 minutes each
+            for slot in range(per_day):
+                start = opening + timedelta(minutes=slot * 180 + rng.choice((0, 15, 30)))
+                yield uuid.uuid4(), table_id, start, start + timedelta(minutes=rng.choice((90, 120, 150)))
+
+
+def linear_free_slots(rows, tables, start, end, min_length):
+    # what a table scan would do: look at every booking, then sweep per table
+    busy = {t: [] for t in tables}
+    for _, table_id, s, e in rows:
+        if s < end and e > start:
+            busy[table_id].append((s, e))
+    result = {}
+    for table_id, intervals in busy.items():
+        gaps, cursor = [], start
+        for s, e in sorted(intervals):
+            if s - cursor >= min_length:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+        if end - cursor >= min_length:
+            gaps.append((cursor, end))
+        result[table_id] = gaps
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    tables = [uuid.uuid4() for _ in range(args.tables)]
+    rows = list(bookings(tables, args.days, args.per_day))
+
+    index = AvailabilityIndex()
+    t0 = time.perf_counter()
+    index.load((rid, table_id, "Indoor", s, e) for rid, table_id, s, e in rows)
+    load_s = time.perf_counter() - t0
+
+    rng = random.Random(1)
+    dates = [datetime(2025, 1, 1) + timedelta(days=rng.randrange(args.days)) for _ in range(args.queries)]
+    min_length = timedelta(minutes=90)
+
+    t0 = time.perf_counter()
+    for day in dates:
+        fast = index.free_slots(day + timedelta(hours=10), day + timedelta(hours=23), min_length)
+    index_ms = (time.perf_counter() - t0) / len(dates) * 1000
+
+    linear_queries = dates[:5]
+    t0 = time.perf_counter()
+    for day in linear_queries:
+        slow = linear_free_slots(rows, tables, day + timedelta(hours=10), day + timedelta(hours=23), min_length)
+    linear_ms = (time.perf_counter() - t0) / len(linear_queries) * 1000
+
+    assert fast == linear_free_slots(rows, tables, dates[-1] + timedelta(hours=10), dates[-1] + timedelta(hours=23), min_length)
+    print(json.dumps({
+        "tables": args.tables,
+        "bookings": len(rows),
+        "index_load_s": round(load_s, 2),
+        "free_slots_per_date_ms": {"index": round(index_ms, 3), "linear_scan": round(linear_ms, 3)},
+        "free_slots_found": sum(len(v) for v in slow.values()) > 0,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
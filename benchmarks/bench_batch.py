@@ -0,0 +1,78 @@
+"""Throughput of the batch endpoints vs looping over the single-item endpoints.
+
+    python -m benchmarks.bench_batch --sizes 1000,10000,100000
+
+Looping 100k single requests takes a long time, so the loop is timed on at
+most --loop-cap items per size and reported as items/sec ("loop_sampled").
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from src.api.routes import router
+from benchmarks.common import build_app, fresh_database
+
+
+def payload(i: int) -> dict:
+    return {
+        "customer_id": "6f1c2f4e-8a55-4c53-9a3f-0f5b1f4f0c%02d" % (i % 100),
+        "contact_info": {"name": f"Guest {i}", "phone": "0812345", "email": f"guest{i}@test.com"},
+        "start_time": "2025-12-31T19:00:00",
+        "duration_minutes": 90,
+    }
+
+
+async def run_size(app, size: int, loop_cap: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        t0 = time.perf_counter()
+        response = await client.post("/api/reservations:batch", json={"items": [payload(i) for i in range(size)]})
+        batch_create = time.perf_counter() - t0
+        ids = [r["reservation_id"] for r in response.json()["results"]]
+
+        t0 = time.perf_counter()
+        await client.post("/api/reservations/transitions:batch",
+                          json={"items": [{"reservation_id": rid, "action": "confirm"} for rid in ids]})
+        batch_confirm = time.perf_counter() - t0
+
+        sampled = min(size, loop_cap)
+        t0 = time.perf_counter()
+        loop_ids = []
+        for i in range(sampled):
+            loop_ids.append((await client.post("/api/reservations", json=payload(i))).json()["reservation_id"])
+        loop_create = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for rid in loop_ids:
+            await client.post(f"/api/reservations/{rid}/confirm")
+        loop_confirm = time.perf_counter() - t0
+
+    return {
+        "items": size,
+        "loop_sampled": sampled,
+        "create_items_per_s": {"batch": round(size / batch_create), "loop": round(sampled / loop_create)},
+        "confirm_items_per_s": {"batch": round(size / batch_confirm), "loop": round(sampled / loop_confirm)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_batch.db')}")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--loop-cap", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        fresh_database(args.url).dispose()
+        results.append(asyncio.run(run_size(build_app(router, args.url), size, args.loop_cap)))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
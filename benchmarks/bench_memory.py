@@ -0,0 +1,74 @@
+"""Bytes per reservation held in memory by the allocation path.
+
+    python -m benchmarks.bench_memory --rows 1000000
+
+Builds what allocate_evening keeps alive per pending reservation: the
+hydrated aggregate (ReservationRepository.hydrate), its BookingRequest, and
+its entry in the availability index. Measured with tracemalloc; the column
+values themselves (UUIDs, datetimes, strings) are created up front and not
+counted, since every representation shares them.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections import namedtuple
+
+from src.domain.allocation import BookingRequest
+from src.domain.availability import AvailabilityIndex
+from src.infrastructure.availability import booking_end
+from src.infrastructure.repository import ReservationRepository
+from benchmarks.common import reservation_rows
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = build()
+    seconds = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    first = next(reservation_rows(1))
+    Row = namedtuple("Row", [*first, "party_size"])
+    rows = [Row(party_size=4, **values) for values in reservation_rows(args.rows)]
+
+    aggregates, aggregate_bytes, aggregate_s = measure(lambda: ReservationRepository(None).hydrate(rows))
+    bookings, booking_bytes, _ = measure(lambda: [
+        BookingRequest(r.reservation_id, r.party_size, r.reservation_time.start_time,
+                       booking_end(r.reservation_time.start_time, r.reservation_time.duration_minutes))
+        for r in aggregates
+    ])
+
+    def build_index():
+        index = AvailabilityIndex()
+        index.load((b.reservation_id, row.table_id, row.table_area, b.start, b.end)
+                   for b, row in zip(bookings, rows) if row.table_id is not None)
+        return index
+    _, index_bytes, _ = measure(build_index)
+
+    per_row = {
+        "aggregate": round(aggregate_bytes / args.rows),
+        "booking_request": round(booking_bytes / args.rows),
+        "availability_index": round(index_bytes / args.rows),
+    }
+    per_row["total"] = sum(per_row.values())
+    print(json.dumps({
+        "rows": args.rows,
+        "bytes_per_reservation": per_row,
+        "total_mb": round(per_row["total"] * args.rows / 2**20, 1),
+        "hydrate_us_per_row": round(aggregate_s / args.rows * 1e6, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
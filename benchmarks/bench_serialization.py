@@ -0,0 +1,55 @@
+"""Per-row cost of turning reservation rows into response JSON.
+
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 5
+
+Compares the old path (build a ReservationResponse, let pydantic dump it)
+against plain dicts rendered by orjson with one shared meta per response.
+"""
+import argparse
+import json
+import time
+from types import SimpleNamespace
+
+import orjson
+
+from src.api.serialization import reservation_dict, reservation_dicts, response_meta
+from src.schemas.reservation import ReservationResponse
+from benchmarks.common import reservation_rows
+
+
+def pydantic_path(rows):
+    meta = response_meta()
+    items = [ReservationResponse.model_validate(reservation_dict(r, meta)) for r in rows]
+    return b"[" + b",".join(item.model_dump_json().encode() for item in items) + b"]"
+
+
+def orjson_path(rows):
+    return orjson.dumps(reservation_dicts(rows))
+
+
+def best_of(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = [SimpleNamespace(party_size=4, **values) for values in reservation_rows(args.rows)]
+    report = {}
+    for name, fn in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+        seconds = best_of(fn, rows, args.repeat)
+        report[name] = {"us_per_row": round(seconds / args.rows * 1e6, 2), "rows_per_s": round(args.rows / seconds)}
+    report["speedup"] = round(report["pydantic"]["us_per_row"] / report["orjson"]["us_per_row"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
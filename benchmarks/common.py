@@ -0,0 +1,200 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.core.security import get_current_user
+from src.infrastructure.database import Base, get_db, get_async_db, to_async_url
+from src.infrastructure.orm_models import ReservationORM
+
+
+def reservation_rows(n: int, start: datetime = datetime(2025, 1, 1, 10, 0),
+                     tables: int = 50, customers: int = 0, seed: int = 42):
+    """Deterministic rows, about four bookings per customer; non-pending ones get a table."""
+    rng = random.Random(seed)
+    statuses = ["PENDING", "CONFIRMED", "CHECKED_IN", "COMPLETED", "CANCELLED"]
+    areas = ["Indoor", "Outdoor", "VIP"]
+    table_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(tables)]
+    customer_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(customers or max(1, n // 4))]
+    for i in range(n):
+        status = statuses[i % len(statuses)]
+        seated = status != "PENDING"
+        table = rng.randrange(tables) if seated else None
+        yield {
+            "reservation_id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "customer_id": customer_ids[rng.randrange(len(customer_ids))],
+            "status": status,
+            "start_time": start + timedelta(minutes=30 * i),
+            "duration_minutes": 90,
+            "contact_name": f"Guest {i}",
+            "contact_phone": "0812345",
+            "contact_email": f"guest{i}@test.com",
+            "table_id": table_ids[table] if seated else None,
+            "table_area": areas[table % len(areas)] if seated else None,
+            "payment_status": "UNPAID",
+            "payment_amount": 0,
+        }
+
+
+# Relative booking weight per weekday (Monday first) and per seating slot.
+WEEKDAY_WEIGHTS = (0.7, 0.7, 0.8, 0.9, 1.5, 1.8, 1.2)
+LUNCH_SLOTS = [(h, m) for h in range(11, 14) for m in (0, 15, 30, 45)]
+DINNER_SLOTS = [(h, m) for h in range(17, 22) for m in (0, 15, 30, 45)]
+DINNER_PEAK = 19
+PARTY_SIZES = ((1, 5), (2, 45), (3, 12), (4, 22), (5, 5), (6, 7), (8, 4))
+
+
+def spread_rows(n: int, today: datetime = datetime(2025, 6, 1), days_back: int = 60, days_ahead: int = 30,
+                tables: int = 50, seed: int = 42):
+    """Deterministic rows spread like real bookings around `today`.
+
+    Days are weighted towards the weekend, times fall into lunch and dinner
+    seatings peaking at 19:00, and party sizes are mostly twos and fours.
+    Past bookings are completed or cancelled and seated; upcoming ones are
+    pending or confirmed, and only the confirmed ones have a table.
+    """
+    rng = random.Random(seed)
+    areas = ["Indoor", "Outdoor", "VIP"]
+    table_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(tables)]
+    customer_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(max(1, n // 4))]
+    first_day = today - timedelta(days=days_back)
+    days = [first_day + timedelta(days=d) for d in range(days_back + days_ahead)]
+    day_weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in days]
+    dinner_weights = [1.0 / (1 + abs(h + m / 60 - DINNER_PEAK)) for h, m in DINNER_SLOTS]
+    sizes, size_weights = zip(*PARTY_SIZES)
+
+    for i in range(n):
+        day = rng.choices(days, day_weights)[0]
+        if rng.random() < 0.3:
+            hour, minute = rng.choice(LUNCH_SLOTS)
+        else:
+            hour, minute = rng.choices(DINNER_SLOTS, dinner_weights)[0]
+        start = day.replace(hour=hour, minute=minute)
+        party = rng.choices(sizes, size_weights)[0]
+        if start < today:
+            status = "CANCELLED" if rng.random() < 0.12 else "COMPLETED"
+        else:
+            status = "PENDING" if rng.random() < 0.4 else "CONFIRMED"
+        seated = status in ("COMPLETED", "CONFIRMED")
+        table = rng.randrange(tables)
+        yield {
+            "reservation_id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "customer_id": customer_ids[rng.randrange(len(customer_ids))],
+            "status": status,
+            "start_time": start,
+            "duration_minutes": 90 if party <= 4 else 120,
+            "party_size": party,
+            "contact_name": f"Guest {i}",
+            "contact_phone": "0812345",
+            "contact_email": f"guest{i}@test.com",
+            "table_id": table_ids[table] if seated else None,
+            "table_area": areas[table % len(areas)] if seated else None,
+            "payment_status": "PAID" if status == "COMPLETED" else "UNPAID",
+            "payment_amount": 150_000 * party if status == "COMPLETED" else 0,
+        }
+
+
+def insert_rows(conn, rows: Iterable[dict], chunk: int = 10_000) -> int:
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk:
+            conn.execute(insert(ReservationORM), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(insert(ReservationORM), batch)
+        count += len(batch)
+    return count
+
+
+def fresh_database(url: str, rows: int = 0, chunk: int = 10_000, generator=reservation_rows):
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        insert_rows(conn, generator(rows), chunk)
+    return engine
+
+
+def build_app(router: APIRouter, url: str, use_async: bool = False) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: "bench"
+
+    if use_async:
+        async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+        AsyncBenchSession = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with AsyncBenchSession() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+    else:
+        BenchSession = sessionmaker(autocommit=False, autoflush=False, bind=create_engine(url))
+
+        def override_get_db():
+            db = BenchSession()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def hammer(app: FastAPI, make_request: Callable[[httpx.AsyncClient, int], "asyncio.Future"],
+                 total: int, concurrency: int, raise_errors: bool = True) -> dict:
+    """Fire `total` requests with at most `concurrency` in flight; return latency summary.
+
+    With raise_errors=False a non-2xx response is counted in "errors" instead of aborting the run.
+    """
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await make_request(client, i)
+                latencies.append(time.perf_counter() - t0)
+                if raise_errors:
+                    response.raise_for_status()
+                elif response.is_error:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "errors": errors,
+    }
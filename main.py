@@ -1,9 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 import uvicorn
-from src.api.routes import router as reservation_router
+from src.infrastructure.database import ASYNC_DATABASE_ENABLED
 from src.api.auth import router as auth_router
+from src.api.admin import router as admin_router
+from src.api.imports import router as import_router
+from src.api.metrics import router as metrics_router, InstrumentationMiddleware
+from src.infrastructure.outbox import outbox_dispatcher, OUTBOX_DISPATCHER_ENABLED
+from src.infrastructure.users import load_revoked_tokens
+from src.core.revocation import revoked_tokens
+
+if ASYNC_DATABASE_ENABLED:
+    from src.api.async_routes import router as reservation_router, table_router
+else:
+    from src.api.routes import router as reservation_router
+    from src.api.tables import router as table_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # access tokens revoked through other workers, read from the revoked_tokens table
+    revoked_tokens.loader = load_revoked_tokens
+    # domain events are published off the request path (see src/infrastructure/outbox.py)
+    if OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+    yield
+    await outbox_dispatcher.stop()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Restaurant Reservation System",
     description="API implementation for II3160 Teknologi Sistem Terintegrasi",
     version="1.0.0"
@@ -11,6 +36,14 @@ app = FastAPI(
 
 app.include_router(auth_router, prefix="/api", tags=["Authentication"])
 app.include_router(reservation_router, prefix="/api", tags=["Reservations"])
+app.include_router(table_router, prefix="/api", tags=["Tables"])
+# always sync: COPY needs psycopg2, and a long import should not run on the event loop
+app.include_router(import_router, prefix="/api", tags=["Reservations"])
+app.include_router(admin_router, prefix="/api", tags=["Admin"])
+# unprefixed and unauthenticated, where Prometheus scrapes by default
+app.include_router(metrics_router)
+
+app.add_middleware(InstrumentationMiddleware)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
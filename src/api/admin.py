@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.infrastructure import database
+from src.infrastructure.cache import read_cache, invalidate_reservations
+from src.infrastructure import stats
+from src.infrastructure.outbox import outbox_dispatcher, outbox_counts
+from src.infrastructure.idempotency import idempotency_store, purge_expired
+from src.infrastructure.singleflight import read_flights
+from src.core.security import get_current_admin, token_verifier
+from src.core.password_pool import password_pool
+from src.api.metrics import InstrumentedRoute
+
+# admin role only, for every endpoint below: metrics, and writes that lock or purge tables
+router = APIRouter(route_class=InstrumentedRoute, dependencies=[Depends(get_current_admin)])
+
+@router.get("/admin/pool")
+def get_pool_metrics():
+    data = {"sync": database.pool_metrics.snapshot(database.engine.pool)}
+    if database.async_engine is not None:
+        data["async"] = database.async_pool_metrics.snapshot(database.async_engine.sync_engine.pool)
+    return data
+
+@router.get("/admin/cache")
+def get_cache_metrics():
+    return read_cache.snapshot()
+
+@router.get("/admin/coalescing")
+def get_coalescing_metrics():
+    return read_flights.snapshot()
+
+@router.post("/admin/stats/reconcile")
+def reconcile_stats(db: Session = Depends(database.get_db)):
+    report = stats.reconcile(db)
+    if report["rebuilt"]:
+        invalidate_reservations()
+    return report
+
+@router.get("/admin/tokens")
+def get_token_cache_metrics():
+    return token_verifier.snapshot()
+
+@router.get("/admin/password-pool")
+def get_password_pool_metrics():
+    return password_pool.snapshot()
+
+@router.get("/admin/outbox")
+def get_outbox_metrics(db: Session = Depends(database.get_db)):
+    return {**outbox_dispatcher.snapshot(), **outbox_counts(db, outbox_dispatcher.max_attempts)}
+
+@router.get("/admin/idempotency")
+def get_idempotency_metrics():
+    return idempotency_store.snapshot()
+
+@router.post("/admin/idempotency/purge")
+def purge_idempotency_keys(db: Session = Depends(database.get_db)):
+    purged = purge_expired(db)
+    db.commit()
+    return {"purged": purged}
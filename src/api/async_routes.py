@@ -0,0 +1,249 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import date, datetime
+from typing import List, Literal, Optional, Union
+
+from src.api import routes, tables
+from src.infrastructure.database import get_async_db
+from src.schemas.reservation import (
+    CreateReservationRequest, ReservationResponse, ReservationPage,
+    AssignTableRequest, CancelRequest, ReservationStats, DailyStats,
+    BatchCreateRequest, BatchTransitionRequest, BatchResponse,
+    AvailabilityResponse, TableCreateRequest, TableResponse, AllocationResult,
+    BatchAllocationRequest, BatchAllocationResponse
+)
+from src.api.serialization import export_paths, export_header, export_chunk
+from src.core.security import get_current_user
+from src.api.metrics import InstrumentedRoute
+from src.api.routes import IdempotencyKey
+from src.infrastructure.idempotency import idempotency_store
+from src.infrastructure.singleflight import read_flights
+
+router = APIRouter(route_class=InstrumentedRoute)
+table_router = APIRouter(route_class=InstrumentedRoute)
+
+# Async twin of src.api.routes. Each endpoint runs the sync handler body through
+# AsyncSession.run_sync: SQLAlchemy drives it in a greenlet on the event loop and
+# every query awaits the async driver, so no threadpool worker is held while
+# Postgres answers. Business rules stay in one place.
+async def _run(db: AsyncSession, handler, *args, **kwargs):
+    return await db.run_sync(lambda session: handler(*args, db=session, **kwargs))
+
+async def _run_coalesced(db: AsyncSession, name: str, key: tuple, handler, *args, **kwargs):
+    # Identical reads in flight share one run_sync call. Inside it the sync
+    # handler's own coalescing steps aside, as it runs on the event loop's thread.
+    # As there, callers share the rendered body and each gets its own Response.
+    async def load():
+        return routes.response_parts(await _run(db, handler, *args, **kwargs))
+
+    parts, _ = await read_flights.do_async(name, key, load)
+    return routes.json_response(*parts)
+
+async def _run_idempotent(db: AsyncSession, idempotency_key, current_user: str, handler, *args):
+    # A duplicate waits for the request in flight here, on the event loop: the
+    # thread lock inside the sync handler would block the loop that runs it.
+    if idempotency_key is None:
+        return await _run(db, handler, *args, current_user=current_user)
+    with routes.idempotency_errors():
+        async with idempotency_store.collapse(routes.scoped_key(current_user, idempotency_key)):
+            return await _run(db, handler, *args, idempotency_key=idempotency_key, current_user=current_user)
+
+# --- CRUD ENDPOINTS ---
+
+@router.post("/reservations", response_model=ReservationResponse)
+async def create_reservation(
+    request: CreateReservationRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.create_reservation, request)
+
+@router.get("/reservations", response_model=Union[List[ReservationResponse], ReservationPage])
+async def list_reservations(
+    skip: int = 0,
+    limit: int = 10,
+    status: Optional[str] = Query(None),
+    start_from: Optional[datetime] = Query(None),
+    start_to: Optional[datetime] = Query(None),
+    table_area: Optional[str] = Query(None),
+    paginate: Literal["offset", "cursor"] = Query("offset"),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. status,booking_info.start_time"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    params = dict(skip=skip, limit=limit, status=status, start_from=start_from, start_to=start_to,
+                  table_area=table_area, paginate=paginate, cursor=cursor, fields=fields)
+    return await _run_coalesced(
+        db, "list_reservations", routes.read_key("list_reservations", **params),
+        routes.list_reservations, **params, current_user=current_user
+    )
+
+@router.get("/reservations/export")
+async def export_reservations(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    status: Optional[str] = Query(None),
+    start_from: Optional[datetime] = Query(None),
+    start_to: Optional[datetime] = Query(None),
+    table_area: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    # Streams with AsyncSession.stream rather than run_sync, so the event loop
+    # is free between batches.
+    paths = export_paths(routes.requested_fields(fields))
+    stmt = routes.export_statement(paths, status, start_from, start_to, table_area)
+
+    async def body():
+        yield export_header(format, paths)
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            yield export_chunk(format, batch, paths)
+
+    return routes.export_response(body(), format)
+
+@router.get("/reservations/{reservation_id}", response_model=ReservationResponse)
+async def get_reservation(
+    reservation_id: UUID,
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_coalesced(
+        db, "get_reservation", routes.read_key("get_reservation", reservation_id, fields=fields),
+        routes.get_reservation, reservation_id, fields=fields, current_user=current_user
+    )
+
+# --- BUSINESS FLOW ENDPOINTS ---
+
+@router.post("/reservations/{reservation_id}/confirm")
+async def confirm_reservation(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.confirm_reservation, reservation_id)
+
+@router.post("/reservations/{reservation_id}/check-in")
+async def check_in_customer(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.check_in_customer, reservation_id)
+
+@router.post("/reservations/{reservation_id}/complete")
+async def complete_reservation(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.complete_reservation, reservation_id)
+
+@router.post("/reservations/{reservation_id}/assign-table")
+async def assign_table(
+    reservation_id: UUID,
+    request: AssignTableRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.assign_table, reservation_id, request)
+
+@router.post("/reservations/{reservation_id}/cancel")
+async def cancel_reservation(
+    reservation_id: UUID,
+    request: CancelRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.cancel_reservation, reservation_id, request)
+
+@router.get("/availability", response_model=AvailabilityResponse)
+async def get_availability(
+    start: datetime,
+    end: datetime,
+    duration_minutes: int = 90,
+    area: Optional[str] = Query(None),
+    table_id: Optional[UUID] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run(
+        db, routes.get_availability,
+        start, end, duration_minutes=duration_minutes, area=area, table_id=table_id, current_user=current_user
+    )
+
+# --- BATCH ENDPOINTS ---
+
+@router.post("/reservations:batch", response_model=BatchResponse)
+async def create_reservations_batch(
+    request: BatchCreateRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.create_reservations_batch, request)
+
+@router.post("/reservations/transitions:batch", response_model=BatchResponse)
+async def transition_reservations_batch(
+    request: BatchTransitionRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_idempotent(db, idempotency_key, current_user, routes.transition_reservations_batch, request)
+
+@router.get("/stats", response_model=ReservationStats)
+async def get_reservation_stats(db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user)):
+    return await _run_coalesced(db, "stats", routes.read_key("stats"), routes.get_reservation_stats, current_user=current_user)
+
+@router.get("/stats/daily", response_model=List[DailyStats])
+async def get_daily_stats(
+    start: date,
+    end: date,
+    area: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run_coalesced(
+        db, "daily_stats", routes.read_key("daily_stats", start=start, end=end, area=area),
+        routes.get_daily_stats, start, end, area=area, current_user=current_user
+    )
+
+# --- TABLES & ALLOCATION ---
+
+@table_router.post("/tables", response_model=TableResponse)
+async def create_table(
+    request: TableCreateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run(db, tables.create_table, request, current_user=current_user)
+
+@table_router.get("/tables", response_model=List[TableResponse])
+async def list_tables(db: AsyncSession = Depends(get_async_db), current_user: str = Depends(get_current_user)):
+    return await _run(db, tables.list_tables, current_user=current_user)
+
+@table_router.post("/reservations/{reservation_id}/auto-assign", response_model=AllocationResult)
+async def auto_assign_table(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run(db, tables.auto_assign_table, reservation_id, current_user=current_user)
+
+@table_router.post("/allocations:batch", response_model=BatchAllocationResponse)
+async def allocate_evening(
+    request: BatchAllocationRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: str = Depends(get_current_user)
+):
+    return await _run(db, tables.allocate_evening, request, current_user=current_user)
@@ -1,26 +1,112 @@
+import os
+import threading
+import uuid
+from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from src.core.security import verify_password, create_access_token, get_password_hash
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-router = APIRouter()
+from src.core.security import (
+    verify_password_async, create_access_token, get_password_hash, get_current_principal,
+    ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from src.core.password_pool import password_pool, PasswordPoolBusy
+from src.core.tokens import InvalidToken, Principal
+from src.infrastructure.database import get_db
+from src.infrastructure import users
+from src.schemas.auth import TokenResponse, RefreshRequest, LogoutRequest
+from src.api.metrics import InstrumentedRoute
 
-users_db = {
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Accounts created in the users table on their first login. The hash comes
+# from ADMIN_PASSWORD_HASH or is computed then, in the password pool.
+SEED_USERS = {
     "admin": {
-        "username": "admin",
-        "hashed_password": get_password_hash("password123")
+        "password": "password123",
+        "hashed_password": os.getenv("ADMIN_PASSWORD_HASH"),
+        "roles": ["admin"],
     }
 }
+_seed_lock = threading.Lock()
 
-@router.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = users_db.get(form_data.username)
-    
-    if not user or not verify_password(form_data.password, user['hashed_password']):
+def _seed_hash(seed: dict) -> str:
+    # runs in a pool thread; the lock makes a login storm hash only once
+    with _seed_lock:
+        if seed["hashed_password"] is None:
+            seed["hashed_password"] = get_password_hash(seed["password"])
+        return seed["hashed_password"]
+
+async def find_user(db: Session, username: str):
+    user = await run_in_threadpool(users.get_user, db, username)
+    if user is None and username in SEED_USERS:
+        seed = SEED_USERS[username]
+        hashed_password = seed["hashed_password"] or await password_pool.run(_seed_hash, seed)
+        user = await run_in_threadpool(
+            users.create_user, db, username, hashed_password, seed["roles"], exist_ok=True
+        )
+    return user
+
+def issue_tokens(db: Session, user) -> TokenResponse:
+    expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username, "roles": users.roles_of(user), "jti": uuid.uuid4().hex},
+        expires_delta=expires
+    )
+    refresh_token = users.issue_refresh_token(db, user.user_id)
+    db.commit()
+    return TokenResponse(
+        access_token=access_token, expires_in=int(expires.total_seconds()), refresh_token=refresh_token
+    )
+
+@router.post("/token", response_model=TokenResponse)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    try:
+        user = await find_user(db, form_data.username)
+        verified = False
+        if user and user.is_active:
+            verified = await verify_password_async(form_data.password, user.hashed_password)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user['username']})
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return await run_in_threadpool(issue_tokens, db, user)
+
+@router.post("/token/refresh", response_model=TokenResponse)
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    # no password check here, so a refresh costs a couple of queries instead of a bcrypt round
+    try:
+        user = users.rotate_refresh_token(db, request.refresh_token)
+    except InvalidToken as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return issue_tokens(db, user)
+
+@router.post("/logout")
+def logout(
+    request: Optional[LogoutRequest] = None,
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    if principal.token_id and principal.expires_at:
+        users.revoke_access_token(db, principal.token_id, principal.expires_at)
+    if request and request.refresh_token:
+        users.revoke_refresh_token(db, request.refresh_token)
+    db.commit()
+    return {"message": "Logged out"}
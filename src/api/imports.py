@@ -0,0 +1,145 @@
+"""Bulk reservation import from CSV or NDJSON, over HTTP or from the command line.
+
+    python -m src.api.imports partner_bookings.csv [--format csv] [--chunk-size 10000]
+
+CSV headers follow CreateReservationRequest, with dotted names for the
+contact: customer_id, contact_info.name, contact_info.phone,
+contact_info.email, start_time, duration_minutes, party_size. Empty cells take
+the schema default. Rows are validated and written one chunk at a time, and
+the whole file is committed once at the end.
+"""
+import csv
+import io
+import os
+from typing import Any, Iterable, Iterator, Literal, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from src.api.routes import created_event, new_reservation_values, validation_message
+from src.infrastructure.bulk_import import write_method, write_rows
+from src.infrastructure.cache import invalidate_reservations
+from src.infrastructure.outbox import record_events
+from src.infrastructure.database import get_db
+from src.schemas.reservation import CreateReservationRequest, ImportReport
+from src.core.security import get_current_user
+from src.api.metrics import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "10000"))
+MAX_REPORTED_ERRORS = 1000
+
+def import_format(filename: Optional[str]) -> Optional[str]:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(ext)
+
+def _nest(flat: dict) -> dict:
+    record = {}
+    for key, value in flat.items():
+        if value in ("", None) or key is None:
+            continue
+        group, _, leaf = key.partition(".")
+        if leaf:
+            record.setdefault(group, {})[leaf] = value
+        else:
+            record[key] = value
+    return record
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(line number, record) pairs. A line that can't be parsed yields its error message instead."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for flat in reader:
+            yield reader.line_num, _nest(flat)
+        return
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+
+def write_chunk(db: Session, rows: list):
+    write_rows(db, rows)
+    record_events(db, map(created_event, rows))
+
+def import_reservations(db: Session, records: Iterable[Tuple[int, Any]],
+                        chunk_size: int = IMPORT_CHUNK_SIZE, max_errors: int = MAX_REPORTED_ERRORS) -> dict:
+    """Validate and write records chunk by chunk, then commit once. Memory is
+    bounded by the chunk and the first `max_errors` error messages."""
+    report = {"total": 0, "imported": 0, "failed": 0, "method": write_method(db), "errors": [], "errors_truncated": False}
+
+    def fail(line: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"line": line, "error": error})
+        else:
+            report["errors_truncated"] = True
+
+    chunk = []
+    for line, record in records:
+        report["total"] += 1
+        if isinstance(record, str):
+            fail(line, record)
+            continue
+        try:
+            payload = CreateReservationRequest.model_validate(record)
+        except ValidationError as e:
+            fail(line, validation_message(e))
+            continue
+        chunk.append(new_reservation_values(payload))
+        if len(chunk) >= chunk_size:
+            write_chunk(db, chunk)
+            report["imported"] += len(chunk)
+            chunk = []
+    write_chunk(db, chunk)
+    report["imported"] += len(chunk)
+    db.commit()
+    return report
+
+@router.post("/reservations:import", response_model=ImportReport)
+def import_reservations_file(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    fmt = format or import_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown file type; pass format=csv or format=ndjson.")
+    # the upload is spooled to disk by the form parser and read back line by line
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = import_reservations(db, read_records(lines, fmt))
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8.")
+    invalidate_reservations()
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or import_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+    started = time.perf_counter()
+    with SessionLocal() as session, open(args.path, encoding="utf-8-sig", newline="") as source:
+        result = import_reservations(session, read_records(source, fmt), chunk_size=args.chunk_size)
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(result, indent=2))
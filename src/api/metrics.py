@@ -0,0 +1,144 @@
+"""Request instrumentation: timing middleware, /metrics, opt-in profiling.
+
+Every response carries a Server-Timing header with the time spent in auth,
+pool checkout, SQL and serialization, and the number of SQL statements.
+GET /metrics serves per-route histograms in the Prometheus text format.
+
+With PROFILING_ENABLED=true, a request sent with `X-Profile: 1` runs its
+endpoint under cProfile. The report goes to PROFILE_DIR (<name>.prof for
+pstats/snakeviz, <name>.txt with the top functions), and the response names it
+in an X-Profile-Report header. The profiler follows the endpoint into the
+threadpool. Dependencies such as auth show up only in Server-Timing.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import tempfile
+import time
+import uuid
+
+from fastapi import APIRouter, Response
+from fastapi.routing import APIRoute
+
+from src.infrastructure.database import env_bool
+from src.infrastructure.instrumentation import begin_request, current_request, end_request, request_metrics
+
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", "false")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "profiles"))
+PROFILE_HEADER = b"x-profile"
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
+def route_template(scope) -> str:
+    # the template, not the raw path, so ids don't explode the label set
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # Routes of an included router may carry only their own part of the path;
+    # the include prefix is whatever precedes it in the request path.
+    concrete = template
+    for name, value in scope.get("path_params", {}).items():
+        concrete = concrete.replace("{%s}" % name, str(value))
+    path = scope["path"]
+    prefix = path[:-len(concrete)] if concrete and path.endswith(concrete) else ""
+    return prefix + template
+
+class InstrumentationMiddleware:
+    """Plain ASGI middleware, so streaming responses and context variables pass through untouched."""
+
+    def __init__(self, app, metrics=request_metrics, profiling: bool = PROFILING_ENABLED, profile_dir: str = PROFILE_DIR):
+        self.app = app
+        self.metrics = metrics
+        self.profiling = profiling
+        self.profile_dir = profile_dir
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_request()
+        if self.profiling and dict(scope["headers"]).get(PROFILE_HEADER, b"").strip() in (b"1", b"true"):
+            stats.profiler = cProfile.Profile()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(time.perf_counter() - stats.started).encode()))
+                if stats.profiler is not None:
+                    headers.append((b"x-profile-report", self.dump_profile(scope, stats.profiler).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            elapsed = time.perf_counter() - stats.started
+            end_request(token)
+            self.metrics.observe(scope["method"], route_template(scope), status, elapsed, stats)
+
+    def dump_profile(self, scope, profiler: cProfile.Profile) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.profile_dir, name)
+        profiler.dump_stats(path + ".prof")
+        report = io.StringIO()
+        report.write(f"{scope['method']} {scope['path']}\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(40)
+        with open(path + ".txt", "w") as f:
+            f.write(report.getvalue())
+        return path + ".txt"
+
+# --- PROFILED ENDPOINTS ---
+# Sync endpoints run in a worker thread, and cProfile only sees the thread
+# that enabled it, so the profiler is switched on around the endpoint call.
+
+def _profiler():
+    stats = current_request()
+    return stats.profiler if stats is not None else None
+
+def profiled(endpoint):
+    if getattr(endpoint, "__profiled__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profiler = _profiler()
+            if profiler is None:
+                return await endpoint(*args, **kwargs)
+            profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler()
+            if profiler is None:
+                return endpoint(*args, **kwargs)
+            profiler.enable()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                profiler.disable()
+    wrapper.__profiled__ = True
+    return wrapper
+
+class InstrumentedRoute(APIRoute):
+    """Route class for the routers: makes their endpoints profilable."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
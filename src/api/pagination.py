@@ -0,0 +1,19 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+# Opaque keyset cursor: base64url(JSON [start_time, reservation_id]) of the last row served.
+
+def encode_cursor(start_time: datetime, reservation_id: UUID) -> str:
+    raw = json.dumps([start_time.isoformat(), str(reservation_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_time, reservation_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(start_time), UUID(reservation_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid pagination cursor.")
@@ -1,172 +1,670 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import tuple_, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from pydantic import BaseModel, ValidationError
 from uuid import UUID
 import uuid
-from datetime import timedelta
-from typing import List, Optional
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Annotated, List, Literal, Optional, Tuple, Union
 
 from src.infrastructure.database import get_db
-from src.infrastructure.orm_models import ReservationORM
+from src.infrastructure.orm_models import ReservationORM, RestaurantTableORM
 from src.schemas.reservation import (
-    CreateReservationRequest, ReservationResponse, 
-    AssignTableRequest, CancelRequest, ReservationStats
+    CreateReservationRequest, ReservationResponse, ReservationPage,
+    AssignTableRequest, CancelRequest, ReservationStats, DailyStats,
+    BatchCreateRequest, BatchTransitionRequest, TransitionItem,
+    BatchItemResult, BatchResponse,
+    AvailabilityResponse, TableAvailability, AvailabilitySlot
+)
+from src.domain.events import DomainEvent, ReservationCreated, ReservationConfirmed, ReservationCancelled
+from src.domain.models import Reservation
+from src.domain.value_objects import ContactInfo, ReservationPolicy, ReservationTime
+from src.domain.transitions import TRANSITIONS, InvalidTransition
+from src.infrastructure.state_machine import ReservationNotFound
+from src.infrastructure.repository import ReservationRepository, ConcurrentUpdate
+from src.infrastructure.availability import (
+    availability_index, booking_tables, ensure_loaded, sync_reservation, booking_end, OCCUPYING_STATUSES, TableBusy
+)
+from src.infrastructure.cache import (
+    read_cache, invalidate_reservations, reservation_key, RESERVATION_TTL, STATS_KEY, STATS_TTL
+)
+from src.infrastructure import stats
+from src.infrastructure.outbox import record_events
+from src.infrastructure.singleflight import read_flights
+from src.infrastructure.idempotency import idempotency_store, fingerprint, KeyInProgress, KeyReused
+from src.api.pagination import encode_cursor, decode_cursor
+from src.api.serialization import (
+    ORJSONResponse, dumps, reservation_dict, reservation_dicts, response_meta,
+    parse_fields, field_columns, sparse_dict, sparse_dicts,
+    EXPORT_MEDIA_TYPES, export_paths, export_header, export_chunk
 )
 from src.core.security import get_current_user
+from src.api.metrics import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+def new_reservation_values(request: CreateReservationRequest) -> dict:
+    return {
+        "reservation_id": uuid.uuid4(),
+        "customer_id": request.customer_id,
+        "status": "PENDING",
+        "start_time": request.start_time,
+        "duration_minutes": request.duration_minutes,
+        "party_size": request.party_size,
+        "contact_name": request.contact_info.name,
+        "contact_phone": request.contact_info.phone,
+        "contact_email": request.contact_info.email,
+        "payment_status": "UNPAID",
+        "payment_amount": 0
+    }
+
+def new_reservation(request: CreateReservationRequest) -> Reservation:
+    # the request schema already validated the contact and time
+    return Reservation(
+        customer_id=request.customer_id,
+        contact_info=ContactInfo.model_construct(**request.contact_info.model_dump()),
+        reservation_time=ReservationTime.model_construct(
+            start_time=request.start_time, duration_minutes=request.duration_minutes
+        ),
+        policy=ReservationPolicy(),
+        party_size=request.party_size,
+    )
+
+def created_event(values: dict) -> ReservationCreated:
+    return ReservationCreated(
+        reservation_id=values["reservation_id"], customer_id=values["customer_id"], start_time=values["start_time"]
+    )
+
+def transition_event(action: str, reservation_id: UUID, actor: str, reason_code: Optional[str] = None) -> List[DomainEvent]:
+    """Outbox events for a transition; only confirm and cancel have one."""
+    if action == "confirm":
+        return [ReservationConfirmed(reservation_id=reservation_id, confirmed_by=actor)]
+    if action == "cancel":
+        return [ReservationCancelled(reservation_id=reservation_id, reason=reason_code or "UNSPECIFIED")]
+    return []
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in error.errors()
+    )
+
+# --- IDEMPOTENCY ---
+# Writes accept an Idempotency-Key header; see src/infrastructure/idempotency.py.
+
+IdempotencyKey = Annotated[Optional[str], Header(alias="Idempotency-Key", min_length=1, max_length=255)]
 
-router = APIRouter()
-
-def map_to_response(orm_obj: ReservationORM) -> ReservationResponse:
-    end_time = orm_obj.start_time + timedelta(minutes=orm_obj.duration_minutes)
-    is_peak = True if orm_obj.start_time.hour >= 18 else False
-
-    return ReservationResponse(
-        reservation_id=orm_obj.reservation_id,
-        status=orm_obj.status,
-        table_area=orm_obj.table_area,
-        
-        customer_details={
-            "id": orm_obj.customer_id,
-            "name": orm_obj.contact_name,
-            "phone": orm_obj.contact_phone,
-            "email": orm_obj.contact_email
-        },
-        
-        booking_info={
-            "start_time": orm_obj.start_time,
-            "end_time": end_time,
-            "duration_minutes": orm_obj.duration_minutes,
-            "is_peak_hour": is_peak
-        },
-        
-        payment_info={
-            "status": orm_obj.payment_status or "UNPAID",
-            "amount": orm_obj.payment_amount or 0,
-            "currency": "IDR"
-        },
-        
-        meta={
-            "api_version": "v1.0.5"
-        }
+def scoped_key(current_user: str, idempotency_key: str) -> str:
+    # keys are the client's choice, so one user's key never replays another's response
+    return f"{current_user}:{idempotency_key}"
+
+@contextmanager
+def idempotency_errors():
+    try:
+        yield
+    except KeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except KeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+
+def response_parts(result) -> Tuple[int, bytes]:
+    if isinstance(result, Response):
+        return result.status_code, bytes(result.body)
+    if isinstance(result, BaseModel):
+        return 200, result.model_dump_json().encode()
+    # e.g. lists of models, as FastAPI would encode them
+    return 200, dumps(jsonable_encoder(result))
+
+def json_response(status_code: int, body: bytes) -> Response:
+    return Response(body, status_code=status_code, media_type="application/json")
+
+def respond(db: Session, result):
+    """Hand `result` to the idempotency key being run, if any, before the write
+    commits: the key, the write and its response then commit together."""
+    if idempotency_store.claimed(db):
+        idempotency_store.respond(db, *response_parts(result))
+    return result
+
+def idempotent(db: Session, idempotency_key: Optional[str], current_user: str, request_parts: tuple, handler):
+    """Run `handler` once per Idempotency-Key. A retry with the same key gets the
+    first response back, marked Idempotent-Replayed, and writes nothing.
+
+    `handler` must pass its response to respond() before it commits."""
+    if idempotency_key is None:
+        return handler()
+    with idempotency_errors():
+        stored, replayed = idempotency_store.execute(
+            db, scoped_key(current_user, idempotency_key), fingerprint(*request_parts), handler
+        )
+    return Response(
+        stored.body, status_code=stored.status_code, media_type="application/json",
+        headers={"Idempotent-Replayed": "true"} if replayed else None
     )
 
+# --- READ COALESCING ---
+# Identical reads in flight at the same time share one execution; see
+# src/infrastructure/singleflight.py. Keys are built from the parsed
+# parameters, so parameter order, defaults and spelling (limit=010) don't matter.
+
+def read_key(name: str, *args, **params) -> tuple:
+    return (name, *args, *sorted(params.items()))
+
+def coalesced(name: str, key: tuple, load):
+    # callers share the rendered body; each gets a Response of its own, so
+    # headers or background tasks set on one never reach the others
+    parts, _ = read_flights.do(name, key, lambda: response_parts(load()))
+    return json_response(*parts)
+
 # --- CRUD ENDPOINTS ---
 
 @router.post("/reservations", response_model=ReservationResponse)
 def create_reservation(
     request: CreateReservationRequest, 
+    idempotency_key: IdempotencyKey = None,
     db: Session = Depends(get_db), 
     current_user: str = Depends(get_current_user)
 ):
-    new_reservation = ReservationORM(
-        reservation_id=uuid.uuid4(),
-        customer_id=request.customer_id,
-        status="PENDING",
-        start_time=request.start_time,
-        duration_minutes=request.duration_minutes,
-        contact_name=request.contact_info.name,
-        contact_phone=request.contact_info.phone,
-        contact_email=request.contact_info.email,
-        payment_status="UNPAID",
-        payment_amount=0
-    )
-    db.add(new_reservation)
-    db.commit()
-    db.refresh(new_reservation)
-    
-    return map_to_response(new_reservation)
+    def create():
+        repo = ReservationRepository(db)
+        reservation = new_reservation(request)
+        repo.add(reservation)
+        repo.flush()
+        response = respond(db, ORJSONResponse(reservation_dict(repo.saved[reservation.reservation_id], response_meta())))
+        repo.commit()
+        invalidate_reservations()
+        return response
+
+    return idempotent(db, idempotency_key, current_user, ("create", request.model_dump()), create)
+
+def filter_reservations(
+    query,
+    status: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    table_area: Optional[str] = None
+):
+    if status:
+        query = query.filter(ReservationORM.status == status)
+    if start_from:
+        query = query.filter(ReservationORM.start_time >= start_from)
+    if start_to:
+        query = query.filter(ReservationORM.start_time < start_to)
+    if table_area:
+        query = query.filter(ReservationORM.table_area == table_area)
+    return query
+
+def requested_fields(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def projected_query(db: Session, paths, *extra_columns: str):
+    """Whole ORM rows, or with fields= only the columns the selection reads."""
+    if paths is None:
+        return db.query(ReservationORM)
+    columns = dict.fromkeys(field_columns(paths) + list(extra_columns))
+    return db.query(*(getattr(ReservationORM, name) for name in columns))
 
-@router.get("/reservations", response_model=List[ReservationResponse])
+def render_rows(rows, paths) -> List[dict]:
+    return reservation_dicts(rows) if paths is None else sparse_dicts(rows, paths)
+
+@router.get("/reservations", response_model=Union[List[ReservationResponse], ReservationPage])
 def list_reservations(
     skip: int = 0,
     limit: int = 10,
     status: Optional[str] = Query(None),
+    start_from: Optional[datetime] = Query(None),
+    start_to: Optional[datetime] = Query(None),
+    table_area: Optional[str] = Query(None),
+    paginate: Literal["offset", "cursor"] = Query("offset"),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. status,booking_info.start_time"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    query = db.query(ReservationORM)
-    if status:
-        query = query.filter(ReservationORM.status == status)
-    
-    reservations = query.offset(skip).limit(limit).all()
-    return [map_to_response(res) for res in reservations]
+    key = read_key("list_reservations", skip=skip, limit=limit, status=status, start_from=start_from, start_to=start_to,
+                   table_area=table_area, paginate=paginate, cursor=cursor, fields=fields)
+    return coalesced("list_reservations", key, lambda: load_reservations(
+        db, skip, limit, status, start_from, start_to, table_area, paginate, cursor, fields
+    ))
+
+def load_reservations(db: Session, skip, limit, status, start_from, start_to, table_area, paginate, cursor, fields):
+    paths = requested_fields(fields)
+    keyset = paginate == "cursor" or cursor is not None
+    # keyset pages need start_time to build the next cursor
+    query = projected_query(db, paths, *(["start_time"] if keyset else []))
+    query = filter_reservations(query, status, start_from, start_to, table_area)
+    # (start_time, reservation_id) is unique, so pages are stable in both modes.
+    query = query.order_by(ReservationORM.start_time, ReservationORM.reservation_id)
+
+    if not keyset:
+        reservations = query.offset(skip).limit(limit).all()
+        return ORJSONResponse(render_rows(reservations, paths))
+
+    # Keyset mode: seek past the last row instead of counting skipped rows,
+    # so page N costs the same index range scan as page 1.
+    if cursor:
+        try:
+            last_start, last_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(
+            tuple_(ReservationORM.start_time, ReservationORM.reservation_id) > tuple_(last_start, last_id)
+        )
+
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].start_time, page[-1].reservation_id)
+    return ORJSONResponse({"items": render_rows(page, paths), "next_cursor": next_cursor})
+
+# --- EXPORT ---
+
+EXPORT_BATCH_SIZE = 1000
+
+def export_statement(paths, status=None, start_from=None, start_to=None, table_area=None):
+    """Plain column rows (no ORM objects) in list order, fetched through a
+    server-side cursor EXPORT_BATCH_SIZE rows at a time."""
+    stmt = select(*(getattr(ReservationORM, name) for name in field_columns(paths)))
+    stmt = filter_reservations(stmt, status, start_from, start_to, table_area)
+    stmt = stmt.order_by(ReservationORM.start_time, ReservationORM.reservation_id)
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+def export_response(body, format: str) -> StreamingResponse:
+    return StreamingResponse(
+        body, media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="reservations.{format}"'}
+    )
+
+# Declared before /reservations/{reservation_id} so "export" is not read as an id.
+@router.get("/reservations/export")
+def export_reservations(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    status: Optional[str] = Query(None),
+    start_from: Optional[datetime] = Query(None),
+    start_to: Optional[datetime] = Query(None),
+    table_area: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    paths = export_paths(requested_fields(fields))
+    stmt = export_statement(paths, status, start_from, start_to, table_area)
+
+    def body():
+        yield export_header(format, paths)
+        for batch in db.execute(stmt).partitions():
+            yield export_chunk(format, batch, paths)
+
+    return export_response(body(), format)
 
 @router.get("/reservations/{reservation_id}", response_model=ReservationResponse)
 def get_reservation(
     reservation_id: UUID, 
+    fields: Optional[str] = Query(None),
     db: Session = Depends(get_db), 
     current_user: str = Depends(get_current_user)
 ):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res:
-        raise HTTPException(status_code=404, detail="Reservation not found")
-    return map_to_response(res)
+    return coalesced("get_reservation", read_key("get_reservation", reservation_id, fields=fields),
+                     lambda: load_reservation(db, reservation_id, fields))
+
+def load_reservation(db: Session, reservation_id: UUID, fields: Optional[str]):
+    paths = requested_fields(fields)
+    if paths is not None:
+        # projected reads go straight to the database; the cache holds whole reservations
+        res = projected_query(db, paths).filter(ReservationORM.reservation_id == reservation_id).first()
+        if not res:
+            raise HTTPException(status_code=404, detail="Reservation not found")
+        return ORJSONResponse(sparse_dict(res, paths, response_meta()))
+
+    def load():
+        res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
+        if not res:
+            raise HTTPException(status_code=404, detail="Reservation not found")
+        return reservation_dict(res, None)
+
+    cached = read_cache.get_or_load(reservation_key(reservation_id), None, load, RESERVATION_TTL)
+    return ORJSONResponse({**cached, "meta": response_meta()})
 
 # --- BUSINESS FLOW ENDPOINTS ---
 
+TABLE_TAKEN = "Table is already booked for this time slot."
+
+@contextmanager
+def transition_errors():
+    try:
+        yield
+    except ReservationNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@contextmanager
+def holding_tables(table_ids):
+    try:
+        with booking_tables(table_ids):
+            yield
+    except TableBusy as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+
+def commit_changes(repo: ReservationRepository):
+    """Commit the unit of work, then refresh the caches for what it wrote."""
+    try:
+        repo.commit()
+    except IntegrityError:
+        # Postgres exclusion constraint: another worker booked the slot first
+        repo.db.rollback()
+        raise HTTPException(status_code=409, detail=TABLE_TAKEN)
+    except ConcurrentUpdate as e:
+        repo.db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    invalidate_reservations(*repo.saved)
+    for reservation_id, row in repo.saved.items():
+        sync_reservation(row, repo.reseated.get(reservation_id))
+
+def run_transition(db: Session, reservation_id: UUID, action: str, current_user: str, reason_code: Optional[str] = None):
+    # one UPDATE ... WHERE status IN (allowed) RETURNING, nothing loaded first
+    repo = ReservationRepository(db)
+    with transition_errors():
+        events = transition_event(action, reservation_id, current_user, reason_code)
+        repo.transition(reservation_id, TRANSITIONS[action], events)
+    commit_changes(repo)
+
+def transition_endpoint(db: Session, reservation_id: UUID, action: str, response: dict,
+                        idempotency_key: Optional[str], current_user: str, request: Optional[CancelRequest] = None):
+    def transition():
+        # the response doesn't depend on the write; it is stored only if the write commits
+        respond(db, response)
+        run_transition(db, reservation_id, action, current_user, request.reason_code if request else None)
+        return response
+
+    request_parts = (response["status"], reservation_id, request.model_dump() if request else None)
+    return idempotent(db, idempotency_key, current_user, request_parts, transition)
+
 @router.post("/reservations/{reservation_id}/confirm")
-def confirm_reservation(reservation_id: UUID, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res: raise HTTPException(status_code=404, detail="Reservation not found")
-    if res.status == "CANCELLED": raise HTTPException(status_code=400, detail="Cannot confirm cancelled reservation.")
-    
-    res.status = "CONFIRMED"
-    db.commit()
-    return {"message": "Confirmed", "status": "CONFIRMED"}
+def confirm_reservation(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return transition_endpoint(db, reservation_id, "confirm",
+                               {"message": "Confirmed", "status": "CONFIRMED"}, idempotency_key, current_user)
 
 @router.post("/reservations/{reservation_id}/check-in")
-def check_in_customer(reservation_id: UUID, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res: raise HTTPException(status_code=404, detail="Reservation not found")
-    if res.status != "CONFIRMED": raise HTTPException(status_code=400, detail="Reservation must be CONFIRMED to check-in.")
-    
-    res.status = "CHECKED_IN"
-    db.commit()
-    return {"message": "Checked-in", "status": "CHECKED_IN"}
+def check_in_customer(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return transition_endpoint(db, reservation_id, "check_in",
+                               {"message": "Checked-in", "status": "CHECKED_IN"}, idempotency_key, current_user)
 
 @router.post("/reservations/{reservation_id}/complete")
-def complete_reservation(reservation_id: UUID, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res: raise HTTPException(status_code=404, detail="Reservation not found")
-    if res.status != "CHECKED_IN": raise HTTPException(status_code=400, detail="Customer must be CHECKED_IN to complete.")
-    
-    res.status = "COMPLETED"
-    db.commit()
-    return {"message": "Completed", "status": "COMPLETED"}
+def complete_reservation(
+    reservation_id: UUID,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return transition_endpoint(db, reservation_id, "complete",
+                               {"message": "Completed", "status": "COMPLETED"}, idempotency_key, current_user)
 
 @router.post("/reservations/{reservation_id}/assign-table")
-def assign_table(reservation_id: UUID, request: AssignTableRequest, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res: raise HTTPException(status_code=404, detail="Reservation not found")
-    if res.status == "CANCELLED": raise HTTPException(status_code=400, detail="Cannot assign table to cancelled reservation.")
-    
-    res.table_id = request.table_id
-    res.table_area = request.area
-    db.commit()
-    return {"message": "Table assigned"}
+def assign_table(
+    reservation_id: UUID,
+    request: AssignTableRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return idempotent(db, idempotency_key, current_user, ("assign_table", reservation_id, request.model_dump()),
+                      lambda: assign_table_now(db, reservation_id, request))
+
+def assign_table_now(db: Session, reservation_id: UUID, request: AssignTableRequest):
+    index = ensure_loaded(db)
+    # the catalogue is authoritative for capacity; unknown tables use the request's
+    table = db.get(RestaurantTableORM, request.table_id)
+    capacity = table.capacity if table else request.capacity
+
+    repo = ReservationRepository(db)
+    with transition_errors():
+        reservation = repo.get(reservation_id)
+        reservation.assign_table(request.table_id, capacity, request.area)
+    if reservation.party_size > capacity:
+        raise HTTPException(status_code=400, detail="Table capacity is too small for this party.")
+    booking = reservation.reservation_time
+    with holding_tables([request.table_id]):
+        if reservation.status.value in OCCUPYING_STATUSES and index.conflicts(
+            request.table_id, booking.start_time, booking_end(booking.start_time, booking.duration_minutes),
+            ignore=reservation_id
+        ):
+            raise HTTPException(status_code=409, detail=TABLE_TAKEN)
+        response = respond(db, {"message": "Table assigned"})
+        commit_changes(repo)
+    return response
 
 @router.post("/reservations/{reservation_id}/cancel")
-def cancel_reservation(reservation_id: UUID, request: CancelRequest, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    res = db.query(ReservationORM).filter(ReservationORM.reservation_id == reservation_id).first()
-    if not res: raise HTTPException(status_code=404, detail="Reservation not found")
-    if res.status == "COMPLETED": raise HTTPException(status_code=400, detail="Cannot cancel completed reservation.")
-    
-    res.status = "CANCELLED"
+def cancel_reservation(
+    reservation_id: UUID,
+    request: CancelRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return transition_endpoint(db, reservation_id, "cancel",
+                               {"message": "Cancelled", "status": "CANCELLED"}, idempotency_key, current_user, request)
+
+@router.get("/availability", response_model=AvailabilityResponse)
+def get_availability(
+    start: datetime,
+    end: datetime,
+    duration_minutes: int = 90,
+    area: Optional[str] = Query(None),
+    table_id: Optional[UUID] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start.")
+    index = ensure_loaded(db)
+    slots = index.free_slots(
+        start, end, timedelta(minutes=duration_minutes),
+        table_ids=[table_id] if table_id else None, area=area
+    )
+    return AvailabilityResponse(
+        start=start, end=end, duration_minutes=duration_minutes,
+        tables=[
+            TableAvailability(
+                table_id=tid, area=index.table_area(tid),
+                free=[AvailabilitySlot(start=s, end=e) for s, e in free]
+            )
+            for tid, free in slots.items()
+        ]
+    )
+
+# --- BATCH ENDPOINTS ---
+
+BATCH_CHUNK_SIZE = 5000
+
+def batch_response(results: List[BatchItemResult]) -> BatchResponse:
+    succeeded = sum(1 for r in results if r.ok)
+    return BatchResponse(total=len(results), succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+@router.post("/reservations:batch", response_model=BatchResponse)
+def create_reservations_batch(
+    request: BatchCreateRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return idempotent(db, idempotency_key, current_user, ("create_batch", request.model_dump()),
+                      lambda: create_batch(db, request))
+
+def create_batch(db: Session, request: BatchCreateRequest) -> BatchResponse:
+    results, rows = [], []
+    for index, item in enumerate(request.items):
+        try:
+            payload = CreateReservationRequest.model_validate(item)
+        except ValidationError as e:
+            results.append(BatchItemResult(index=index, ok=False, error=validation_message(e)))
+            continue
+        values = new_reservation_values(payload)
+        rows.append(values)
+        results.append(BatchItemResult(index=index, ok=True, reservation_id=values["reservation_id"], status="PENDING"))
+
+    # one executemany INSERT per chunk, one COMMIT for the whole batch
+    for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+        chunk = rows[start:start + BATCH_CHUNK_SIZE]
+        db.execute(insert(ReservationORM), chunk)
+        record_events(db, map(created_event, chunk))
+    response = respond(db, batch_response(results))
+    db.commit()
+    invalidate_reservations()
+    return response
+
+@router.post("/reservations/transitions:batch", response_model=BatchResponse)
+def transition_reservations_batch(
+    request: BatchTransitionRequest,
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    return idempotent(db, idempotency_key, current_user, ("transition_batch", request.model_dump()),
+                      lambda: transition_batch(db, request, current_user))
+
+def transition_batch(db: Session, request: BatchTransitionRequest, current_user: str) -> BatchResponse:
+    items = []
+    for index, item in enumerate(request.items):
+        try:
+            items.append((index, TransitionItem.model_validate(item)))
+        except ValidationError as e:
+            items.append((index, validation_message(e)))
+
+    loaded = load_statuses(db, {item.reservation_id for _, item in items if isinstance(item, TransitionItem)})
+    current = dict(loaded)
+    results, events = apply_transitions(items, current, current_user)
+
+    changes = status_changes(loaded, current)
+    if update_statuses(db, changes) != sum(len(rids) for rids in changes.values()):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Reservations changed concurrently, retry the batch.")
+    record_events(db, events)
+    response = respond(db, batch_response(results))
     db.commit()
-    return {"message": "Cancelled", "status": "CANCELLED"}
+    invalidate_reservations(*(rid for rids in changes.values() for rid in rids))
+    for rid, new_status in current.items():
+        if new_status not in OCCUPYING_STATUSES:
+            availability_index.remove(rid)
+    return response
+
+def load_statuses(db: Session, reservation_ids) -> dict:
+    ids = list(reservation_ids)
+    loaded = {}
+    for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+        chunk = ids[start:start + BATCH_CHUNK_SIZE]
+        loaded.update(
+            db.query(ReservationORM.reservation_id, ReservationORM.status)
+            .filter(ReservationORM.reservation_id.in_(chunk))
+            .all()
+        )
+    return loaded
+
+def apply_transitions(items, current: dict, current_user: str) -> Tuple[List[BatchItemResult], List[DomainEvent]]:
+    """Check each item against the running status in `current`, updating it.
+
+    Items are applied in order, so one batch can carry e.g. confirm + check_in
+    for the same reservation.
+    """
+    results, events = [], []
+    for index, item in items:
+        if isinstance(item, str):
+            results.append(BatchItemResult(index=index, ok=False, error=item))
+            continue
+        if item.reservation_id not in current:
+            results.append(BatchItemResult(
+                index=index, ok=False, reservation_id=item.reservation_id, error="Reservation not found"
+            ))
+            continue
+        try:
+            current[item.reservation_id] = TRANSITIONS[item.action].check(current[item.reservation_id])
+        except InvalidTransition as e:
+            results.append(BatchItemResult(index=index, ok=False, reservation_id=item.reservation_id, error=str(e)))
+            continue
+        results.append(BatchItemResult(
+            index=index, ok=True, reservation_id=item.reservation_id, status=current[item.reservation_id]
+        ))
+        events += transition_event(item.action, item.reservation_id, current_user, item.reason_code)
+    return results, events
+
+def status_changes(loaded: dict, current: dict) -> dict:
+    """Changed reservations grouped by (old status, new status)."""
+    changes = defaultdict(list)
+    for rid, new_status in current.items():
+        if new_status != loaded[rid]:
+            changes[(loaded[rid], new_status)].append(rid)
+    return changes
+
+def update_statuses(db: Session, changes: dict) -> int:
+    """One UPDATE per (old status -> new status) pair instead of one per row; the rows updated.
+
+    Each is guarded on the status we read: if a concurrent request moved a row
+    in between, the count comes up short and the caller rolls the batch back.
+    """
+    updated = 0
+    for (old_status, new_status), rids in changes.items():
+        for start in range(0, len(rids), BATCH_CHUNK_SIZE):
+            updated += db.execute(
+                update(ReservationORM)
+                .where(ReservationORM.reservation_id.in_(rids[start:start + BATCH_CHUNK_SIZE]),
+                       ReservationORM.status == old_status)
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+    return updated
+
+def reservation_stats(counts, revenue, model=ReservationStats, **extra):
+    fields = {field: counts.get(status, 0) for status, field in stats.STATUS_FIELDS.items()}
+    return model(total_reservations=sum(counts.values()), total_revenue=revenue, **fields, **extra)
+
+def load_reservation_stats(db: Session) -> ReservationStats:
+    # O(1): a few rows kept current by triggers on reservations (see orm_models)
+    counts, revenue = stats.totals(db)
+    return reservation_stats(counts, revenue)
 
 @router.get("/stats", response_model=ReservationStats)
 def get_reservation_stats(db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
-    stats_query = db.query(ReservationORM.status, func.count(ReservationORM.reservation_id)).group_by(ReservationORM.status).all()
-    counts = dict(stats_query)
-    total_revenue = db.query(func.sum(ReservationORM.payment_amount)).scalar() or 0.0
-    
-    return ReservationStats(
-        total_reservations=sum(counts.values()),
-        pending_count=counts.get("PENDING", 0),
-        confirmed_count=counts.get("CONFIRMED", 0),
-        checked_in_count=counts.get("CHECKED_IN", 0),
-        completed_count=counts.get("COMPLETED", 0),
-        cancelled_count=counts.get("CANCELLED", 0),
-        total_revenue=total_revenue
-    )
\ No newline at end of file
+    return coalesced("stats", read_key("stats"), lambda: read_cache.get_or_load(
+        STATS_KEY, ReservationStats, lambda: load_reservation_stats(db), STATS_TTL
+    ))
+
+@router.get("/stats/daily", response_model=List[DailyStats])
+def get_daily_stats(
+    start: date,
+    end: date,
+    area: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start.")
+    return coalesced("daily_stats", read_key("daily_stats", start=start, end=end, area=area),
+                     lambda: load_daily_stats(db, start, end, area))
+
+def load_daily_stats(db: Session, start: date, end: date, area: Optional[str]) -> List[DailyStats]:
+    grouped = defaultdict(lambda: ({}, [0]))
+    for day, row_area, status, count, revenue in stats.daily_totals(db, start, end, area):
+        counts, total_revenue = grouped[(day, row_area)]
+        counts[status] = count
+        total_revenue[0] += revenue
+    return [
+        reservation_stats(counts, revenue[0], DailyStats, day=day, area=row_area or None)
+        for (day, row_area), (counts, revenue) in grouped.items()
+    ]
@@ -0,0 +1,160 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Any, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi import Response
+
+from src.infrastructure.instrumentation import timed
+
+API_VERSION = "v1.0.5"
+
+def dumps(content: Any) -> bytes:
+    # orjson handles uuid.UUID and datetime natively, but not asyncpg's own UUID
+    # type, which the async driver returns; anything unknown falls back to str()
+    return orjson.dumps(content, default=str)
+
+class ORJSONResponse(Response):
+    """Render with orjson (see dumps)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
+
+def response_meta() -> dict:
+    # built once per response and shared by every item in it
+    return {"api_version": API_VERSION, "response_generated_at": datetime.now()}
+
+def reservation_dict(row, meta: dict) -> dict:
+    """The ReservationResponse shape as a plain dict, without re-validating DB values.
+
+    Works on ORM objects and on Row results alike. Must stay in step with
+    ReservationResponse (tests/test_serialization.py compares the two).
+    """
+    start_time = row.start_time
+    return {
+        "reservation_id": row.reservation_id,
+        "status": row.status,
+        "table_area": row.table_area,
+        "customer_details": {
+            "id": row.customer_id,
+            "name": row.contact_name,
+            "phone": row.contact_phone,
+            "email": row.contact_email,
+        },
+        "booking_info": {
+            "start_time": start_time,
+            "end_time": start_time + timedelta(minutes=row.duration_minutes),
+            "duration_minutes": row.duration_minutes,
+            "party_size": row.party_size or 2,
+            "is_peak_hour": start_time.hour >= 18,
+        },
+        "payment_info": {
+            "status": row.payment_status or "UNPAID",
+            "amount": float(row.payment_amount or 0),
+            "currency": "IDR",
+        },
+        "meta": meta,
+    }
+
+def reservation_dicts(rows: Iterable) -> List[dict]:
+    meta = response_meta()
+    return [reservation_dict(row, meta) for row in rows]
+
+# --- SPARSE FIELDSETS ---
+# fields= paths -> (columns read, value). "booking_info" selects every booking_info.* leaf.
+
+FIELDS = {
+    "reservation_id": (("reservation_id",), lambda r: r.reservation_id),
+    "status": (("status",), lambda r: r.status),
+    "table_area": (("table_area",), lambda r: r.table_area),
+    "customer_details.id": (("customer_id",), lambda r: r.customer_id),
+    "customer_details.name": (("contact_name",), lambda r: r.contact_name),
+    "customer_details.phone": (("contact_phone",), lambda r: r.contact_phone),
+    "customer_details.email": (("contact_email",), lambda r: r.contact_email),
+    "booking_info.start_time": (("start_time",), lambda r: r.start_time),
+    "booking_info.end_time": (
+        ("start_time", "duration_minutes"), lambda r: r.start_time + timedelta(minutes=r.duration_minutes)
+    ),
+    "booking_info.duration_minutes": (("duration_minutes",), lambda r: r.duration_minutes),
+    "booking_info.party_size": (("party_size",), lambda r: r.party_size or 2),
+    "booking_info.is_peak_hour": (("start_time",), lambda r: r.start_time.hour >= 18),
+    "payment_info.status": (("payment_status",), lambda r: r.payment_status or "UNPAID"),
+    "payment_info.amount": (("payment_amount",), lambda r: float(r.payment_amount or 0)),
+    "payment_info.currency": ((), lambda r: "IDR"),
+}
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Expand a comma-separated fields= value into leaf paths; None means everything.
+
+    reservation_id is always included, and "meta" may be asked for by name.
+    """
+    if not raw:
+        return None
+    paths = {"reservation_id": None}
+    unknown = []
+    for name in filter(None, (part.strip() for part in raw.split(","))):
+        leaves = [p for p in FIELDS if p == name or p.startswith(name + ".")]
+        if name == "meta":
+            leaves = ["meta"]
+        if not leaves:
+            unknown.append(name)
+        paths.update(dict.fromkeys(leaves))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}.")
+    return tuple(paths)
+
+def field_columns(paths: Iterable[str]) -> List[str]:
+    columns = {"reservation_id": None}
+    for path in paths:
+        if path != "meta":
+            columns.update(dict.fromkeys(FIELDS[path][0]))
+    return list(columns)
+
+def sparse_dict(row, paths: Iterable[str], meta: dict) -> dict:
+    """Only the requested parts of the ReservationResponse shape, nested the same way."""
+    out = {}
+    for path in paths:
+        if path == "meta":
+            out["meta"] = meta
+            continue
+        value = FIELDS[path][1](row)
+        group, _, leaf = path.partition(".")
+        if leaf:
+            out.setdefault(group, {})[leaf] = value
+        else:
+            out[group] = value
+    return out
+
+def sparse_dicts(rows: Iterable, paths: Iterable[str]) -> List[dict]:
+    meta = response_meta()
+    return [sparse_dict(row, paths, meta) for row in rows]
+
+# --- EXPORT ---
+# One chunk per fetched batch of rows, so a streamed export never holds more
+# than a batch in memory. CSV columns are the dotted field paths.
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def export_paths(paths: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    # meta is per response, not per row
+    return tuple(p for p in (paths or FIELDS) if p != "meta")
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def export_header(fmt: str, paths: Iterable[str]) -> bytes:
+    if fmt != "csv":
+        return b""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(paths)
+    return buffer.getvalue().encode()
+
+def export_chunk(fmt: str, rows: Iterable, paths: Iterable[str]) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(dumps(sparse_dict(row, paths, None)) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(FIELDS[p][1](row)) for p in paths] for row in rows)
+    return buffer.getvalue().encode()
@@ -0,0 +1,132 @@
+import time
+from uuid import UUID
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.api.routes import TABLE_TAKEN, transition_errors, commit_changes, holding_tables
+from src.domain.allocation import TableAllocator, TableSpec, BookingRequest, Allocation
+from src.infrastructure.availability import availability_index, ensure_loaded, booking_end
+from src.infrastructure.database import get_db
+from src.infrastructure.orm_models import ReservationORM, RestaurantTableORM
+from src.infrastructure.repository import ReservationRepository
+from src.schemas.reservation import (
+    TableCreateRequest, TableResponse, AllocationResult,
+    BatchAllocationRequest, BatchAllocationResponse
+)
+from src.core.security import get_current_user
+from src.api.metrics import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+def load_allocator(db: Session) -> TableAllocator:
+    index = ensure_loaded(db)
+    tables = db.execute(
+        select(RestaurantTableORM.table_id, RestaurantTableORM.capacity, RestaurantTableORM.area, RestaurantTableORM.position)
+        .where(RestaurantTableORM.is_active)
+    ).all()
+    return TableAllocator((TableSpec(*t) for t in tables), index)
+
+def booking_request(reservation) -> BookingRequest:
+    booking = reservation.reservation_time
+    return BookingRequest(
+        reservation_id=reservation.reservation_id,
+        party_size=reservation.party_size,
+        start=booking.start_time,
+        end=booking_end(booking.start_time, booking.duration_minutes),
+    )
+
+def seat(reservation, assignment):
+    with transition_errors():
+        reservation.assign_table(assignment.table_id, assignment.capacity, assignment.area, assignment.joined_table_ids)
+
+def allocation_result(reservation_id: UUID, allocation: Allocation) -> AllocationResult:
+    if allocation is None:
+        return AllocationResult(reservation_id=reservation_id, allocated=False)
+    return AllocationResult(
+        reservation_id=reservation_id, allocated=True,
+        table_id=allocation.table_id, joined_table_ids=list(allocation.joined_table_ids),
+        capacity=allocation.capacity, area=allocation.area
+    )
+
+# --- TABLE CATALOGUE ---
+
+@router.post("/tables", response_model=TableResponse)
+def create_table(request: TableCreateRequest, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+    table = RestaurantTableORM(
+        label=request.label, capacity=request.capacity, area=request.area,
+        position=request.position, is_active=True
+    )
+    db.add(table)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Table label already exists.")
+    db.refresh(table)
+    ensure_loaded(db).add_table(table.table_id, table.area)
+    return TableResponse.model_validate(table, from_attributes=True)
+
+@router.get("/tables", response_model=List[TableResponse])
+def list_tables(db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+    tables = db.query(RestaurantTableORM).order_by(RestaurantTableORM.area, RestaurantTableORM.position).all()
+    return [TableResponse.model_validate(t, from_attributes=True) for t in tables]
+
+# --- ALLOCATION ---
+
+@router.post("/reservations/{reservation_id}/auto-assign", response_model=AllocationResult)
+def auto_assign_table(reservation_id: UUID, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+    repo = ReservationRepository(db)
+    with transition_errors():
+        reservation = repo.get(reservation_id)
+
+    booking = booking_request(reservation)
+    allocation = load_allocator(db).allocate(booking)
+    if allocation is None:
+        raise HTTPException(status_code=409, detail="No free table fits this party.")
+
+    table_ids = (allocation.table_id, *allocation.joined_table_ids)
+    with holding_tables(table_ids):
+        # the tables were picked before the lock; another request may have taken one since
+        if any(availability_index.conflicts(tid, booking.start, booking.end, ignore=reservation_id)
+               for tid in table_ids):
+            raise HTTPException(status_code=409, detail=TABLE_TAKEN)
+        seat(reservation, allocation.to_assignment())
+        commit_changes(repo)
+    return allocation_result(reservation_id, allocation)
+
+@router.post("/allocations:batch", response_model=BatchAllocationResponse)
+def allocate_evening(request: BatchAllocationRequest, db: Session = Depends(get_db), current_user: str = Depends(get_current_user)):
+    if request.end <= request.start:
+        raise HTTPException(status_code=400, detail="end must be after start.")
+
+    repo = ReservationRepository(db)
+    pending = repo.hydrate(db.execute(select(ReservationORM.__table__).where(
+        ReservationORM.table_id.is_(None),
+        ReservationORM.status.in_(("PENDING", "CONFIRMED")),
+        ReservationORM.start_time >= request.start,
+        ReservationORM.start_time < request.end,
+    )))
+
+    started = time.perf_counter()
+    allocator = load_allocator(db)
+    bookings = [booking_request(reservation) for reservation in pending]
+    if request.area:
+        bookings = [BookingRequest(b.reservation_id, b.party_size, b.start, b.end, request.area) for b in bookings]
+    allocations = allocator.allocate_batch(bookings)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for reservation_id, allocation in allocations.items():
+        if allocation is not None:
+            seat(repo.get(reservation_id), allocation.to_assignment())
+    commit_changes(repo)
+    seated = repo.saved
+
+    results = [allocation_result(rid, allocation) for rid, allocation in allocations.items()]
+    return BatchAllocationResponse(
+        allocated=len(seated), unallocated=len(results) - len(seated),
+        elapsed_ms=round(elapsed_ms, 3), results=results
+    )
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+class PasswordPoolBusy(Exception):
+    pass
+
+class PasswordPool:
+    """Small dedicated pool for bcrypt work, kept off the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without a process pool's pickling and startup cost. At most `workers`
+    hashes run at once and `max_pending` more may wait; beyond that calls are
+    rejected with PasswordPoolBusy instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self.submitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy("Too many password checks in progress")
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable, *args):
+        self._acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # the slot is held until the hash finishes, even if the caller is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    def run_sync(self, fn: Callable, *args):
+        self._acquire()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+password_pool = PasswordPool(
+    workers=int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv("PASSWORD_POOL_MAX_PENDING", "32")),
+)
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RevocationIndex:
+    """Revoked access-token ids held in memory, so the per-request check is a set lookup.
+
+    Revocations made by this process land immediately; those made by other
+    workers arrive with the next refresh from the database, at most
+    `refresh_interval` seconds later. Entries are dropped once the token
+    would have expired anyway.
+
+    One caller refreshes at a time. While it does, the others keep checking
+    against the current set instead of each querying the table; only
+    before the first load do they wait for it.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Iterable[Tuple[str, float]]]] = None,
+                 refresh_interval: float = 5.0, clock: Callable[[], float] = time.time):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._revoked = {}
+        self._refreshed_at = None
+
+    def __len__(self):
+        return len(self._revoked)
+
+    @property
+    def stale(self) -> bool:
+        return self.loader is not None and (
+            self._refreshed_at is None or self._clock() - self._refreshed_at >= self.refresh_interval
+        )
+
+    @property
+    def due(self) -> bool:
+        """Stale, and not already being refreshed by another caller."""
+        return self.stale and (self._refreshed_at is None or not self._refresh_lock.locked())
+
+    def add(self, jti: str, expires_at: float):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def refresh(self):
+        if not self._refresh_lock.acquire(blocking=self._refreshed_at is None):
+            return
+        try:
+            # another caller may have refreshed while this one waited
+            if self.stale:
+                self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self):
+        now = self._clock()
+        try:
+            loaded = {jti: exp for jti, exp in self.loader() if exp > now}
+        except Exception:
+            # keep what we have (local revocations still apply) and retry next interval
+            logger.warning("Could not refresh the token revocation list", exc_info=True)
+            with self._lock:
+                self._refreshed_at = now
+            return
+        with self._lock:
+            for jti, exp in self._revoked.items():
+                if exp > now:
+                    loaded.setdefault(jti, exp)
+            self._revoked = loaded
+            self._refreshed_at = now
+
+    def clear(self):
+        with self._lock:
+            self._revoked = {}
+            self._refreshed_at = None
+
+revoked_tokens = RevocationIndex()
@@ -1,10 +1,17 @@
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
+from jose import jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
+from src.core.tokens import TokenVerifier, Principal, InvalidToken, build_backend
+from src.core.password_pool import password_pool
+from src.core.revocation import revoked_tokens
+from src.infrastructure.instrumentation import timed
+from starlette.concurrency import run_in_threadpool
+
 SECRET_KEY = "Tubes TST"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -25,6 +32,13 @@ def get_password_hash(password: str):
     hashed = bcrypt.hashpw(password_byte, salt)
     return hashed.decode('utf-8')
 
+# bcrypt takes ~100+ ms; async callers must use these so the event loop keeps serving
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str):
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,17 +50,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# Decoded-token cache in front of the JWT library (JWT_BACKEND=jose|pyjwt).
+token_verifier = TokenVerifier(
+    build_backend(SECRET_KEY, [ALGORITHM]),
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
+        with timed("auth"):
+            principal = token_verifier.verify(token)
+    except InvalidToken:
         raise credentials_exception
-    return username
\ No newline at end of file
+    # revocation is a set lookup; the set reloads from the DB every few seconds,
+    # by one request at a time
+    if revoked_tokens.due:
+        await run_in_threadpool(revoked_tokens.refresh)
+    if principal.token_id and revoked_tokens.is_revoked(principal.token_id):
+        raise credentials_exception
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    return (await get_current_principal(token)).username
+
+async def get_current_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if "admin" not in principal.roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required.")
+    return principal
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+class InvalidToken(Exception):
+    pass
+
+@dataclass(frozen=True)
+class Principal:
+    username: str
+    roles: Tuple[str, ...] = ()
+    token_id: Optional[str] = None
+    expires_at: Optional[float] = None
+
+class JoseBackend:
+    """python-jose, the library the tokens were always issued with."""
+
+    def __init__(self, secret: str, algorithms: Sequence[str]):
+        from jose import JWTError, jwt
+        self._jwt, self._error = jwt, JWTError
+        self.secret, self.algorithms = secret, list(algorithms)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except self._error as e:
+            raise InvalidToken(str(e)) from e
+
+class PyJWTBackend:
+    """PyJWT (optional dependency): same tokens, noticeably cheaper to verify."""
+
+    def __init__(self, secret: str, algorithms: Sequence[str]):
+        import jwt
+        self._jwt = jwt
+        self.secret, self.algorithms = secret, list(algorithms)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except self._jwt.PyJWTError as e:
+            raise InvalidToken(str(e)) from e
+
+BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+def claims_principal(payload: dict) -> Principal:
+    username = payload.get("sub")
+    if username is None:
+        raise InvalidToken("Token has no subject")
+    return Principal(
+        username=username, roles=tuple(payload.get("roles", ())),
+        token_id=payload.get("jti"), expires_at=payload.get("exp")
+    )
+
+class TokenVerifier:
+    """Verify bearer tokens once and remember the result until they expire.
+
+    Entries are keyed by the SHA-256 of the token, held in a bounded LRU, and
+    dropped at the token's `exp`, so a cached answer is never one the backend
+    would have refused. `resolver` turns the claims into a Principal (e.g. by
+    loading the user and roles) and runs only on a miss; `resolve_ttl` caps
+    how long its answer is trusted. Invalid tokens are not cached.
+    """
+
+    def __init__(self, backend, resolver: Callable[[dict], Principal] = claims_principal,
+                 maxsize: int = 4096, resolve_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.resolver = resolver
+        self.maxsize = maxsize
+        self.resolve_ttl = resolve_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[float, Principal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def verify(self, token: str) -> Principal:
+        key = self._key(token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+
+        payload = self.backend.decode(token)
+        principal = self.resolver(payload)
+        expires = float(payload.get("exp", now))
+        if self.resolve_ttl is not None:
+            expires = min(expires, now + self.resolve_ttl)
+        if expires > now:
+            with self._lock:
+                self._entries[key] = (expires, principal)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def forget(self, token: str):
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def build_backend(secret: str, algorithms: Sequence[str], kind: Optional[str] = None):
+    kind = (kind or os.getenv("JWT_BACKEND", "jose")).lower()
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown JWT_BACKEND: {kind}")
+    return BACKENDS[kind](secret, algorithms)
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from .availability import AvailabilityIndex
+from .models import TableAssignment
+
+@dataclass(frozen=True, slots=True)
+class TableSpec:
+    table_id: UUID
+    capacity: int
+    area: str
+    position: int = 0
+
+@dataclass(frozen=True, slots=True)
+class BookingRequest:
+    reservation_id: UUID
+    party_size: int
+    start: datetime
+    end: datetime
+    area: Optional[str] = None
+
+@dataclass(frozen=True, slots=True)
+class Allocation:
+    tables: Tuple[TableSpec, ...]
+
+    @property
+    def table_id(self) -> UUID:
+        return self.tables[0].table_id
+
+    @property
+    def joined_table_ids(self) -> Tuple[UUID, ...]:
+        return tuple(t.table_id for t in self.tables[1:])
+
+    @property
+    def capacity(self) -> int:
+        return sum(t.capacity for t in self.tables)
+
+    @property
+    def area(self) -> str:
+        return self.tables[0].area
+
+    def to_assignment(self) -> TableAssignment:
+        return TableAssignment(self.table_id, self.capacity, self.area, self.joined_table_ids)
+
+_NO_NEIGHBOUR = timedelta.max
+
+class TableAllocator:
+    """Best-fit table allocation on top of the availability index.
+
+    A party gets the smallest free table that seats it; among tables of that
+    size the one whose previous booking ends closest to the start wins, which
+    keeps long free stretches intact for later bookings. If no single table
+    fits, up to `max_joined` adjacent tables (consecutive positions in one
+    area) are pushed together, picking the smallest total capacity.
+    """
+
+    def __init__(self, tables: Iterable[TableSpec], availability: AvailabilityIndex, max_joined: int = 3):
+        self.availability = availability
+        self.max_joined = max_joined
+        self.tables = sorted(tables, key=lambda t: (t.capacity, t.area, t.position))
+        self._runs: Dict[str, List[TableSpec]] = {}
+        for table in sorted(self.tables, key=lambda t: (t.area, t.position)):
+            self._runs.setdefault(table.area, []).append(table)
+        # bookings placed by this allocator that are not in the index yet
+        self._tentative: Dict[UUID, List[Tuple[datetime, datetime]]] = {}
+
+    def _is_free(self, table: TableSpec, booking: BookingRequest) -> bool:
+        if not self.availability.is_free(table.table_id, booking.start, booking.end, ignore=booking.reservation_id):
+            return False
+        return all(e <= booking.start or s >= booking.end for s, e in self._tentative.get(table.table_id, ()))
+
+    def _gap_before(self, table: TableSpec, start: datetime) -> timedelta:
+        ends = [e for _, e in self._tentative.get(table.table_id, ()) if e <= start]
+        indexed = self.availability.last_end_before(table.table_id, start)
+        if indexed is not None:
+            ends.append(indexed)
+        return start - max(ends) if ends else _NO_NEIGHBOUR
+
+    def best_fit(self, booking: BookingRequest) -> Optional[Allocation]:
+        best, best_gap = None, None
+        for table in self.tables:
+            if table.capacity < booking.party_size or (booking.area and table.area != booking.area):
+                continue
+            if best is not None and table.capacity > best.capacity:
+                break
+            if not self._is_free(table, booking):
+                continue
+            gap = self._gap_before(table, booking.start)
+            if best is None or gap < best_gap:
+                best, best_gap = table, gap
+        if best is not None:
+            return Allocation((best,))
+        return self._best_joined(booking)
+
+    def _best_joined(self, booking: BookingRequest) -> Optional[Allocation]:
+        best, best_key = None, None
+        for area, run in self._runs.items():
+            if booking.area and area != booking.area:
+                continue
+            for i in range(len(run)):
+                combo, total = [], 0
+                for table in run[i:i + self.max_joined]:
+                    if combo and table.position != combo[-1].position + 1:
+                        break
+                    if not self._is_free(table, booking):
+                        break
+                    combo.append(table)
+                    total += table.capacity
+                    if total >= booking.party_size:
+                        key = (total, len(combo))
+                        if len(combo) > 1 and (best_key is None or key < best_key):
+                            best, best_key = tuple(combo), key
+                        break
+        return Allocation(best) if best else None
+
+    def reserve(self, booking: BookingRequest, allocation: Allocation):
+        for table in allocation.tables:
+            self._tentative.setdefault(table.table_id, []).append((booking.start, booking.end))
+
+    def allocate(self, booking: BookingRequest) -> Optional[Allocation]:
+        allocation = self.best_fit(booking)
+        if allocation:
+            self.reserve(booking, allocation)
+        return allocation
+
+    def allocate_batch(self, bookings: Iterable[BookingRequest]) -> Dict[UUID, Optional[Allocation]]:
+        # Interval scheduling order: sweep by start time, and at equal start
+        # seat the largest parties first so they get the few big tables before
+        # small parties use them up (first-fit decreasing within a time slot).
+        ordered = sorted(bookings, key=lambda b: (b.start, -b.party_size))
+        return {booking.reservation_id: self.allocate(booking) for booking in ordered}
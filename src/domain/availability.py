@@ -0,0 +1,220 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+Interval = Tuple[datetime, datetime]
+
+_start = itemgetter(0)
+
+class TableSchedule:
+    """Bookings of one table as half-open [start, end) intervals sorted by start.
+
+    Overlap queries only need to look at bookings that start inside
+    (start - longest booking, end), which bisect finds in O(log n).
+    """
+
+    def __init__(self, area: Optional[str] = None):
+        self.area = area
+        self._entries: List[Tuple[datetime, datetime, UUID]] = []
+        self._longest = timedelta(0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, reservation_id: UUID, start: datetime, end: datetime):
+        insort(self._entries, (start, end, reservation_id), key=_start)
+        self._longest = max(self._longest, end - start)
+
+    def bulk_load(self, entries: List[Tuple[datetime, datetime, UUID]]):
+        self._entries.extend(entries)
+        self._entries.sort(key=_start)
+        if entries:
+            self._longest = max(self._longest, max(e - s for s, e, _ in entries))
+
+    def remove(self, reservation_id: UUID, start: datetime) -> bool:
+        i = bisect_left(self._entries, start, key=_start)
+        while i < len(self._entries) and self._entries[i][0] == start:
+            if self._entries[i][2] == reservation_id:
+                del self._entries[i]
+                return True
+            i += 1
+        return False
+
+    def _around(self, start: datetime, end: datetime):
+        lo = bisect_left(self._entries, start - self._longest, key=_start)
+        hi = bisect_left(self._entries, end, key=_start)
+        return self._entries[lo:hi]
+
+    def conflicts(self, start: datetime, end: datetime, ignore: Optional[UUID] = None) -> List[UUID]:
+        return [rid for s, e, rid in self._around(start, end) if e > start and rid != ignore]
+
+    def last_end_before(self, start: datetime) -> Optional[datetime]:
+        # only looks back one "longest booking"; older ends count as no neighbour
+        ends = [e for _, e, _ in self._around(start, start) if e <= start]
+        return max(ends) if ends else None
+
+    def free(self, start: datetime, end: datetime, min_length: timedelta) -> List[Interval]:
+        gaps = []
+        cursor = start
+        for s, e, _ in self._around(start, end):
+            if e <= cursor:
+                continue
+            if s - cursor >= min_length:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+            if cursor >= end:
+                break
+        if end - cursor >= min_length:
+            gaps.append((cursor, end))
+        return gaps
+
+
+class AvailabilityIndex:
+    """Per-table interval index of occupied slots, keyed by reservation for updates.
+
+    While a load is reading rows (between begin_load() and load()), every
+    add/remove/add_table is also recorded and replayed over the loaded rows,
+    so a write committed after the rows were read is not lost.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.loaded = False
+            self.loaded_at: Optional[float] = None
+            self._loads = 0
+            self._pending: Optional[list] = None
+            self._tables: Dict[UUID, TableSchedule] = {}
+            self._bookings: Dict[UUID, List[Tuple[UUID, datetime]]] = {}
+
+    @property
+    def loading(self) -> bool:
+        return self._loads > 0
+
+    def age(self) -> float:
+        return time.monotonic() - self.loaded_at if self.loaded_at is not None else float("inf")
+
+    def begin_load(self):
+        with self._lock:
+            if not self._loads:
+                self._pending = []
+            self._loads += 1
+
+    def abort_load(self):
+        with self._lock:
+            self._loads = max(self._loads - 1, 0)
+            if not self._loads:
+                self._pending = None
+
+    def _record(self, *call):
+        if self._pending is not None:
+            self._pending.append(call)
+
+    def load(self, rows: Iterable[Tuple[UUID, UUID, Optional[str], datetime, datetime]]):
+        # group first and sort each table once instead of insort per row
+        grouped: Dict[UUID, list] = {}
+        with self._lock:
+            pending, loads = self._pending, self._loads
+            self.reset()
+            areas: Dict[UUID, Optional[str]] = {}
+            for reservation_id, table_id, area, start, end in rows:
+                entries = grouped.get(table_id)
+                if entries is None:
+                    entries = grouped[table_id] = []
+                entries.append((start, end, reservation_id))
+                self._bookings.setdefault(reservation_id, []).append((table_id, start))
+                if area:
+                    areas[table_id] = area
+            for table_id, entries in grouped.items():
+                schedule = self._tables[table_id] = TableSchedule(areas.get(table_id))
+                schedule.bulk_load(entries)
+            for name, *args in pending or ():
+                getattr(self, name)(*args)
+            if loads > 1:
+                # another load is still reading; it replays the same writes
+                self._loads, self._pending = loads - 1, pending
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def add(
+        self, reservation_id: UUID, table_id: UUID, start: datetime, end: datetime,
+        area: Optional[str] = None, joined_table_ids: Iterable[UUID] = ()
+    ):
+        with self._lock:
+            joined_table_ids = tuple(joined_table_ids)
+            self._record("_add", reservation_id, table_id, start, end, area, joined_table_ids)
+            self._add(reservation_id, table_id, start, end, area, joined_table_ids)
+
+    def _add(self, reservation_id, table_id, start, end, area, joined_table_ids):
+        self._remove(reservation_id)
+        booked = []
+        for tid in (table_id, *joined_table_ids):
+            self._add_table(tid, area)
+            self._tables[tid].add(reservation_id, start, end)
+            booked.append((tid, start))
+        self._bookings[reservation_id] = booked
+
+    def remove(self, reservation_id: UUID):
+        with self._lock:
+            self._record("_remove", reservation_id)
+            self._remove(reservation_id)
+
+    def _remove(self, reservation_id):
+        for table_id, start in self._bookings.pop(reservation_id, ()):
+            self._tables[table_id].remove(reservation_id, start)
+
+    def add_table(self, table_id: UUID, area: Optional[str] = None):
+        with self._lock:
+            self._record("_add_table", table_id, area)
+            self._add_table(table_id, area)
+
+    def _add_table(self, table_id, area):
+        schedule = self._tables.get(table_id)
+        if schedule is None:
+            schedule = self._tables[table_id] = TableSchedule(area)
+        elif area:
+            schedule.area = area
+
+    def tables_of(self, reservation_id: UUID) -> List[UUID]:
+        return [tid for tid, _ in self._bookings.get(reservation_id, ())]
+
+    def table_area(self, table_id: UUID) -> Optional[str]:
+        schedule = self._tables.get(table_id)
+        return schedule.area if schedule else None
+
+    def tables(self, area: Optional[str] = None) -> List[UUID]:
+        return [tid for tid, s in self._tables.items() if area is None or s.area == area]
+
+    def conflicts(self, table_id: UUID, start: datetime, end: datetime, ignore: Optional[UUID] = None) -> List[UUID]:
+        with self._lock:
+            schedule = self._tables.get(table_id)
+            return schedule.conflicts(start, end, ignore) if schedule else []
+
+    def is_free(self, table_id: UUID, start: datetime, end: datetime, ignore: Optional[UUID] = None) -> bool:
+        return not self.conflicts(table_id, start, end, ignore)
+
+    def last_end_before(self, table_id: UUID, start: datetime) -> Optional[datetime]:
+        with self._lock:
+            schedule = self._tables.get(table_id)
+            return schedule.last_end_before(start) if schedule else None
+
+    def free_slots(
+        self, start: datetime, end: datetime, min_length: timedelta,
+        table_ids: Optional[Iterable[UUID]] = None, area: Optional[str] = None
+    ) -> Dict[UUID, List[Interval]]:
+        with self._lock:
+            ids = table_ids if table_ids is not None else self.tables(area)
+            result = {}
+            for table_id in ids:
+                schedule = self._tables.get(table_id)
+                result[table_id] = schedule.free(start, end, min_length) if schedule else (
+                    [(start, end)] if end - start >= min_length else []
+                )
+            return result
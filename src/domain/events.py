@@ -1,20 +1,28 @@
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
-from pydantic import BaseModel
 
-class DomainEvent(BaseModel):
-    event_id: uuid.UUID = uuid.uuid4()
-    occurred_on: datetime = datetime.now()
+# Every event gets its own id and timestamp (default factories, not defaults
+# evaluated once at import). Slotted frozen dataclasses: events are created on
+# every state change, so they stay small and cheap to build.
 
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DomainEvent:
+    event_id: uuid.UUID = field(default_factory=uuid.uuid4)
+    occurred_on: datetime = field(default_factory=datetime.now)
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class ReservationCreated(DomainEvent):
     reservation_id: uuid.UUID
     customer_id: uuid.UUID
     start_time: datetime
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class ReservationConfirmed(DomainEvent):
     reservation_id: uuid.UUID
     confirmed_by: str = "SYSTEM"
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class ReservationCancelled(DomainEvent):
     reservation_id: uuid.UUID
-    reason: str
\ No newline at end of file
+    reason: str
@@ -1,92 +1,185 @@
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from .value_objects import (
-    ReservationStatus, ContactInfo, ReservationTime, 
+    ReservationStatus, ContactInfo, ReservationTime,
     ReservationPolicy, CancellationReason,
     PaymentDetail
 )
 from .events import DomainEvent, ReservationCreated, ReservationConfirmed, ReservationCancelled
+from .transitions import TRANSITIONS
+
+# Aggregates are slotted (no per-instance __dict__) so that batch work such as
+# the evening allocation can hold many of them. Ids nobody stores are only
+# generated when first read.
 
 class TableAssignment:
-    def __init__(self, table_id: uuid.UUID, capacity: int, area: str):
-        self.assignment_id = uuid.uuid4()
+    __slots__ = ("_assignment_id", "table_id", "capacity", "area", "joined_table_ids")
+
+    # capacity is None when rebuilt from storage, which only keeps table and area
+    def __init__(self, table_id: uuid.UUID, capacity: Optional[int], area: str, joined_table_ids: Tuple[uuid.UUID, ...] = ()):
+        self._assignment_id = None
         self.table_id = table_id
         self.capacity = capacity
         self.area = area
+        self.joined_table_ids = tuple(joined_table_ids)
+
+    @property
+    def assignment_id(self) -> uuid.UUID:
+        if self._assignment_id is None:
+            self._assignment_id = uuid.uuid4()
+        return self._assignment_id
 
 class ReservationHistory:
+    __slots__ = ("_history_id", "timestamp", "action", "note")
+
     def __init__(self, action: str, note: str = ""):
-        self.history_id = uuid.uuid4()
+        self._history_id = None
         self.timestamp = datetime.now()
         self.action = action
         self.note = note
 
+    @property
+    def history_id(self) -> uuid.UUID:
+        if self._history_id is None:
+            self._history_id = uuid.uuid4()
+        return self._history_id
+
 class Reservation:
+    __slots__ = (
+        "reservation_id", "customer_id", "contact_info", "reservation_time", "_policy", "party_size",
+        "status", "_payment_detail", "table_assignment", "_history", "_domain_events",
+    )
+
     def __init__(
-        self, 
-        customer_id: uuid.UUID, 
-        contact_info: ContactInfo, 
+        self,
+        customer_id: uuid.UUID,
+        contact_info: ContactInfo,
         reservation_time: ReservationTime,
-        policy: ReservationPolicy
+        policy: ReservationPolicy,
+        party_size: int = 2
     ):
         self.reservation_id = uuid.uuid4()
         self.customer_id = customer_id
         self.contact_info = contact_info
         self.reservation_time = reservation_time
-        self.policy = policy
-        
+        self._policy = policy
+        self.party_size = party_size
+
         self.status = ReservationStatus.PENDING
-        self.payment_detail = PaymentDetail()
-        
+        self._payment_detail = None
+
         self.table_assignment: Optional[TableAssignment] = None
-        self.history: List[ReservationHistory] = []
-        
-        self.domain_events: List[DomainEvent] = []
-        
+        self._history: Optional[List[ReservationHistory]] = None
+        self._domain_events: Optional[List[DomainEvent]] = None
+
         self._record_history("CREATED", "Reservation created")
-        
-        self.domain_events.append(ReservationCreated(
+
+        self._raise(ReservationCreated(
             reservation_id=self.reservation_id,
             customer_id=self.customer_id,
             start_time=self.reservation_time.start_time
         ))
 
+    @classmethod
+    def restore(
+        cls,
+        reservation_id: uuid.UUID,
+        customer_id: uuid.UUID,
+        contact_info: ContactInfo,
+        reservation_time: ReservationTime,
+        status: ReservationStatus,
+        party_size: int = 2,
+        payment_detail: Optional[PaymentDetail] = None,
+        table_assignment: Optional[TableAssignment] = None,
+        policy: Optional[ReservationPolicy] = None
+    ) -> "Reservation":
+        """Rebuild a stored reservation: no new id, history entry or creation event."""
+        self = cls.__new__(cls)
+        self.reservation_id = reservation_id
+        self.customer_id = customer_id
+        self.contact_info = contact_info
+        self.reservation_time = reservation_time
+        self._policy = policy
+        self.party_size = party_size
+        self.status = status
+        self._payment_detail = payment_detail
+        self.table_assignment = table_assignment
+        self._history = None
+        self._domain_events = None
+        return self
+
+    # Defaults, history and events are created on first use: a reservation
+    # loaded for reading or allocation never needs them.
+
+    @property
+    def policy(self) -> ReservationPolicy:
+        if self._policy is None:
+            self._policy = ReservationPolicy()
+        return self._policy
+
+    @property
+    def payment_detail(self) -> PaymentDetail:
+        if self._payment_detail is None:
+            self._payment_detail = PaymentDetail()
+        return self._payment_detail
+
+    @property
+    def history(self) -> List[ReservationHistory]:
+        if self._history is None:
+            self._history = []
+        return self._history
+
+    @property
+    def domain_events(self) -> List[DomainEvent]:
+        if self._domain_events is None:
+            self._domain_events = []
+        return self._domain_events
+
     def _record_history(self, action: str, note: str):
         log = ReservationHistory(action, note)
         self.history.append(log)
 
-    def confirm_reservation(self):
-        if self.status == ReservationStatus.CANCELLED:
-            raise ValueError("Cannot confirm a cancelled reservation.")
-        
-        self.status = ReservationStatus.CONFIRMED
+    def _raise(self, event: DomainEvent):
+        self.domain_events.append(event)
+
+    def _transition(self, action: str):
+        # the same rules the batch endpoints apply (src/domain/transitions.py)
+        self.status = ReservationStatus(TRANSITIONS[action].check(self.status))
+
+    def confirm_reservation(self, confirmed_by: str = "SYSTEM"):
+        self._transition("confirm")
         self._record_history("CONFIRMED", "Reservation confirmed by system/staff")
-        
-        self.domain_events.append(ReservationConfirmed(
-            reservation_id=self.reservation_id
+
+        self._raise(ReservationConfirmed(
+            reservation_id=self.reservation_id,
+            confirmed_by=confirmed_by
         ))
 
+    def check_in(self):
+        self._transition("check_in")
+        self._record_history("CHECKED_IN", "Customer checked in")
+
+    def complete(self):
+        self._transition("complete")
+        self._record_history("COMPLETED", "Reservation completed")
+
     def cancel_reservation(self, reason: CancellationReason):
-        if self.status == ReservationStatus.COMPLETED:
-            raise ValueError("Cannot cancel a completed reservation.")
-            
-        self.status = ReservationStatus.CANCELLED
+        self._transition("cancel")
         self._record_history("CANCELLED", f"{reason.reason_code}: {reason.description}")
-        
-        self.domain_events.append(ReservationCancelled(
+
+        self._raise(ReservationCancelled(
             reservation_id=self.reservation_id,
             reason=reason.reason_code
         ))
 
-    def assign_table(self, table_id: uuid.UUID, capacity: int, area: str):
-        if self.status == ReservationStatus.CANCELLED:
-            raise ValueError("Cannot assign table to cancelled reservation.")
-            
-        self.table_assignment = TableAssignment(table_id, capacity, area)
+    def assign_table(self, table_id: uuid.UUID, capacity: Optional[int], area: str, joined_table_ids: Tuple[uuid.UUID, ...] = ()):
+        self._transition("assign_table")
+
+        self.table_assignment = TableAssignment(table_id, capacity, area, joined_table_ids)
         self._record_history("TABLE_ASSIGNED", f"Assigned to Table ID {table_id} ({area})")
-        
+
     def collect_domain_events(self) -> List[DomainEvent]:
-        events = self.domain_events[:]
-        self.domain_events.clear()
-        return events
\ No newline at end of file
+        events = self._domain_events or []
+        self._domain_events = None
+        return events
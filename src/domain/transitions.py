@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+from .value_objects import ReservationStatus
+
+ALL_STATUSES = frozenset(s.value for s in ReservationStatus)
+
+class InvalidTransition(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class Transition:
+    action: str
+    allowed_from: FrozenSet[str]
+    target: Optional[str]
+    error: str
+
+    def check(self, current: str) -> str:
+        if current not in self.allowed_from:
+            raise InvalidTransition(self.error)
+        return self.target or current
+
+TRANSITIONS: Dict[str, Transition] = {
+    "confirm": Transition(
+        "confirm", ALL_STATUSES - {"CANCELLED"}, "CONFIRMED",
+        "Cannot confirm cancelled reservation."
+    ),
+    "check_in": Transition(
+        "check_in", frozenset({"CONFIRMED"}), "CHECKED_IN",
+        "Reservation must be CONFIRMED to check-in."
+    ),
+    "complete": Transition(
+        "complete", frozenset({"CHECKED_IN"}), "COMPLETED",
+        "Customer must be CHECKED_IN to complete."
+    ),
+    "cancel": Transition(
+        "cancel", ALL_STATUSES - {"COMPLETED"}, "CANCELLED",
+        "Cannot cancel completed reservation."
+    ),
+    "assign_table": Transition(
+        "assign_table", ALL_STATUSES - {"CANCELLED"}, None,
+        "Cannot assign table to cancelled reservation."
+    ),
+}
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.domain.availability import AvailabilityIndex
+from src.infrastructure.database import SessionLocal, on_event_loop
+from src.infrastructure.orm_models import ReservationORM, ReservationTableORM, RestaurantTableORM, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose table stays blocked for the booked slot.
+OCCUPYING_STATUSES = ("PENDING", "CONFIRMED", "CHECKED_IN", "COMPLETED")
+
+# One index per worker process. It is loaded lazily from `reservations`, kept
+# current by the write paths in this process, and reloaded in the background
+# once it is older than AVAILABILITY_REFRESH seconds, so bookings made by other
+# workers show up within that window. Requests keep using the current copy
+# while the reload runs. Only bookings that started less than
+# AVAILABILITY_LOOKBACK_HOURS ago are loaded: older ones are over and can't
+# clash with a new booking, and skipping them keeps both the load and the
+# index bounded as history grows. On Postgres the exclusion constraint from
+# migration 5c9d2e7f1a40 is the cross-worker backstop for
+# reservations.table_id; it does not cover the joined tables in
+# reservation_tables.
+availability_index = AvailabilityIndex()
+
+AVAILABILITY_REFRESH = float(os.getenv("AVAILABILITY_REFRESH", "30"))
+AVAILABILITY_LOOKBACK = timedelta(hours=float(os.getenv("AVAILABILITY_LOOKBACK_HOURS", "24")))
+
+_refreshing = threading.Lock()
+refresh_thread: Optional[threading.Thread] = None
+
+_table_locks: Dict[object, threading.Lock] = {}
+_table_locks_guard = threading.Lock()
+
+class TableBusy(RuntimeError):
+    """Another request is booking the table, and this one can't wait for it."""
+
+def booking_end(start_time, duration_minutes):
+    return start_time + timedelta(minutes=duration_minutes or 0)
+
+def ensure_loaded(db: Session) -> AvailabilityIndex:
+    if not availability_index.loaded:
+        # nothing to serve yet
+        load_index(db)
+    elif availability_index.age() >= AVAILABILITY_REFRESH:
+        start_refresh()
+    return availability_index
+
+def load_index(db: Session):
+    availability_index.begin_load()
+    try:
+        rows, tables = _read_index(db, utcnow() - AVAILABILITY_LOOKBACK)
+    except BaseException:
+        availability_index.abort_load()
+        raise
+    availability_index.load(rows)
+    for table_id, area in tables:
+        availability_index.add_table(table_id, area)
+
+def start_refresh():
+    """Reload the index on a thread of its own, unless a reload is already running."""
+    global refresh_thread
+    if not _refreshing.acquire(blocking=False):
+        return
+    refresh_thread = threading.Thread(target=_refresh, name="availability-refresh", daemon=True)
+    refresh_thread.start()
+
+def _refresh():
+    try:
+        with SessionLocal() as db:
+            load_index(db)
+    except Exception:
+        # keep serving the current copy; the next request past the interval retries
+        logger.warning("Could not refresh the availability index", exc_info=True)
+    finally:
+        _refreshing.release()
+
+def _read_index(db: Session, since: datetime):
+    # one pass: each booking with its joined tables, if any, outer-joined on
+    rows = db.execute(
+        select(
+            ReservationORM.reservation_id, ReservationORM.table_id, ReservationORM.table_area,
+            ReservationORM.start_time, ReservationORM.duration_minutes, ReservationTableORM.table_id,
+        ).outerjoin(ReservationTableORM, ReservationTableORM.reservation_id == ReservationORM.reservation_id)
+        .where(
+            ReservationORM.table_id.is_not(None), ReservationORM.status.in_(OCCUPYING_STATUSES),
+            ReservationORM.start_time >= since,
+        )
+    )
+    bookings, seen = [], set()
+    for rid, table_id, area, start, duration, joined_id in rows:
+        end = booking_end(start, duration)
+        if rid not in seen:
+            seen.add(rid)
+            bookings.append((rid, table_id, area, start, end))
+        if joined_id is not None:
+            bookings.append((rid, joined_id, area, start, end))
+    tables = db.execute(
+        select(RestaurantTableORM.table_id, RestaurantTableORM.area).where(RestaurantTableORM.is_active)
+    ).all()
+    return bookings, tables
+
+@contextmanager
+def booking_tables(table_ids: Iterable):
+    """Hold these tables from the overlap check until the booking commits.
+
+    Without it two requests in this worker could both find a slot free in the
+    index and both commit. Locks are taken in a fixed order. On the event
+    loop's thread (the async router) waiting would stall every request, so a
+    busy table raises TableBusy instead.
+    """
+    ids = sorted(set(table_ids), key=str)
+    with _table_locks_guard:
+        locks = [_table_locks.setdefault(table_id, threading.Lock()) for table_id in ids]
+    wait = not on_event_loop()
+    held = []
+    try:
+        for lock in locks:
+            if not lock.acquire(blocking=wait):
+                raise TableBusy("Another request is booking this table, retry.")
+            held.append(lock)
+        yield
+    finally:
+        for lock in reversed(held):
+            lock.release()
+
+def sync_reservation(row, joined_table_ids: Optional[Iterable] = None):
+    """Mirror a written reservation row into the index (no-op until a load starts).
+
+    Pass joined_table_ids when the seating changed; status-only transitions
+    leave the indexed tables as they are.
+    """
+    if not (availability_index.loaded or availability_index.loading):
+        return
+    if row.table_id is None or row.status not in OCCUPYING_STATUSES:
+        availability_index.remove(row.reservation_id)
+    elif joined_table_ids is not None or row.table_id not in availability_index.tables_of(row.reservation_id):
+        availability_index.add(
+            row.reservation_id, row.table_id,
+            row.start_time, booking_end(row.start_time, row.duration_minutes), row.table_area,
+            joined_table_ids or ()
+        )
@@ -0,0 +1,43 @@
+"""Bulk writes of new reservation rows: COPY on Postgres (psycopg2), executemany elsewhere."""
+import csv
+import io
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.infrastructure.orm_models import ReservationORM
+
+COLUMNS = (
+    "reservation_id", "customer_id", "status", "start_time", "duration_minutes", "party_size",
+    "contact_name", "contact_phone", "contact_email", "payment_status", "payment_amount",
+)
+# in COPY's CSV format an unquoted empty field is NULL; these are never NULL
+TEXT_COLUMNS = ("status", "contact_name", "contact_phone", "contact_email", "payment_status")
+
+def write_method(db: Session) -> str:
+    return "copy" if db.get_bind().dialect.driver == "psycopg2" else "insert"
+
+def copy_rows(db: Session, rows: List[dict]):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[column] for column in COLUMNS] for row in rows)
+    buffer.seek(0)
+    sql = (
+        f"COPY {ReservationORM.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN "
+        f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(TEXT_COLUMNS)}))"
+    )
+    # the session's own connection, so COPY joins its transaction
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+def write_rows(db: Session, rows: List[dict]):
+    """Append one chunk of new reservations inside the session's transaction."""
+    if not rows:
+        return
+    if write_method(db) == "copy":
+        copy_rows(db, rows)
+    else:
+        db.execute(insert(ReservationORM), rows)
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Type, TypeVar
+
+import orjson
+
+from pydantic import BaseModel
+
+from src.infrastructure.singleflight import read_flights
+
+Model = TypeVar("Model", bound=BaseModel)
+
+class LRUTTLCache:
+    """In-process LRU with a per-entry TTL. Values are stored as-is."""
+
+    def __init__(self, maxsize: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """Any client speaking get/set(ex=)/delete (redis-py, a fake in tests).
+
+    Shared by all workers, so an invalidation in one is seen by every other.
+    Values go over the wire as JSON (models via model_dump_json, dicts via orjson).
+    """
+
+    def __init__(self, client, prefix: str = "resv:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value, ttl: float):
+        data = value.model_dump_json() if isinstance(value, BaseModel) else orjson.dumps(value, default=str)
+        self.client.set(self.prefix + key, data, ex=max(1, int(ttl)))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+class NullCache:
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value, ttl: float):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def clear(self):
+        pass
+
+class ReadThroughCache:
+    """get_or_load() in front of a backend, with hit/miss counters.
+
+    A key being loaded has a generation that invalidate() bumps. If it changed
+    while the loader ran, the loaded value may predate the write and is
+    returned without being stored. Generations are per process: they cover
+    the writes this worker makes.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else NullCache()
+        self._lock = threading.Lock()
+        # key -> [loads in flight, generation], only while a load is in flight
+        self._loading = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+            self.discarded = 0
+
+    def get_or_load(self, key: str, model: Optional[Type[Model]], loader: Callable[[], Model], ttl: float) -> Model:
+        """`model` decodes values a remote backend hands back as JSON; None means plain dicts."""
+        cached = self.backend.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            if isinstance(cached, (str, bytes)):
+                return model.model_validate_json(cached) if model else orjson.loads(cached)
+            return cached
+        with self._lock:
+            self.misses += 1
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = [0, 0]
+            loading[0] += 1
+            generation = loading[1]
+        try:
+            # loader errors (e.g. 404) propagate and are not cached
+            value = loader()
+        finally:
+            with self._lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[key]
+        with self._lock:
+            # under the lock, so an invalidate() can't fall between the check and the set
+            if loading[1] == generation:
+                self.backend.set(key, value, ttl)
+            else:
+                self.discarded += 1
+        return value
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                loading = self._loading.get(key)
+                if loading is not None:
+                    loading[1] += 1
+            self.backend.delete(*keys)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            data = {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "discarded": self.discarded,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        if isinstance(self.backend, LRUTTLCache):
+            data["size"] = len(self.backend)
+            data["maxsize"] = self.backend.maxsize
+        return data
+
+def build_backend(kind: Optional[str] = None):
+    kind = (kind or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if kind == "memory":
+        return LRUTTLCache(maxsize=int(os.getenv("CACHE_MAX_ENTRIES", "10000")))
+    if kind == "redis":
+        import redis  # optional dependency, only needed for this backend
+        return RedisCache(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    if kind == "none":
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+# Reservations change rarely once written, stats every few seconds on a busy
+# evening; writes in this process invalidate right away and the TTL bounds how
+# stale another worker's in-process copy can get.
+RESERVATION_TTL = float(os.getenv("CACHE_RESERVATION_TTL", "60"))
+STATS_TTL = float(os.getenv("CACHE_STATS_TTL", "5"))
+STATS_KEY = "stats"
+
+def reservation_key(reservation_id) -> str:
+    return f"reservation:{reservation_id}"
+
+read_cache = ReadThroughCache(build_backend())
+
+def invalidate_reservations(*reservation_ids):
+    read_cache.invalidate(STATS_KEY, *(reservation_key(rid) for rid in reservation_ids))
+    # reads that start from now on must not join one that began before the write
+    read_flights.forget()
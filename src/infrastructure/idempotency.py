@@ -0,0 +1,317 @@
+"""Idempotency keys for writes.
+
+A client retrying a POST after a timeout sends the same Idempotency-Key
+header. It gets the first attempt's response back instead of causing a
+second write.
+
+- The key row is inserted before the write runs, and the handler hands its
+  response over with respond() before it commits. Key, write and response
+  commit together, so a key is taken if and only if its write committed,
+  and a committed key always has its response. On Postgres a concurrent
+  duplicate from another worker blocks on the primary key until the first
+  commits, then fails and replays the stored response.
+- Stored responses are kept in an in-memory LRU, so retries reaching this
+  worker again skip the database.
+- Within one process, requests with the same key run one at a time: the
+  second waits up to IDEMPOTENCY_WAIT seconds for the first, then replays
+  its response without writing.
+- Only responses are stored. A request that raises (400, 404, 409) frees the
+  key, so a corrected retry runs for real.
+- Rows expire after IDEMPOTENCY_TTL seconds. purge_expired() deletes them; it
+  runs at most once per IDEMPOTENCY_PURGE_INTERVAL after a stored response,
+  and from `python -m src.infrastructure.idempotency`.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+import orjson
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.infrastructure.cache import LRUTTLCache
+from src.infrastructure.orm_models import IdempotencyKeyORM, utcnow
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+# how long a duplicate waits for the attempt in flight before giving up with 409
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "10"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "300"))
+IDEMPOTENCY_CACHE_ENTRIES = int(os.getenv("IDEMPOTENCY_CACHE_ENTRIES", "10000"))
+
+class KeyReused(ValueError):
+    """The key was first sent with a different request."""
+
+class KeyInProgress(RuntimeError):
+    """Another request with this key has not finished."""
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+def fingerprint(*parts) -> str:
+    """sha256 over what identifies a request: the operation, its ids and its payload."""
+    return hashlib.sha256(orjson.dumps(parts, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+_CLAIM = "idempotency_claim"
+_RESPONSE = "idempotency_response"
+_COMMITTED = "idempotency_committed"
+
+def _require_response(session: Session):
+    # a key committed without its response could neither be replayed nor run again
+    if _RESPONSE not in session.info:
+        raise RuntimeError("An idempotent handler committed before calling respond().")
+
+def _response_committed(session: Session):
+    session.info[_COMMITTED] = session.info.pop(_RESPONSE)
+
+@contextmanager
+def _claimed(db: Session, key: str, request_fingerprint: str):
+    """While the handler runs: respond() knows the key, and `db` can't commit without a response."""
+    db.info[_CLAIM] = (key, request_fingerprint)
+    event.listen(db, "before_commit", _require_response)
+    event.listen(db, "after_commit", _response_committed)
+    try:
+        yield
+    finally:
+        event.remove(db, "before_commit", _require_response)
+        event.remove(db, "after_commit", _response_committed)
+        for name in (_CLAIM, _RESPONSE, _COMMITTED):
+            db.info.pop(name, None)
+
+def purge_expired(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete expired keys; the caller commits."""
+    result = db.execute(delete(IdempotencyKeyORM).where(IdempotencyKeyORM.expires_at <= (now or utcnow())))
+    return result.rowcount
+
+class _KeyedLocks:
+    """A lock per key, created on first use and dropped once nobody holds or waits for it."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    def _enter(self, key):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [self._factory(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _leave(self, key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    @contextmanager
+    def hold(self, key, timeout: float):
+        """Yields whether another holder had to be waited for."""
+        lock = self._enter(key)
+        try:
+            waited = not lock.acquire(blocking=False)
+            if waited and not lock.acquire(timeout=timeout):
+                raise KeyInProgress("A request with this Idempotency-Key is still being processed.")
+            try:
+                yield waited
+            finally:
+                lock.release()
+        finally:
+            self._leave(key)
+
+    @asynccontextmanager
+    async def hold_async(self, key, timeout: float):
+        lock = self._enter(key)
+        try:
+            waited = lock.locked()
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                raise KeyInProgress("A request with this Idempotency-Key is still being processed.") from None
+            try:
+                yield waited
+            finally:
+                lock.release()
+        finally:
+            self._leave(key)
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, wait: float = IDEMPOTENCY_WAIT,
+                 purge_interval: float = IDEMPOTENCY_PURGE_INTERVAL, cache: Optional[LRUTTLCache] = None):
+        self.ttl = ttl
+        self.wait = wait
+        self.purge_interval = purge_interval
+        self.cache = cache if cache is not None else LRUTTLCache(maxsize=IDEMPOTENCY_CACHE_ENTRIES)
+        self._threads = _KeyedLocks(threading.Lock)
+        self._tasks = _KeyedLocks(asyncio.Lock)
+        self._lock = threading.Lock()
+        self._purged_at = time.monotonic()
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self._lock:
+            self.executed = 0
+            self.replayed = 0
+            self.collapsed = 0
+            self.in_progress = 0
+            self.reused = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def clear(self):
+        self.cache.clear()
+        self.reset_counters()
+
+    # --- EXECUTION ---
+
+    def execute(self, db: Session, key: str, request_fingerprint: str,
+                handler: Callable[[], object]) -> Tuple[StoredResponse, bool]:
+        """Run `handler` once for `key`, or replay its response; (response, replayed).
+
+        The handler performs the write, calls respond() with its response and
+        then commits `db`, which commits the key row, the write and the
+        response in one transaction.
+        """
+        with self._threads.hold(key, self.wait) as waited:
+            if waited:
+                self._count("collapsed")
+            stored = self._lookup(db, key)
+            if stored is None and not self._claim(db, key, request_fingerprint):
+                # another worker took the key between our lookup and insert
+                stored = self._lookup(db, key)
+                if stored is None:
+                    self._count("in_progress")
+                    raise KeyInProgress("A request with this Idempotency-Key is still being processed.")
+            if stored is not None:
+                return self._replay(stored, request_fingerprint), True
+
+            try:
+                with _claimed(db, key, request_fingerprint):
+                    handler()
+                    stored = db.info.get(_COMMITTED)
+                if stored is None:
+                    raise RuntimeError("An idempotent handler returned without committing its response.")
+            except BaseException:
+                self._release(db, key)
+                raise
+            self.cache.set(key, stored, self.ttl)
+            self._count("executed")
+        self._maybe_purge(db)
+        return stored, False
+
+    def claimed(self, db: Session) -> bool:
+        """Whether `db` is running a handler for a key, i.e. respond() will store something."""
+        return _CLAIM in db.info
+
+    def respond(self, db: Session, status_code: int, body: bytes):
+        """Store the handler's response with its key, in the transaction that is about to commit."""
+        key, request_fingerprint = db.info[_CLAIM]
+        db.execute(
+            update(IdempotencyKeyORM).where(IdempotencyKeyORM.key == key)
+            .values(status_code=status_code, response_body=body)
+        )
+        db.info[_RESPONSE] = StoredResponse(request_fingerprint, status_code, body)
+
+    @asynccontextmanager
+    async def collapse(self, key: str):
+        """The in-process wait for async callers: on the event loop, not on a thread lock."""
+        async with self._tasks.hold_async(key, self.wait) as waited:
+            if waited:
+                self._count("collapsed")
+            yield
+
+    def _replay(self, stored: StoredResponse, request_fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != request_fingerprint:
+            self._count("reused")
+            raise KeyReused("This Idempotency-Key was already used for a different request.")
+        self._count("replayed")
+        return stored
+
+    def _lookup(self, db: Session, key: str) -> Optional[StoredResponse]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        row = db.execute(
+            select(IdempotencyKeyORM.fingerprint, IdempotencyKeyORM.status_code,
+                   IdempotencyKeyORM.response_body, IdempotencyKeyORM.expires_at)
+            .where(IdempotencyKeyORM.key == key, IdempotencyKeyORM.expires_at > utcnow())
+        ).first()
+        if row is None:
+            return None
+        if row.status_code is None:
+            # only left by versions that stored the response in a second commit
+            self._count("in_progress")
+            raise KeyInProgress("A request with this Idempotency-Key is still being processed.")
+        stored = StoredResponse(row.fingerprint, row.status_code, bytes(row.response_body))
+        self.cache.set(key, stored, (row.expires_at - utcnow()).total_seconds())
+        return stored
+
+    def _claim(self, db: Session, key: str, request_fingerprint: str) -> bool:
+        now = utcnow()
+        # an expired row would still hold the primary key
+        db.execute(delete(IdempotencyKeyORM).where(IdempotencyKeyORM.key == key, IdempotencyKeyORM.expires_at <= now))
+        try:
+            db.execute(insert(IdempotencyKeyORM).values(
+                key=key, fingerprint=request_fingerprint, created_at=now, expires_at=now + timedelta(seconds=self.ttl)
+            ))
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+
+    def _release(self, db: Session, key: str):
+        # The handler failed. Usually its rollback already dropped the key row; if
+        # it committed without a response, drop the row so the key can be used again.
+        db.rollback()
+        db.execute(delete(IdempotencyKeyORM).where(IdempotencyKeyORM.key == key, IdempotencyKeyORM.status_code.is_(None)))
+        db.commit()
+
+    def _maybe_purge(self, db: Session):
+        with self._lock:
+            if time.monotonic() - self._purged_at < self.purge_interval:
+                return
+            self._purged_at = time.monotonic()
+        try:
+            purge_expired(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.warning("Could not purge expired idempotency keys", exc_info=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "collapsed": self.collapsed,
+                "in_progress": self.in_progress,
+                "reused": self.reused,
+                "cached": len(self.cache),
+                "ttl_seconds": self.ttl,
+            }
+
+idempotency_store = IdempotencyStore()
+
+if __name__ == "__main__":
+    from src.infrastructure.database import SessionLocal
+
+    with SessionLocal() as session:
+        purged = purge_expired(session)
+        session.commit()
+    print(f"purged {purged} expired idempotency keys")
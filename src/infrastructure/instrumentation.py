@@ -0,0 +1,218 @@
+"""Per-request timings and Prometheus-style histograms.
+
+The ASGI middleware (src/api/metrics.py) puts a RequestStats into a context
+variable for each request. Code on the hot path adds to it with timed()
+or add_time(): JWT verification ("auth"), pool checkout ("pool"), rendering
+JSON ("serialize"), and every cursor execution ("db", via the engine hooks
+installed by instrument_engine). Context variables follow the request into
+the threadpool and into SQLAlchemy's async greenlets, so sync and async
+endpoints are measured the same way. Outside a request nothing is recorded.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+class RequestStats:
+    __slots__ = ("started", "queries", "phases", "profiler")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.phases: Dict[str, float] = {}
+        self.profiler = None
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """A Server-Timing header value (durations in ms), shown by browser dev tools."""
+        parts = [f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in self.phases.items()]
+        parts.append(f"sql;desc=\"{self.queries} queries\"")
+        parts.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current_request() -> Optional[RequestStats]:
+    return _current.get()
+
+def begin_request() -> Tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+def end_request(token):
+    _current.reset(token)
+
+def add_time(phase: str, seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.add(phase, seconds)
+
+@contextmanager
+def timed(phase: str):
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(phase, time.perf_counter() - started)
+
+# --- SQL HOOKS ---
+# BEGIN and COMMIT go through the driver, not a cursor, so they are never
+# counted; savepoints are plain statements and are left out to match.
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT", "BEGIN")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if statement.startswith(_TRANSACTION_CONTROL):
+        return
+    conn.info["query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.add("db", time.perf_counter() - started)
+
+def instrument_engine(engine):
+    """Count and time cursor executions on a sync Engine (for async, pass .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# --- HISTOGRAMS ---
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, labels: Sequence[str], value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(tuple(labels))
+            if series is None:
+                series = self._series[tuple(labels)] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def series(self, labels: Sequence[str]) -> Optional[dict]:
+        with self._lock:
+            series = self._series.get(tuple(labels))
+            if series is None:
+                return None
+            return {"count": sum(series[0]), "sum": series[1]}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = 'le="%s"' % (bound if bound == "+Inf" else _number(bound))
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return "\n".join(lines)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: Sequence[str], amount: float = 1.0):
+        with self._lock:
+            key = tuple(labels)
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, labels: Sequence[str]) -> float:
+        with self._lock:
+            return self._values.get(tuple(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in snapshot]
+        return "\n".join(lines)
+
+class RequestMetrics:
+    """What the middleware records per finished request, keyed by route template."""
+
+    def __init__(self):
+        self.requests = Counter("http_requests_total", "Requests by route and status code.", ("method", "route", "status"))
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Time from request start to the end of the response.",
+            ("method", "route"), LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_BUCKETS
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds", "Time spent in SQL per request.", ("method", "route"), LATENCY_BUCKETS
+        )
+        self.phases = Counter(
+            "http_request_phase_seconds_total", "Time per phase (auth, pool, db, serialize), summed over requests.",
+            ("method", "route", "phase")
+        )
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.latency.observe(labels, seconds)
+        self.queries.observe(labels, stats.queries)
+        self.db_time.observe(labels, stats.phases.get("db", 0.0))
+        for phase, spent in stats.phases.items():
+            self.phases.inc((method, route, phase), spent)
+
+    def reset(self):
+        for metric in (self.requests, self.latency, self.queries, self.db_time, self.phases):
+            metric.reset()
+
+    def render(self) -> str:
+        metrics = (self.requests, self.latency, self.queries, self.db_time, self.phases)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+request_metrics = RequestMetrics()
@@ -1,10 +1,34 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, Boolean, ForeignKey, Index, JSON, LargeBinary, DDL, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from src.infrastructure.database import Base
+from datetime import datetime, timezone
 import uuid
 
+def utcnow() -> datetime:
+    # DateTime columns in this schema are naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class ReservationORM(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # list_reservations filter/order and the stats GROUP BY status
+        Index("ix_reservations_status_start_time", "status", "start_time"),
+        # per-table availability lookups, only seated reservations are indexed
+        Index(
+            "ix_reservations_table_id_start_time", "table_id", "start_time",
+            postgresql_where=text("table_id IS NOT NULL"),
+            sqlite_where=text("table_id IS NOT NULL"),
+        ),
+        Index("ix_reservations_customer_id", "customer_id"),
+        # keyset pagination order for unfiltered listing
+        Index("ix_reservations_start_time_id", "start_time", "reservation_id"),
+        # upcoming bookings that still occupy a slot
+        Index(
+            "ix_reservations_active_start_time", "start_time",
+            postgresql_where=text("status IN ('PENDING', 'CONFIRMED', 'CHECKED_IN')"),
+            sqlite_where=text("status IN ('PENDING', 'CONFIRMED', 'CHECKED_IN')"),
+        ),
+    )
 
     reservation_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     customer_id = Column(UUID(as_uuid=True), nullable=False)
@@ -12,6 +36,7 @@ class ReservationORM(Base):
     
     start_time = Column(DateTime, nullable=False)
     duration_minutes = Column(Integer, default=90)
+    party_size = Column(Integer, default=2)
     
     contact_name = Column(String, nullable=False)
     contact_phone = Column(String, nullable=False)
@@ -21,4 +46,183 @@ class ReservationORM(Base):
     table_area = Column(String, nullable=True)
 
     payment_status = Column(String, default="UNPAID")
-    payment_amount = Column(Integer, default=0)
\ No newline at end of file
+    payment_amount = Column(Integer, default=0)
+
+class RestaurantTableORM(Base):
+    __tablename__ = "restaurant_tables"
+
+    table_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    label = Column(String, nullable=False, unique=True)
+    capacity = Column(Integer, nullable=False)
+    area = Column(String, nullable=False)
+    # tables next to each other in the same area have consecutive positions
+    position = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, nullable=False, default=True)
+
+class ReservationTableORM(Base):
+    # extra tables pushed together with reservations.table_id for large parties
+    __tablename__ = "reservation_tables"
+
+    reservation_id = Column(UUID(as_uuid=True), ForeignKey("reservations.reservation_id", ondelete="CASCADE"), primary_key=True)
+    table_id = Column(UUID(as_uuid=True), primary_key=True)
+
+class ReservationStatsORM(Base):
+    # running totals per status, kept by triggers on reservations
+    __tablename__ = "reservation_stats"
+
+    status = Column(String, primary_key=True)
+    reservation_count = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(BigInteger, nullable=False, default=0)
+
+class ReservationDailyStatsORM(Base):
+    # same totals broken down by booking day and area ('' until a table is assigned)
+    __tablename__ = "reservation_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    area = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    reservation_count = Column(BigInteger, nullable=False, default=0)
+    revenue = Column(BigInteger, nullable=False, default=0)
+
+class UserORM(Base):
+    __tablename__ = "users"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    username = Column(String, nullable=False, unique=True)
+    hashed_password = Column(String, nullable=False)
+    # comma-separated, copied into the access token's "roles" claim at login
+    roles = Column(String, nullable=False, default="")
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False)
+
+class RefreshTokenORM(Base):
+    __tablename__ = "refresh_tokens"
+
+    token_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    # sha256 of the secret half; the token itself is never stored
+    token_hash = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+class RevokedTokenORM(Base):
+    # access tokens revoked before their exp (logout); rows can go once expired
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class OutboxEventORM(Base):
+    # Domain events written in the same transaction as the change they describe;
+    # the dispatcher (src/infrastructure/outbox.py) drains them in id order.
+    __tablename__ = "outbox_events"
+
+    # SQLite only autoincrements a plain INTEGER primary key
+    id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True, autoincrement=True)
+    event_id = Column(UUID(as_uuid=True), nullable=False)
+    event_type = Column(String, nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    # not claimed before this time; pushed back after each failed delivery
+    available_at = Column(DateTime, nullable=False)
+    dispatched_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_events_pending", "id",
+            postgresql_where=text("dispatched_at IS NULL"), sqlite_where=text("dispatched_at IS NULL")
+        ),
+    )
+
+class IdempotencyKeyORM(Base):
+    # Responses to writes sent with an Idempotency-Key (src/infrastructure/idempotency.py).
+    # The row is inserted in the transaction of the write itself, so a key is
+    # taken if and only if its write committed; the response follows right after.
+    __tablename__ = "idempotency_keys"
+
+    # "<user>:<client key>"
+    key = Column(String, primary_key=True)
+    # sha256 of the request, to refuse a key reused for a different one
+    fingerprint = Column(String(64), nullable=False)
+    # both NULL until the response is stored
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# --- STATS TRIGGERS ---
+# Every INSERT/UPDATE/DELETE on reservations adds its delta to the summary
+# tables inside the same transaction, whichever code path wrote the rows.
+# Postgres uses statement-level triggers with transition tables, so a batch
+# insert of 5000 rows costs one grouped upsert instead of 5000.
+
+_PG_STATS_DELTA = """
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    WITH d AS ({source}),
+    daily AS (
+        INSERT INTO reservation_daily_stats AS s (day, area, status, reservation_count, revenue)
+        SELECT day, area, status, sum(n), sum(amount) FROM d
+        GROUP BY day, area, status HAVING sum(n) <> 0 OR sum(amount) <> 0
+        ORDER BY day, area, status
+        ON CONFLICT (day, area, status) DO UPDATE
+        SET reservation_count = s.reservation_count + excluded.reservation_count,
+            revenue = s.revenue + excluded.revenue
+    )
+    INSERT INTO reservation_stats AS s (status, reservation_count, revenue)
+    SELECT status, sum(n), sum(amount) FROM d
+    GROUP BY status HAVING sum(n) <> 0 OR sum(amount) <> 0
+    ORDER BY status
+    ON CONFLICT (status) DO UPDATE
+    SET reservation_count = s.reservation_count + excluded.reservation_count,
+        revenue = s.revenue + excluded.revenue;
+    RETURN NULL;
+END $$
+"""
+
+_PG_ROWS = "SELECT start_time::date AS day, COALESCE(table_area, '') AS area, status, {sign}1 AS n, {sign}COALESCE(payment_amount, 0) AS amount FROM {rows}"
+
+_SQLITE_UPSERT = """
+    INSERT INTO reservation_daily_stats (day, area, status, reservation_count, revenue)
+    VALUES (date({row}.start_time), COALESCE({row}.table_area, ''), {row}.status, {sign}1, {sign}COALESCE({row}.payment_amount, 0))
+    ON CONFLICT (day, area, status) DO UPDATE
+    SET reservation_count = reservation_count + excluded.reservation_count, revenue = revenue + excluded.revenue;
+    INSERT INTO reservation_stats (status, reservation_count, revenue)
+    VALUES ({row}.status, {sign}1, {sign}COALESCE({row}.payment_amount, 0))
+    ON CONFLICT (status) DO UPDATE
+    SET reservation_count = reservation_count + excluded.reservation_count, revenue = revenue + excluded.revenue;"""
+
+def stats_trigger_ddl(dialect: str):
+    """CREATE statements for the stats triggers on `dialect` (also used by the migration)."""
+    if dialect == "postgresql":
+        new_rows, old_rows = _PG_ROWS.format(sign="", rows="new_rows"), _PG_ROWS.format(sign="-", rows="old_rows")
+        return [
+            _PG_STATS_DELTA.format(name="reservation_stats_on_insert", source=new_rows),
+            _PG_STATS_DELTA.format(name="reservation_stats_on_update", source=f"{new_rows} UNION ALL {old_rows}"),
+            _PG_STATS_DELTA.format(name="reservation_stats_on_delete", source=old_rows),
+            "CREATE TRIGGER reservation_stats_on_insert AFTER INSERT ON reservations "
+            "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION reservation_stats_on_insert()",
+            "CREATE TRIGGER reservation_stats_on_update AFTER UPDATE ON reservations "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION reservation_stats_on_update()",
+            "CREATE TRIGGER reservation_stats_on_delete AFTER DELETE ON reservations "
+            "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION reservation_stats_on_delete()",
+        ]
+    if dialect == "sqlite":
+        plus, minus = _SQLITE_UPSERT.format(row="NEW", sign=""), _SQLITE_UPSERT.format(row="OLD", sign="-")
+        return [
+            f"CREATE TRIGGER reservation_stats_on_insert AFTER INSERT ON reservations BEGIN{plus}\nEND",
+            "CREATE TRIGGER reservation_stats_on_update "
+            f"AFTER UPDATE OF status, table_area, start_time, payment_amount ON reservations BEGIN{minus}{plus}\nEND",
+            f"CREATE TRIGGER reservation_stats_on_delete AFTER DELETE ON reservations BEGIN{minus}\nEND",
+        ]
+    raise NotImplementedError(f"No stats triggers for {dialect}")
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_stats_triggers(target, connection, **kw):
+    if ReservationORM.__tablename__ not in {t.name for t in kw.get("tables", ())}:
+        return
+    for statement in stats_trigger_ddl(connection.dialect.name):
+        connection.execute(DDL(statement))
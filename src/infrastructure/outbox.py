@@ -0,0 +1,282 @@
+"""Transactional outbox for domain events.
+
+Writers call record_events() inside the transaction that changes the
+reservation, so an event is stored if and only if its change commits. The
+OutboxDispatcher drains pending rows in id order and hands each batch to every
+sink. A row is marked dispatched only after all sinks accepted it, so delivery
+is at-least-once: consumers de-duplicate on the message id. While no sink has
+anyone to deliver to, rows stay pending.
+
+Sinks come from the environment: the in-process event_bus always, plus
+OUTBOX_FILE=<path> for a FileSink and OUTBOX_QUEUE=true for a QueueSink
+(OUTBOX_QUEUE_SIZE bounds it).
+"""
+import asyncio
+import inspect
+import logging
+import os
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Sequence
+from uuid import UUID
+
+import orjson
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.domain.events import DomainEvent
+from src.infrastructure.database import SessionLocal, env_bool
+from src.infrastructure.orm_models import OutboxEventORM, utcnow
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: int
+    event_id: UUID
+    event_type: str
+    aggregate_id: UUID
+    payload: dict
+    created_at: datetime
+    attempts: int
+
+def record_events(db: Session, events: Iterable[DomainEvent]):
+    """Queue events in the caller's transaction; nothing is sent until it commits."""
+    now = utcnow()
+    rows = [
+        {
+            "event_id": event.event_id, "event_type": type(event).__name__,
+            "aggregate_id": event.reservation_id, "payload": orjson.loads(orjson.dumps(event, default=str)),
+            "created_at": now, "available_at": now, "attempts": 0,
+        }
+        for event in events
+    ]
+    if rows:
+        db.execute(insert(OutboxEventORM), rows)
+
+def outbox_counts(db: Session, max_attempts: int) -> dict:
+    undelivered = OutboxEventORM.dispatched_at.is_(None)
+    pending, dead = db.execute(
+        select(
+            func.count().filter(OutboxEventORM.attempts < max_attempts),
+            func.count().filter(OutboxEventORM.attempts >= max_attempts),
+        ).where(undelivered)
+    ).one()
+    return {"pending": pending, "dead": dead}
+
+# --- SINKS ---
+# Anything with `async deliver(messages)`. Raising makes the whole batch retry.
+# A sink whose `active` is False (no one to deliver to) is skipped.
+
+class SubscriberSink:
+    """In-process subscribers keyed by event type, "*" for every event. Handlers may be sync or async."""
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, event_type: str, handler: Callable[[OutboxMessage], object]):
+        self._handlers[event_type].append(handler)
+
+    def clear(self):
+        self._handlers.clear()
+
+    @property
+    def active(self) -> bool:
+        return bool(self._handlers)
+
+    async def deliver(self, messages: Sequence[OutboxMessage]):
+        for message in messages:
+            for handler in self._handlers.get(message.event_type, []) + self._handlers.get("*", []):
+                result = handler(message)
+                if inspect.isawaitable(result):
+                    await result
+
+class FileSink:
+    """Appends one JSON line per message, fsynced before the batch counts as delivered."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, messages: Sequence[OutboxMessage]):
+        with open(self.path, "ab") as f:
+            f.write(b"".join(orjson.dumps(asdict(message)) + b"\n" for message in messages))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def deliver(self, messages: Sequence[OutboxMessage]):
+        await asyncio.to_thread(self._write, messages)
+
+class QueueSink:
+    """Stand-in for a local broker: consumers read messages off an asyncio.Queue.
+
+    A full queue pushes back: a put waits up to `timeout`, then the batch fails
+    and is retried later.
+    """
+
+    def __init__(self, maxsize: int = 10_000, timeout: float = 5.0):
+        self.queue: "asyncio.Queue[OutboxMessage]" = asyncio.Queue(maxsize)
+        self.timeout = timeout
+
+    async def deliver(self, messages: Sequence[OutboxMessage]):
+        for message in messages:
+            await asyncio.wait_for(self.queue.put(message), self.timeout)
+
+# --- DISPATCHER ---
+
+class OutboxDispatcher:
+    """Drains the outbox in batches on the event loop; database calls run in a thread.
+
+    On Postgres, batches are claimed with FOR UPDATE SKIP LOCKED, so several
+    workers can run a dispatcher each. A failed batch is retried after
+    base_delay * 2**(attempts - 1) seconds (capped at max_delay). After
+    max_attempts failures a row is left undelivered as a dead letter.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sinks: Sequence = (),
+                 batch_size: int = 100, poll_interval: float = 1.0, max_attempts: int = 10,
+                 base_delay: float = 1.0, max_delay: float = 300.0, clock: Callable[[], datetime] = utcnow):
+        self.session_factory = session_factory
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+        self.delivered = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+        self.last_error: Optional[str] = None
+
+    def active_sinks(self) -> list:
+        return [sink for sink in self.sinks if getattr(sink, "active", True)]
+
+    def backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+    def _claim(self, db: Session) -> List[OutboxEventORM]:
+        return db.execute(
+            select(OutboxEventORM)
+            .where(
+                OutboxEventORM.dispatched_at.is_(None),
+                OutboxEventORM.available_at <= self._clock(),
+                OutboxEventORM.attempts < self.max_attempts,
+            )
+            .order_by(OutboxEventORM.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+    def _mark_dispatched(self, db: Session, rows: List[OutboxEventORM]):
+        db.execute(
+            update(OutboxEventORM)
+            .where(OutboxEventORM.id.in_([row.id for row in rows]))
+            .values(dispatched_at=self._clock())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def _reschedule(self, db: Session, rows: List[OutboxEventORM], error: str):
+        now = self._clock()
+        for row in rows:
+            row.attempts += 1
+            row.last_error = error[:500]
+            row.available_at = now + self.backoff(row.attempts)
+            if row.attempts >= self.max_attempts:
+                self.dead_lettered += 1
+        db.commit()
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns how many messages went out."""
+        sinks = self.active_sinks()
+        if not sinks:
+            # marking rows dispatched now would drop them for every later consumer
+            return 0
+        db = self.session_factory()
+        try:
+            rows = await asyncio.to_thread(self._claim, db)
+            if not rows:
+                return 0
+            messages = [
+                OutboxMessage(
+                    id=row.id, event_id=row.event_id, event_type=row.event_type, aggregate_id=row.aggregate_id,
+                    payload=row.payload, created_at=row.created_at, attempts=row.attempts,
+                )
+                for row in rows
+            ]
+            try:
+                for sink in sinks:
+                    await sink.deliver(messages)
+            except Exception as e:
+                self.failed_batches += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Outbox delivery failed, retrying later", exc_info=True)
+                await asyncio.to_thread(self._reschedule, db, rows, self.last_error)
+                return 0
+            await asyncio.to_thread(self._mark_dispatched, db, rows)
+            self.delivered += len(messages)
+            return len(messages)
+        finally:
+            await asyncio.to_thread(db.close)
+
+    async def run(self):
+        while not self._stop.is_set():
+            try:
+                sent = await self.run_once()
+            except Exception as e:
+                # e.g. the database is unreachable; try again on the next poll
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.warning("Outbox dispatcher could not read the outbox", exc_info=True)
+                sent = 0
+            if sent < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._task is None:
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, timeout: float = 10.0):
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            # an undelivered batch stays in the outbox and goes out next time
+            pass
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "sinks": [type(sink).__name__ for sink in self.active_sinks()],
+            "delivered": self.delivered,
+            "failed_batches": self.failed_batches,
+            "dead_lettered": self.dead_lettered,
+            "last_error": self.last_error,
+        }
+
+def build_sinks() -> list:
+    sinks = [event_bus]
+    if os.getenv("OUTBOX_FILE"):
+        sinks.append(FileSink(os.environ["OUTBOX_FILE"]))
+    if env_bool("OUTBOX_QUEUE", "false"):
+        sinks.append(QueueSink(int(os.getenv("OUTBOX_QUEUE_SIZE", "10000"))))
+    return sinks
+
+event_bus = SubscriberSink()
+
+OUTBOX_DISPATCHER_ENABLED = env_bool("OUTBOX_DISPATCHER", "true")
+outbox_dispatcher = OutboxDispatcher(
+    SessionLocal, build_sinks(),
+    batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "100")),
+    poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0")),
+    max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10")),
+)
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.infrastructure.instrumentation import add_time
+
+
+class PoolMetrics:
+    """Counters fed by SQLAlchemy pool events plus the time spent waiting in checkout."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self._waits.clear()
+
+    def attach(self, target):
+        """Listen on an Engine (or Pool); survives pool recreation on dispose()."""
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        add_time("pool", seconds)
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_ms": {
+                    "count": self.wait_count,
+                    "avg": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                    "p50": round(_pick(waits, 0.50) * 1000, 3),
+                    "p99": round(_pick(waits, 0.99) * 1000, 3),
+                    "max": round(self.wait_max * 1000, 3),
+                },
+            }
+        if pool is not None:
+            data["pool"] = {
+                "class": type(pool).__name__,
+                "size": _call(pool, "size"),
+                "checked_in": _call(pool, "checkedin"),
+                "checked_out": _call(pool, "checkedout"),
+                "overflow": _call(pool, "overflow"),
+                "status": pool.status(),
+            }
+        return data
+
+
+def _pick(ordered, fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _call(pool, name: str) -> Optional[int]:
+    method = getattr(pool, name, None)
+    return method() if callable(method) else None
+
+
+class _TimedCheckoutMixin:
+    # Pool events only fire once a connection has been handed out, so the time
+    # spent queueing for a free slot is measured around _do_get itself.
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(metrics: PoolMetrics, async_driver: bool = False):
+    base = AsyncAdaptedQueuePool if async_driver else QueuePool
+    return type(f"Timed{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
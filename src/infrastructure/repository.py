@@ -0,0 +1,198 @@
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.domain.events import DomainEvent
+from src.domain.models import Reservation, TableAssignment
+from src.domain.transitions import Transition
+from src.domain.value_objects import ContactInfo, PaymentDetail, ReservationStatus, ReservationTime
+from src.infrastructure.orm_models import ReservationORM, ReservationTableORM
+from src.infrastructure.outbox import record_events
+from src.infrastructure.state_machine import ReservationNotFound, apply_transition
+
+reservations = ReservationORM.__table__
+reservation_tables = ReservationTableORM.__table__
+
+class ConcurrentUpdate(RuntimeError):
+    pass
+
+# --- MAPPING ---
+# Rows were validated on the way in, so value objects are built with
+# model_construct (no re-validation); this keeps hydration close to the cost
+# of reading the row.
+
+def to_domain(row) -> Reservation:
+    assignment = None
+    if row.table_id is not None:
+        assignment = TableAssignment(row.table_id, None, row.table_area)
+    return Reservation.restore(
+        reservation_id=row.reservation_id,
+        customer_id=row.customer_id,
+        contact_info=ContactInfo.model_construct(name=row.contact_name, phone=row.contact_phone, email=row.contact_email),
+        reservation_time=ReservationTime.model_construct(start_time=row.start_time, duration_minutes=row.duration_minutes),
+        status=ReservationStatus(row.status),
+        party_size=row.party_size or 2,
+        payment_detail=_payment(row),
+        table_assignment=assignment,
+    )
+
+def _payment(row):
+    # None leaves the aggregate's default PaymentDetail to be built on first use
+    if (row.payment_status or "UNPAID") == "UNPAID" and not row.payment_amount:
+        return None
+    return PaymentDetail.model_construct(amount=float(row.payment_amount), status=row.payment_status)
+
+def _mutable_values(reservation: Reservation) -> dict:
+    assignment = reservation.table_assignment
+    return {
+        "status": reservation.status.value,
+        "table_id": assignment.table_id if assignment else None,
+        "table_area": assignment.area if assignment else None,
+        "payment_status": reservation.payment_detail.status,
+        "payment_amount": int(reservation.payment_detail.amount),
+    }
+
+def to_values(reservation: Reservation) -> dict:
+    return {
+        "reservation_id": reservation.reservation_id,
+        "customer_id": reservation.customer_id,
+        "start_time": reservation.reservation_time.start_time,
+        "duration_minutes": reservation.reservation_time.duration_minutes,
+        "party_size": reservation.party_size,
+        "contact_name": reservation.contact_info.name,
+        "contact_phone": reservation.contact_info.phone,
+        "contact_email": reservation.contact_info.email,
+        **_mutable_values(reservation),
+    }
+
+def _state(reservation: Reservation) -> tuple:
+    # the assignment is compared by identity: assign_table() always makes a new one.
+    # The payment is read without building the lazy default.
+    payment = reservation._payment_detail
+    if payment is None:
+        return (reservation.status, reservation.table_assignment, "UNPAID", 0.0)
+    return (reservation.status, reservation.table_assignment, payment.status, payment.amount)
+
+class ReservationRepository:
+    """Reservation aggregates for one unit of work, i.e. one request's Session.
+
+    Identity map: a reservation is hydrated once, and asking for it again
+    returns the same object without SQL. commit() writes everything in one
+    transaction: new rows in one INSERT, one UPDATE per changed aggregate,
+    the joined-table rows of re-seated ones, and all collected domain events
+    into the outbox.
+
+    Each UPDATE is guarded on the status that was loaded. If another request
+    changed the row in between, nothing matches and ConcurrentUpdate is
+    raised, so two racing transitions can't both win.
+
+    A plain status change doesn't need the aggregate: transition() writes it
+    with apply_transition, one UPDATE guarded on the allowed source statuses,
+    and nothing is loaded first.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._identity: Dict[UUID, Reservation] = {}
+        self._loaded: Dict[UUID, tuple] = {}
+        self._new: Dict[UUID, Reservation] = {}
+        self._events: List[DomainEvent] = []
+        # written rows (RETURNING) and, for re-seated reservations, their joined tables
+        self.saved: Dict[UUID, object] = {}
+        self.reseated: Dict[UUID, tuple] = {}
+
+    def __contains__(self, reservation_id: UUID) -> bool:
+        return reservation_id in self._identity
+
+    def _track(self, row) -> Reservation:
+        reservation = self._identity.get(row.reservation_id)
+        if reservation is None:
+            reservation = to_domain(row)
+            self._identity[row.reservation_id] = reservation
+            self._loaded[row.reservation_id] = _state(reservation)
+        return reservation
+
+    def get(self, reservation_id: UUID) -> Reservation:
+        reservation = self._identity.get(reservation_id)
+        if reservation is None:
+            reservation = self.get_many([reservation_id]).get(reservation_id)
+        if reservation is None:
+            raise ReservationNotFound("Reservation not found")
+        return reservation
+
+    def get_many(self, reservation_ids: Iterable[UUID]) -> Dict[UUID, Reservation]:
+        """The reservations that exist among `reservation_ids`; one SELECT for those not yet loaded."""
+        reservation_ids = list(reservation_ids)
+        missing = [rid for rid in reservation_ids if rid not in self._identity]
+        if missing:
+            self.hydrate(self.db.execute(select(reservations).where(reservations.c.reservation_id.in_(missing))))
+        return {rid: self._identity[rid] for rid in reservation_ids if rid in self._identity}
+
+    def hydrate(self, rows: Iterable) -> List[Reservation]:
+        """Adopt rows the caller already selected (full reservation rows)."""
+        return [self._track(row) for row in rows]
+
+    def add(self, reservation: Reservation):
+        self._identity[reservation.reservation_id] = reservation
+        self._new[reservation.reservation_id] = reservation
+
+    def transition(self, reservation_id: UUID, transition: Transition, events: Iterable[DomainEvent] = ()) -> Reservation:
+        """Apply `transition` in the database right away; `events` go to the outbox on commit().
+
+        The returned row replaces any aggregate loaded for this reservation.
+        """
+        row = apply_transition(self.db, reservation_id, transition)
+        self.saved[reservation_id] = row
+        self._identity.pop(reservation_id, None)
+        self._events += events
+        return self._track(row)
+
+    def _flush_update(self, reservation_id: UUID, reservation: Reservation, loaded: tuple):
+        row = self.db.execute(
+            update(reservations)
+            .where(reservations.c.reservation_id == reservation_id, reservations.c.status == loaded[0].value)
+            .values(**_mutable_values(reservation))
+            .returning(*reservations.c)
+        ).first()
+        if row is None:
+            raise ConcurrentUpdate("Reservation changed concurrently, retry.")
+        self.saved[reservation_id] = row
+
+        assignment = reservation.table_assignment
+        if assignment is not loaded[1]:
+            joined = tuple(assignment.joined_table_ids) if assignment else ()
+            self.db.execute(delete(reservation_tables).where(reservation_tables.c.reservation_id == reservation_id))
+            if joined:
+                self.db.execute(insert(reservation_tables), [
+                    {"reservation_id": reservation_id, "table_id": table_id} for table_id in joined
+                ])
+            self.reseated[reservation_id] = joined
+
+    def flush(self):
+        """Write every change without committing, filling `saved`. IntegrityError
+        and ConcurrentUpdate propagate; the caller rolls back."""
+        if self._new:
+            rows = self.db.execute(
+                insert(reservations).returning(*reservations.c), [to_values(r) for r in self._new.values()]
+            )
+            for row in rows:
+                self.saved[row.reservation_id] = row
+        for reservation_id, reservation in self._identity.items():
+            loaded = self._loaded.get(reservation_id)
+            if loaded is not None and _state(reservation) != loaded:
+                self._flush_update(reservation_id, reservation, loaded)
+
+        events, self._events = self._events, []
+        for reservation in self._identity.values():
+            events += reservation.collect_domain_events()
+        record_events(self.db, events)
+
+        self._new.clear()
+        self._loaded = {rid: _state(r) for rid, r in self._identity.items()}
+
+    def commit(self):
+        """flush() and commit."""
+        self.flush()
+        self.db.commit()
@@ -0,0 +1,151 @@
+"""Request coalescing ("single-flight") for hot reads.
+
+When a booking window opens, hundreds of identical GET /reservations?status=PENDING
+and /stats requests arrive within milliseconds. Through do(), the first caller
+for a key runs the query; callers arriving while it is in flight wait and get
+the same result, or a copy of its exception raised from the original (one
+instance raised in several threads would collect every thread's traceback
+frames). Nothing is kept afterwards: the next
+request after completion runs again (caching is src/infrastructure/cache.py's job).
+
+Sync endpoints wait on a threading.Event in their threadpool worker. The async
+router coalesces with do_async() instead, since a blocking wait on the event
+loop would stall the leader it is waiting for; do() called from a loop thread
+just runs the function.
+
+forget() is called on every reservation write in this process, so a read that
+starts after a write never joins a query that began before it.
+"""
+import asyncio
+import copy
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from src.infrastructure.database import env_bool, on_event_loop
+
+T = TypeVar("T")
+
+READ_COALESCING_ENABLED = env_bool("READ_COALESCING_ENABLED", "true")
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def _fresh(error: BaseException) -> BaseException:
+    try:
+        return copy.copy(error)
+    except Exception:
+        # can't be rebuilt from its args; share the instance after all
+        return error
+
+class SingleFlight:
+    def __init__(self, enabled: bool = READ_COALESCING_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self._lock:
+            # name -> [requests, executions]
+            self._counts: Dict[str, list] = {}
+
+    def _count(self, name: str, executed: bool):
+        counts = self._counts.get(name)
+        if counts is None:
+            counts = self._counts[name] = [0, 0]
+        counts[0] += 1
+        counts[1] += executed
+
+    def do(self, name: str, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """(result, shared): shared is True when another caller's execution was reused."""
+        if not self.enabled or on_event_loop():
+            return fn(), False
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count(name, leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _fresh(call.error) from call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, name: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        if not self.enabled:
+            return await fn(), False
+        with self._lock:
+            call = self._async_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._async_calls[key] = asyncio.get_running_loop().create_future()
+            self._count(name, leader)
+
+        if not leader:
+            try:
+                # shielded: a follower that disconnects must not cancel the leader's result
+                return await asyncio.shield(call), True
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                raise _fresh(e) from e
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            call.exception()  # retrieved, even if nobody was waiting
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                if self._async_calls.get(key) is call:
+                    del self._async_calls[key]
+
+    def forget(self):
+        """Let the next caller of every key start a new execution; those in flight still finish."""
+        with self._lock:
+            self._calls.clear()
+            self._async_calls.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = {name: list(c) for name, c in self._counts.items()}
+            in_flight = len(self._calls) + len(self._async_calls)
+        data = {"enabled": self.enabled, "in_flight": in_flight, "routes": {}}
+        for name, (requests, executions) in sorted(counts.items()):
+            data["routes"][name] = {
+                "requests": requests,
+                "executions": executions,
+                "shared": requests - executions,
+                # fraction of requests answered by another request's query
+                "coalescing_ratio": round((requests - executions) / requests, 4) if requests else 0.0,
+            }
+        return data
+
+read_flights = SingleFlight()
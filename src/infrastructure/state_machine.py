@@ -0,0 +1,40 @@
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.domain.transitions import Transition, InvalidTransition
+from src.infrastructure.orm_models import ReservationORM
+
+class ReservationNotFound(LookupError):
+    pass
+
+reservations = ReservationORM.__table__
+
+def apply_transition(db: Session, reservation_id: UUID, transition: Transition, **values):
+    """Run a transition as one conditional UPDATE ... RETURNING.
+
+    The status check lives in the WHERE clause, so two concurrent requests
+    can't both pass it. A second query is only made when nothing matched, to
+    tell a missing reservation apart from a disallowed transition.
+    """
+    if transition.target:
+        values["status"] = transition.target
+    stmt = (
+        update(reservations)
+        .where(
+            reservations.c.reservation_id == reservation_id,
+            reservations.c.status.in_(sorted(transition.allowed_from)),
+        )
+        .values(**values)
+        .returning(*reservations.c)
+    )
+    row = db.execute(stmt).first()
+    if row is not None:
+        return row
+
+    exists = db.execute(
+        select(reservations.c.reservation_id).where(reservations.c.reservation_id == reservation_id)
+    ).first()
+    if exists is None:
+        raise ReservationNotFound("Reservation not found")
+    raise InvalidTransition(transition.error)
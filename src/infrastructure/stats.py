@@ -0,0 +1,129 @@
+"""Read side of the reservation summary tables, plus rebuild/reconcile.
+
+    python -m src.infrastructure.stats            # rebuild only if drifted, print report
+    python -m src.infrastructure.stats --rebuild  # rebuild unconditionally
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from src.infrastructure.orm_models import ReservationORM, ReservationStatsORM, ReservationDailyStatsORM
+
+STATUS_FIELDS = {
+    "PENDING": "pending_count",
+    "CONFIRMED": "confirmed_count",
+    "CHECKED_IN": "checked_in_count",
+    "COMPLETED": "completed_count",
+    "CANCELLED": "cancelled_count",
+}
+
+def _day(db: Session):
+    # CAST(... AS DATE) on SQLite yields the year as a number
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(ReservationORM.start_time)
+    return cast(ReservationORM.start_time, Date)
+
+def _from_reservations(db: Session):
+    day = _day(db).label("day")
+    area = func.coalesce(ReservationORM.table_area, "").label("area")
+    return (
+        select(
+            day, area, ReservationORM.status,
+            func.count().label("reservation_count"),
+            func.coalesce(func.sum(ReservationORM.payment_amount), 0).label("revenue"),
+        )
+        .group_by(day, area, ReservationORM.status)
+    )
+
+def totals(db: Session) -> Tuple[Dict[str, int], int]:
+    """Counts per status and total revenue; a handful of rows whatever the table size."""
+    rows = db.execute(select(
+        ReservationStatsORM.status, ReservationStatsORM.reservation_count, ReservationStatsORM.revenue
+    )).all()
+    return {status: count for status, count, _ in rows}, sum(revenue for _, _, revenue in rows)
+
+def daily_totals(db: Session, start: date, end: date, area: Optional[str] = None):
+    """(day, area, status, count, revenue) rows for start <= day <= end."""
+    daily = ReservationDailyStatsORM
+    query = select(daily.day, daily.area, daily.status, daily.reservation_count, daily.revenue).where(
+        daily.day >= start, daily.day <= end, daily.reservation_count != 0
+    )
+    if area is not None:
+        query = query.where(daily.area == area)
+    return db.execute(query.order_by(daily.day, daily.area, daily.status)).all()
+
+def _lock_reservations(db: Session):
+    # keep writers out while recounting so no delta lands between DELETE and INSERT
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE reservations IN SHARE MODE"))
+
+def rebuild(db: Session):
+    """Recompute both summary tables from reservations in the caller's transaction."""
+    _lock_reservations(db)
+    daily = ReservationDailyStatsORM
+    db.execute(delete(daily))
+    db.execute(delete(ReservationStatsORM))
+    db.execute(insert(daily).from_select(
+        ["day", "area", "status", "reservation_count", "revenue"], _from_reservations(db)
+    ))
+    db.execute(insert(ReservationStatsORM).from_select(
+        ["status", "reservation_count", "revenue"],
+        select(daily.status, func.sum(daily.reservation_count), func.sum(daily.revenue)).group_by(daily.status)
+    ))
+
+def drift(db: Session) -> List[dict]:
+    """Keys whose stored totals differ from a recount; day "*" is the per-status total."""
+    daily = ReservationDailyStatsORM
+    stored = {
+        (str(day), area, status): (count, revenue)
+        for day, area, status, count, revenue in db.execute(
+            select(daily.day, daily.area, daily.status, daily.reservation_count, daily.revenue)
+        )
+        if count or revenue
+    }
+    for status, count, revenue in db.execute(select(
+        ReservationStatsORM.status, ReservationStatsORM.reservation_count, ReservationStatsORM.revenue
+    )):
+        if count or revenue:
+            stored[("*", "", status)] = (count, revenue)
+
+    actual = {}
+    for day, area, status, count, revenue in db.execute(_from_reservations(db)):
+        actual[(str(day), area, status)] = (count, revenue)
+        total_count, total_revenue = actual.get(("*", "", status), (0, 0))
+        actual[("*", "", status)] = (total_count + count, total_revenue + revenue)
+
+    return [
+        {"day": key[0], "area": key[1], "status": key[2],
+         "stored": stored.get(key, (0, 0)), "actual": actual.get(key, (0, 0))}
+        for key in sorted(stored.keys() | actual.keys())
+        if stored.get(key, (0, 0)) != actual.get(key, (0, 0))
+    ]
+
+def reconcile(db: Session) -> dict:
+    """Rebuild the summary tables if they drifted from reservations; commits."""
+    _lock_reservations(db)
+    mismatches = drift(db)
+    if mismatches:
+        rebuild(db)
+    db.commit()
+    return {"drifted_keys": len(mismatches), "rebuilt": bool(mismatches), "mismatches": mismatches[:50]}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from src.infrastructure.database import SessionLocal
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="rebuild unconditionally")
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        if args.rebuild:
+            rebuild(session)
+            session.commit()
+            print("rebuilt")
+        else:
+            print(json.dumps(reconcile(session), indent=2, default=str))
@@ -0,0 +1,113 @@
+import hashlib
+import hmac
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.core.revocation import revoked_tokens
+from src.core.tokens import InvalidToken
+from src.infrastructure.database import SessionLocal
+from src.infrastructure.orm_models import UserORM, RefreshTokenORM, RevokedTokenORM, utcnow
+
+REFRESH_TOKEN_EXPIRE_DAYS = 7
+
+def roles_of(user: UserORM) -> List[str]:
+    return [role for role in user.roles.split(",") if role]
+
+def get_user(db: Session, username: str) -> Optional[UserORM]:
+    return db.execute(select(UserORM).where(UserORM.username == username)).scalar_one_or_none()
+
+def create_user(db: Session, username: str, hashed_password: str, roles=(), exist_ok: bool = False) -> UserORM:
+    user = UserORM(username=username, hashed_password=hashed_password, roles=",".join(roles), created_at=utcnow())
+    db.add(user)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        if not exist_ok:
+            raise
+        # a concurrent request created it first
+        return get_user(db, username)
+    return user
+
+# --- REFRESH TOKENS ---
+# Opaque "<token_id>.<secret>" strings; only sha256(secret) is stored. Each use
+# rotates the token, and presenting an already-rotated one revokes every
+# refresh token of that user, since it means the token was copied.
+
+def _digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+def issue_refresh_token(db: Session, user_id: UUID) -> str:
+    secret = secrets.token_urlsafe(32)
+    token = RefreshTokenORM(
+        token_id=uuid.uuid4(), user_id=user_id, token_hash=_digest(secret),
+        expires_at=utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    db.add(token)
+    return f"{token.token_id}.{secret}"
+
+def _find_refresh_token(db: Session, raw: str) -> RefreshTokenORM:
+    token_id, _, secret = raw.partition(".")
+    try:
+        token_id = UUID(token_id)
+    except ValueError:
+        raise InvalidToken("Malformed refresh token")
+    # FOR UPDATE makes two refreshes of one token take turns on Postgres. SQLite
+    # ignores it: there both can read the token unspent and both rotate it.
+    row = db.execute(
+        select(RefreshTokenORM).where(RefreshTokenORM.token_id == token_id).with_for_update()
+    ).scalar_one_or_none()
+    if row is None or not hmac.compare_digest(row.token_hash, _digest(secret)):
+        raise InvalidToken("Unknown refresh token")
+    return row
+
+def rotate_refresh_token(db: Session, raw: str) -> UserORM:
+    """Spend a refresh token and return its user; the caller issues the new pair and commits."""
+    row = _find_refresh_token(db, raw)
+    now = utcnow()
+    if row.revoked_at is not None:
+        db.execute(
+            update(RefreshTokenORM)
+            .where(RefreshTokenORM.user_id == row.user_id, RefreshTokenORM.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        db.commit()
+        raise InvalidToken("Refresh token was already used")
+    if row.expires_at <= now:
+        raise InvalidToken("Refresh token expired")
+    user = db.get(UserORM, row.user_id)
+    if user is None or not user.is_active:
+        raise InvalidToken("User is disabled")
+    row.revoked_at = now
+    return user
+
+def revoke_refresh_token(db: Session, raw: str):
+    try:
+        row = _find_refresh_token(db, raw)
+    except InvalidToken:
+        return
+    if row.revoked_at is None:
+        row.revoked_at = utcnow()
+
+# --- ACCESS TOKEN REVOCATION ---
+
+def revoke_access_token(db: Session, jti: str, expires_at: float):
+    """Record a revoked access token; this process stops accepting it at once."""
+    expires = datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None)
+    if db.get(RevokedTokenORM, jti) is None:
+        db.add(RevokedTokenORM(jti=jti, expires_at=expires))
+    revoked_tokens.add(jti, expires_at)
+
+def load_revoked_tokens():
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(RevokedTokenORM.jti, RevokedTokenORM.expires_at).where(RevokedTokenORM.expires_at > utcnow())
+        ).all()
+    return [(jti, expires.replace(tzinfo=timezone.utc).timestamp()) for jti, expires in rows]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, UUID4, EmailStr, Field
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
 from src.domain.value_objects import ContactInfo, ReservationStatus
 
 class CustomerDetails(BaseModel):
@@ -13,6 +13,7 @@ class BookingInfo(BaseModel):
     start_time: datetime
     end_time: datetime
     duration_minutes: int
+    party_size: int = 2
     is_peak_hour: bool = False 
 
 class PaymentInfo(BaseModel):
@@ -32,6 +33,10 @@ class ReservationResponse(BaseModel):
     booking_info: BookingInfo
     payment_info: PaymentInfo
     meta: Metadata
+
+class ReservationPage(BaseModel):
+    items: List[ReservationResponse]
+    next_cursor: Optional[str] = None
     
 class ContactInfoSchema(BaseModel):
     name: str
@@ -43,6 +48,7 @@ class CreateReservationRequest(BaseModel):
     contact_info: ContactInfoSchema
     start_time: datetime
     duration_minutes: int = 90
+    party_size: int = Field(2, ge=1)
 
 class AssignTableRequest(BaseModel):
     table_id: UUID4
@@ -61,4 +67,96 @@ class ReservationStats(BaseModel):
     completed_count: int
     cancelled_count: int
     total_revenue: float
-    generated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    generated_at: datetime = Field(default_factory=datetime.now)
+
+class DailyStats(ReservationStats):
+    day: date
+    # None groups reservations that have no table (and so no area) yet
+    area: Optional[str] = None
+
+class BatchCreateRequest(BaseModel):
+    # items are validated one by one so a bad row doesn't reject the whole batch
+    items: List[Dict[str, Any]]
+
+class TransitionItem(BaseModel):
+    reservation_id: UUID4
+    action: Literal["confirm", "check_in", "complete", "cancel"]
+    reason_code: Optional[str] = None
+    description: Optional[str] = None
+
+class BatchTransitionRequest(BaseModel):
+    items: List[Dict[str, Any]]
+
+class BatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    reservation_id: Optional[UUID4] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    method: str
+    errors: List[ImportRowError]
+    # only the first errors are listed; `failed` counts them all
+    errors_truncated: bool = False
+
+class AvailabilitySlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class TableAvailability(BaseModel):
+    table_id: UUID4
+    area: Optional[str] = None
+    free: List[AvailabilitySlot]
+
+class AvailabilityResponse(BaseModel):
+    start: datetime
+    end: datetime
+    duration_minutes: int
+    tables: List[TableAvailability]
+
+class TableCreateRequest(BaseModel):
+    label: str
+    capacity: int = Field(ge=1)
+    area: str
+    position: int = 0
+
+class TableResponse(BaseModel):
+    table_id: UUID4
+    label: str
+    capacity: int
+    area: str
+    position: int
+    is_active: bool
+
+class AllocationResult(BaseModel):
+    reservation_id: UUID4
+    allocated: bool
+    table_id: Optional[UUID4] = None
+    joined_table_ids: List[UUID4] = []
+    capacity: Optional[int] = None
+    area: Optional[str] = None
+
+class BatchAllocationRequest(BaseModel):
+    start: datetime
+    end: datetime
+    area: Optional[str] = None
+
+class BatchAllocationResponse(BaseModel):
+    allocated: int
+    unallocated: int
+    elapsed_ms: float
+    results: List[AllocationResult]
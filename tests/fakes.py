@@ -0,0 +1,8 @@
+class FakeClock:
+    """A clock for code that takes `clock=`; tests move it by setting `now`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
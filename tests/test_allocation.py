@@ -0,0 +1,170 @@
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.domain.allocation import TableAllocator, TableSpec, BookingRequest
+from src.domain.availability import AvailabilityIndex
+from tests.test_api import get_valid_payload
+
+EVENING = datetime(2030, 6, 1, 18, 0)
+
+def booking(party_size, start=EVENING, minutes=90, area=None):
+    return BookingRequest(uuid.uuid4(), party_size, start, start + timedelta(minutes=minutes), area)
+
+def make_tables(*capacities, area="Indoor"):
+    return [TableSpec(uuid.uuid4(), cap, area, pos) for pos, cap in enumerate(capacities)]
+
+def test_best_fit_picks_smallest_table_that_seats_party():
+    tables = make_tables(8, 2, 4, 6)
+    allocator = TableAllocator(tables, AvailabilityIndex())
+
+    allocation = allocator.allocate(booking(3))
+    assert allocation.capacity == 4
+    assert allocation.joined_table_ids == ()
+
+def test_best_fit_prefers_tightest_gap():
+    a, b = make_tables(4, 4)
+    index = AvailabilityIndex()
+    # b was used until just before the evening, a has been free all day
+    index.add(uuid.uuid4(), b.table_id, EVENING - timedelta(hours=2), EVENING, "Indoor")
+    index.add(uuid.uuid4(), a.table_id, EVENING - timedelta(hours=6), EVENING - timedelta(hours=4), "Indoor")
+
+    assert TableAllocator([a, b], index).allocate(booking(4)).table_id == b.table_id
+
+def test_best_fit_skips_occupied_tables():
+    small, big = make_tables(2, 6)
+    index = AvailabilityIndex()
+    index.add(uuid.uuid4(), small.table_id, EVENING - timedelta(minutes=30), EVENING + timedelta(minutes=30), "Indoor")
+
+    assert TableAllocator([small, big], index).allocate(booking(2)).table_id == big.table_id
+
+def test_large_party_joins_adjacent_tables():
+    tables = make_tables(4, 4, 2, 4)
+    allocator = TableAllocator(tables, AvailabilityIndex())
+
+    allocation = allocator.allocate(booking(6))
+    # positions 1+2 (4+2) beat 0+1 (4+4): smallest total that seats the party
+    assert allocation.capacity == 6
+    assert [t.position for t in allocation.tables] == [1, 2]
+    assert allocation.joined_table_ids == (tables[2].table_id,)
+
+def test_joined_tables_must_be_adjacent_and_free():
+    tables = [TableSpec(uuid.uuid4(), 4, "Indoor", 0), TableSpec(uuid.uuid4(), 4, "Indoor", 2)]
+    assert TableAllocator(tables, AvailabilityIndex()).allocate(booking(8)) is None
+
+def test_area_restricts_allocation():
+    allocator = TableAllocator(make_tables(2) + make_tables(4, area="Outdoor"), AvailabilityIndex())
+    assert allocator.allocate(booking(2, area="Outdoor")).area == "Outdoor"
+
+def test_batch_does_not_double_book():
+    allocator = TableAllocator(make_tables(4, 4), AvailabilityIndex())
+    results = allocator.allocate_batch([booking(2), booking(2), booking(2)])
+
+    seated = [a for a in results.values() if a]
+    assert len(seated) == 2
+    assert seated[0].table_id != seated[1].table_id
+
+def test_batch_seats_large_parties_first():
+    allocator = TableAllocator(make_tables(2, 6), AvailabilityIndex())
+    small, large = booking(2), booking(6)
+    results = allocator.allocate_batch([small, large])
+
+    assert results[large.reservation_id].capacity == 6
+    assert results[small.reservation_id].capacity == 2
+
+def test_batch_allocation_for_an_evening_is_fast():
+    rng = random.Random(3)
+    tables = []
+    for area in ("Indoor", "Outdoor", "Terrace"):
+        tables += make_tables(*(rng.choice((2, 2, 4, 4, 6, 8)) for _ in range(100)), area=area)
+    bookings = [
+        booking(rng.randint(1, 10), EVENING + timedelta(minutes=15 * rng.randrange(16)), rng.choice((90, 120)))
+        for _ in range(600)
+    ]
+    allocator = TableAllocator(tables, AvailabilityIndex())
+
+    started = time.perf_counter()
+    results = allocator.allocate_batch(bookings)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    by_id = {b.reservation_id: b for b in bookings}
+    seated = {}
+    for rid, allocation in results.items():
+        for table in allocation.tables if allocation else ():
+            seated.setdefault(table.table_id, []).append((by_id[rid].start, by_id[rid].end))
+    for intervals in seated.values():
+        intervals.sort()
+        assert all(prev[1] <= cur[0] for prev, cur in zip(intervals, intervals[1:]))
+
+    assert sum(1 for a in results.values() if a) > 450
+    assert elapsed_ms < 2000
+
+# --- API ---
+
+def add_table(client, label, capacity, position, area="Indoor"):
+    resp = client.post("/api/tables", json={"label": label, "capacity": capacity, "area": area, "position": position})
+    assert resp.status_code == 200
+    return resp.json()["table_id"]
+
+def create_party(client, party_size):
+    payload = get_valid_payload()
+    payload["party_size"] = party_size
+    return client.post("/api/reservations", json=payload).json()["reservation_id"]
+
+def test_table_catalogue(client):
+    add_table(client, "T1", 4, 0)
+    assert client.post("/api/tables", json={"label": "T1", "capacity": 2, "area": "Indoor"}).status_code == 409
+
+    tables = client.get("/api/tables").json()
+    assert [t["label"] for t in tables] == ["T1"]
+
+def test_auto_assign(client):
+    add_table(client, "T1", 6, 0)
+    small = add_table(client, "T2", 2, 1)
+    res_id = create_party(client, 2)
+
+    resp = client.post(f"/api/reservations/{res_id}/auto-assign")
+    assert resp.status_code == 200
+    assert resp.json()["table_id"] == small
+
+    fetched = client.get(f"/api/reservations/{res_id}").json()
+    assert fetched["table_area"] == "Indoor"
+
+def test_auto_assign_joins_tables_and_reports_no_fit(client):
+    first = add_table(client, "T1", 4, 0)
+    second = add_table(client, "T2", 4, 1)
+
+    resp = client.post(f"/api/reservations/{create_party(client, 7)}/auto-assign")
+    assert resp.status_code == 200
+    assert resp.json()["table_id"] == first
+    assert resp.json()["joined_table_ids"] == [second]
+
+    # both tables are now taken for the slot
+    resp = client.post(f"/api/reservations/{create_party(client, 2)}/auto-assign")
+    assert resp.status_code == 409
+
+def test_assign_table_rejects_small_table(client):
+    table_id = add_table(client, "T1", 2, 0)
+    res_id = create_party(client, 4)
+
+    resp = client.post(f"/api/reservations/{res_id}/assign-table", json={"table_id": table_id, "capacity": 8, "area": "Indoor"})
+    assert resp.status_code == 400
+
+def test_batch_allocation(client):
+    add_table(client, "T1", 2, 0)
+    add_table(client, "T2", 4, 1)
+    ids = [create_party(client, size) for size in (2, 4, 4)]
+
+    payload = get_valid_payload()
+    start = datetime.fromisoformat(payload["start_time"])
+    window = {"start": (start - timedelta(hours=1)).isoformat(), "end": (start + timedelta(hours=1)).isoformat()}
+    resp = client.post("/api/allocations:batch", json=window)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["allocated"] == 2
+    assert body["unallocated"] == 1
+    assert {r["reservation_id"] for r in body["results"]} == set(ids)
+
+    # allocated reservations drop out of the next run
+    assert client.post("/api/allocations:batch", json=window).json()["allocated"] == 0
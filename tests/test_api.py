@@ -1,5 +1,5 @@
 import uuid
-import pytest
+from src.api import routes
 from src.core.security import get_current_user
 from main import app
 
@@ -138,4 +138,97 @@ def test_unauthorized_access(client):
     app.dependency_overrides.pop(get_current_user, None)
     
     response = client.get(f"/api/reservations/{uuid.uuid4()}")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+# --- TEST PAGINATION ---
+
+def create_at(client, auth_headers, start_time):
+    payload = get_valid_payload()
+    payload["start_time"] = start_time
+    return client.post("/api/reservations", json=payload, headers=auth_headers).json()
+
+def test_cursor_pagination_walks_all_pages(client, auth_headers):
+    created = [create_at(client, auth_headers, f"2025-12-{day:02d}T19:00:00")["reservation_id"] for day in range(1, 8)]
+    # same start_time: the reservation_id tie-breaker keeps the order stable
+    created.append(create_at(client, auth_headers, "2025-12-07T19:00:00")["reservation_id"])
+
+    seen = []
+    page = client.get("/api/reservations?paginate=cursor&limit=3", headers=auth_headers).json()
+    while True:
+        seen.extend(item["reservation_id"] for item in page["items"])
+        if not page["next_cursor"]:
+            break
+        page = client.get(f"/api/reservations?limit=3&cursor={page['next_cursor']}", headers=auth_headers).json()
+
+    assert len(seen) == len(created)
+    assert set(seen) == set(created)
+    assert seen[:6] == created[:6]
+
+def test_pagination_filters(client, auth_headers):
+    early = create_at(client, auth_headers, "2025-12-01T12:00:00")["reservation_id"]
+    late = create_at(client, auth_headers, "2025-12-20T19:00:00")["reservation_id"]
+    client.post(f"/api/reservations/{late}/assign-table",
+                json={"table_id": str(uuid.uuid4()), "capacity": 2, "area": "Outdoor"}, headers=auth_headers)
+
+    response = client.get("/api/reservations?start_from=2025-12-10T00:00:00&start_to=2026-01-01T00:00:00", headers=auth_headers)
+    assert [r["reservation_id"] for r in response.json()] == [late]
+
+    response = client.get("/api/reservations?paginate=cursor&table_area=Outdoor", headers=auth_headers)
+    assert [r["reservation_id"] for r in response.json()["items"]] == [late]
+    assert response.json()["next_cursor"] is None
+
+    response = client.get("/api/reservations?skip=0&limit=1", headers=auth_headers)
+    assert [r["reservation_id"] for r in response.json()] == [early]
+
+def test_invalid_cursor(client, auth_headers):
+    response = client.get("/api/reservations?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+# --- TEST BATCH ---
+
+def test_batch_create_reports_per_item(client, auth_headers):
+    bad = get_valid_payload()
+    bad["contact_info"]["email"] = "not-an-email"
+    response = client.post("/api/reservations:batch",
+                           json={"items": [get_valid_payload(), bad, get_valid_payload()]}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 2, 1)
+    assert body["results"][1]["ok"] is False
+    assert "email" in body["results"][1]["error"]
+
+    res_id = body["results"][0]["reservation_id"]
+    assert client.get(f"/api/reservations/{res_id}", headers=auth_headers).json()["status"] == "PENDING"
+    assert client.get("/api/stats", headers=auth_headers).json()["pending_count"] == 2
+
+def test_batch_transitions_apply_state_rules_in_order(client, auth_headers):
+    created = client.post("/api/reservations:batch",
+                          json={"items": [get_valid_payload(), get_valid_payload()]}, headers=auth_headers).json()
+    first, second = (r["reservation_id"] for r in created["results"])
+
+    items = [
+        {"reservation_id": first, "action": "confirm"},
+        {"reservation_id": first, "action": "check_in"},
+        {"reservation_id": second, "action": "check_in"},
+        {"reservation_id": second, "action": "cancel", "reason_code": "REQ"},
+        {"reservation_id": str(uuid.uuid4()), "action": "confirm"},
+        {"reservation_id": first, "action": "teleport"},
+    ]
+    body = client.post("/api/reservations/transitions:batch", json={"items": items}, headers=auth_headers).json()
+    assert [r["ok"] for r in body["results"]] == [True, True, False, True, False, False]
+    assert "must be CONFIRMED" in body["results"][2]["error"]
+    assert body["results"][4]["error"] == "Reservation not found"
+
+    assert client.get(f"/api/reservations/{first}", headers=auth_headers).json()["status"] == "CHECKED_IN"
+    assert client.get(f"/api/reservations/{second}", headers=auth_headers).json()["status"] == "CANCELLED"
+
+def test_batch_transitions_roll_back_when_a_row_moved(client, auth_headers, monkeypatch):
+    res_id = client.post("/api/reservations", json=get_valid_payload(), headers=auth_headers).json()["reservation_id"]
+    client.post(f"/api/reservations/{res_id}/cancel", json={"reason_code": "REQ", "description": "-"}, headers=auth_headers)
+    # the batch read PENDING just before another request cancelled the reservation
+    monkeypatch.setattr(routes, "load_statuses", lambda db, ids: {uuid.UUID(res_id): "PENDING"})
+
+    items = [{"reservation_id": res_id, "action": "confirm"}]
+    response = client.post("/api/reservations/transitions:batch", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 409
+    assert client.get(f"/api/reservations/{res_id}", headers=auth_headers).json()["status"] == "CANCELLED"
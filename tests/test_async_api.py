@@ -0,0 +1,75 @@
+import uuid
+
+from src.infrastructure.database import to_async_url
+from tests.test_api import get_valid_payload
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    assert to_async_url("postgresql+psycopg2://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+def test_async_create_and_get(async_client):
+    created = async_client.post("/api/reservations", json=get_valid_payload())
+    assert created.status_code == 200
+    res_id = created.json()["reservation_id"]
+
+    response = async_client.get(f"/api/reservations/{res_id}")
+    assert response.status_code == 200
+    assert response.json()["customer_details"]["name"] == "Budi"
+
+    listed = async_client.get("/api/reservations?status=PENDING")
+    assert listed.status_code == 200
+    assert len(listed.json()) == 1
+
+def test_async_not_found(async_client):
+    response = async_client.get(f"/api/reservations/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+def test_async_business_flow(async_client):
+    res_id = async_client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+
+    assert async_client.post(f"/api/reservations/{res_id}/confirm").json()["status"] == "CONFIRMED"
+    assert async_client.post(f"/api/reservations/{res_id}/check-in").json()["status"] == "CHECKED_IN"
+    assert async_client.post(f"/api/reservations/{res_id}/complete").json()["status"] == "COMPLETED"
+
+    resp = async_client.post(f"/api/reservations/{res_id}/cancel", json={"reason_code": "REQ", "description": "x"})
+    assert resp.status_code == 400
+
+    stats = async_client.get("/api/stats").json()
+    assert stats["completed_count"] == 1
+
+def test_async_assign_table_and_cancel(async_client):
+    res_id = async_client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+
+    payload = {"table_id": str(uuid.uuid4()), "capacity": 4, "area": "Indoor"}
+    assert async_client.post(f"/api/reservations/{res_id}/assign-table", json=payload).status_code == 200
+    assert async_client.get(f"/api/reservations/{res_id}").json()["table_area"] == "Indoor"
+
+    resp = async_client.post(f"/api/reservations/{res_id}/cancel", json={"reason_code": "REQ", "description": "x"})
+    assert resp.json()["status"] == "CANCELLED"
+
+def test_async_batches_and_daily_stats(async_client):
+    created = async_client.post("/api/reservations:batch", json={"items": [get_valid_payload(), get_valid_payload()]}).json()
+    ids = [r["reservation_id"] for r in created["results"]]
+    items = [{"reservation_id": rid, "action": "confirm"} for rid in ids]
+    assert async_client.post("/api/reservations/transitions:batch", json={"items": items}).json()["succeeded"] == 2
+
+    day = get_valid_payload()["start_time"][:10]
+    daily = async_client.get("/api/stats/daily", params={"start": day, "end": day}).json()
+    assert sum(row["confirmed_count"] for row in daily) == 2
+
+def test_async_tables_and_allocation(async_client):
+    table = async_client.post("/api/tables", json={"label": "T1", "capacity": 4, "area": "Indoor", "position": 0}).json()
+    assert [t["label"] for t in async_client.get("/api/tables").json()] == ["T1"]
+
+    first = async_client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    assert async_client.post(f"/api/reservations/{first}/auto-assign").json()["table_id"] == table["table_id"]
+
+    async_client.post("/api/reservations", json=get_valid_payload())
+    start = get_valid_payload()["start_time"]
+    window = {"start": start[:11] + "00:00:00", "end": start[:11] + "23:59:00"}
+    # the only table is taken for the slot
+    assert async_client.post("/api/allocations:batch", json=window).json()["unallocated"] == 1
+
+    free = async_client.get("/api/availability", params={"start": window["start"], "end": window["end"]}).json()
+    assert [t["table_id"] for t in free["tables"]] == [table["table_id"]]
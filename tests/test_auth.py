@@ -0,0 +1,155 @@
+import threading
+import time
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.api import admin, auth
+from src.core.revocation import RevocationIndex, revoked_tokens
+from src.core.security import get_current_principal, get_current_user
+from src.infrastructure import users
+from main import app
+from tests.conftest import engine
+
+@pytest.fixture
+def real_auth(client, monkeypatch):
+    # cheap seed hash, and the real token check instead of the conftest override
+    monkeypatch.setitem(auth.SEED_USERS["admin"], "hashed_password", bcrypt.hashpw(b"password123", bcrypt.gensalt(4)).decode())
+    app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_current_principal, None)
+    revoked_tokens.clear()
+    yield client
+    revoked_tokens.clear()
+
+def login(client, username="admin", password="password123"):
+    response = client.post("/api/token", data={"username": username, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+def staff_login(client, db):
+    users.create_user(db, "staff", bcrypt.hashpw(b"staff123", bcrypt.gensalt(4)).decode(), ["staff"])
+    db.commit()
+    return login(client, "staff", "staff123")
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def test_login_creates_seed_user_once(real_auth, db_session):
+    login(real_auth)
+    login(real_auth)
+    user = users.get_user(db_session, "admin")
+    assert users.roles_of(user) == ["admin"]
+    assert real_auth.get("/api/stats", headers=bearer(login(real_auth))).status_code == 200
+
+@pytest.mark.parametrize("route", admin.router.routes, ids=lambda route: route.path)
+def test_admin_endpoints_need_the_admin_role(real_auth, db_session, route):
+    [method] = route.methods
+    staff = staff_login(real_auth, db_session)
+    assert real_auth.get("/api/stats", headers=bearer(staff)).status_code == 200
+    assert real_auth.request(method, "/api" + route.path, headers=bearer(staff)).status_code == 403
+    assert real_auth.request(method, "/api" + route.path, headers=bearer(login(real_auth))).status_code == 200
+
+def test_refresh_rotates_tokens(real_auth):
+    tokens = login(real_auth)
+    refreshed = real_auth.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    new_tokens = refreshed.json()
+    assert new_tokens["refresh_token"] != tokens["refresh_token"]
+    assert real_auth.get("/api/stats", headers=bearer(new_tokens)).status_code == 200
+
+    # the rotated token is spent; replaying it also kills the one it was swapped for
+    assert real_auth.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    assert real_auth.post("/api/token/refresh", json={"refresh_token": new_tokens["refresh_token"]}).status_code == 401
+
+def test_refresh_rejects_garbage(real_auth):
+    assert real_auth.post("/api/token/refresh", json={"refresh_token": "nope"}).status_code == 401
+    tokens = login(real_auth)
+    token_id = tokens["refresh_token"].split(".")[0]
+    assert real_auth.post("/api/token/refresh", json={"refresh_token": f"{token_id}.wrong"}).status_code == 401
+
+def test_logout_revokes_access_and_refresh_token(real_auth, db_session):
+    tokens = login(real_auth)
+    assert real_auth.post("/api/logout", json={"refresh_token": tokens["refresh_token"]}, headers=bearer(tokens)).status_code == 200
+
+    assert real_auth.get("/api/stats", headers=bearer(tokens)).status_code == 401
+    assert real_auth.post("/api/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    # another worker picks the revocation up from the table
+    assert len(users.load_revoked_tokens()) == 1
+
+def test_revocation_check_does_not_query(real_auth):
+    tokens = login(real_auth)
+    real_auth.get("/api/stats", headers=bearer(tokens))  # loads the revocation list
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert real_auth.get("/api/stats", headers=bearer(tokens)).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert not any("revoked_tokens" in sql for sql in statements)
+
+def test_app_startup_wires_revocation_loading(monkeypatch):
+    monkeypatch.setattr(revoked_tokens, "loader", None)
+    with TestClient(app):
+        assert revoked_tokens.loader is users.load_revoked_tokens
+
+def test_revocation_index_refresh():
+    now = [100.0]
+    rows = [("a", 200.0), ("old", 50.0)]
+    index = RevocationIndex(loader=lambda: rows, refresh_interval=5, clock=lambda: now[0])
+    assert index.stale
+    index.refresh()
+    assert index.is_revoked("a") and not index.is_revoked("old")
+
+    index.add("local", 300.0)
+    rows.append(("b", 200.0))
+    now[0] = 106
+    assert index.stale
+    index.refresh()
+    assert index.is_revoked("b") and index.is_revoked("local")
+
+    now[0] = 250
+    assert not index.is_revoked("a")
+
+def test_revocation_index_survives_loader_errors():
+    def broken():
+        raise RuntimeError("db down")
+
+    index = RevocationIndex(loader=broken)
+    index.add("a", 2e9)
+    index.refresh()
+    assert index.is_revoked("a")
+    assert not index.stale
+
+def test_revocation_index_refreshes_once_for_concurrent_callers():
+    now = [100.0]
+    calls, release = [], threading.Event()
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(5)
+        return []
+
+    index = RevocationIndex(loader=slow_loader, refresh_interval=5, clock=lambda: now[0])
+    release.set()
+    index.refresh()
+    now[0] = 106
+    release.clear()
+
+    threads = [threading.Thread(target=index.refresh) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while len(calls) < 2:
+        time.sleep(0.01)
+    # one refresh is running: the rest of the stale window skips it
+    assert not index.due
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 2
+    assert not index.stale
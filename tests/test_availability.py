@@ -0,0 +1,220 @@
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from src.api import routes
+from src.domain.availability import AvailabilityIndex
+from src.infrastructure import availability
+from src.infrastructure.orm_models import ReservationORM, ReservationTableORM
+from tests.test_api import get_valid_payload
+
+T = datetime(2025, 12, 31)
+
+def at(hour, minute=0):
+    return T + timedelta(hours=hour, minutes=minute)
+
+def test_conflicts_are_half_open():
+    index = AvailabilityIndex()
+    table, first = uuid.uuid4(), uuid.uuid4()
+    index.add(first, table, at(18), at(19, 30))
+
+    assert index.conflicts(table, at(19), at(20)) == [first]
+    assert index.is_free(table, at(19, 30), at(21))
+    assert index.is_free(table, at(16), at(18))
+    assert index.is_free(table, at(18), at(19), ignore=first)
+
+def test_long_booking_found_from_later_window():
+    index = AvailabilityIndex()
+    table = uuid.uuid4()
+    index.add(uuid.uuid4(), table, at(10), at(16))
+    index.add(uuid.uuid4(), table, at(11), at(12))
+
+    assert len(index.conflicts(table, at(15), at(17))) == 1
+
+def test_free_slots_and_remove():
+    index = AvailabilityIndex()
+    table, lunch, dinner = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index.add(lunch, table, at(12), at(13, 30), "Indoor")
+    index.add(dinner, table, at(19), at(20, 30), "Indoor")
+
+    slots = index.free_slots(at(10), at(23), timedelta(minutes=90))
+    assert slots[table] == [(at(10), at(12)), (at(13, 30), at(19)), (at(20, 30), at(23))]
+    assert index.free_slots(at(10), at(23), timedelta(minutes=90), area="Outdoor") == {}
+
+    index.remove(lunch)
+    assert index.free_slots(at(10), at(19), timedelta(minutes=90))[table] == [(at(10), at(19))]
+
+def test_writes_during_a_load_are_replayed():
+    index = AvailabilityIndex()
+    table, stored, booked = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index.begin_load()
+    rows = [(stored, table, "Indoor", at(12), at(13))]
+    # committed after the rows were read
+    index.add(booked, table, at(19), at(20))
+    index.remove(stored)
+    index.load(rows)
+
+    assert index.conflicts(table, at(10), at(23)) == [booked]
+    assert not index.loading
+
+def assign(client, auth_headers, res_id, table_id, area="Indoor"):
+    return client.post(f"/api/reservations/{res_id}/assign-table",
+                       json={"table_id": table_id, "capacity": 4, "area": area}, headers=auth_headers)
+
+def test_assign_table_rejects_overlap(client, auth_headers):
+    table_id = str(uuid.uuid4())
+    first = client.post("/api/reservations", json=get_valid_payload(), headers=auth_headers).json()["reservation_id"]
+    second = client.post("/api/reservations", json=get_valid_payload(), headers=auth_headers).json()["reservation_id"]
+
+    assert assign(client, auth_headers, first, table_id).status_code == 200
+    response = assign(client, auth_headers, second, table_id)
+    assert response.status_code == 409
+    assert client.get(f"/api/reservations/{second}", headers=auth_headers).json()["table_area"] is None
+
+    # reassigning the same reservation to its own table is not a clash
+    assert assign(client, auth_headers, first, table_id).status_code == 200
+
+    client.post(f"/api/reservations/{first}/cancel", json={"reason_code": "REQ", "description": "x"}, headers=auth_headers)
+    assert assign(client, auth_headers, second, table_id).status_code == 200
+
+def test_availability_endpoint(client, auth_headers):
+    table_id = str(uuid.uuid4())
+    res_id = client.post("/api/reservations", json=get_valid_payload(), headers=auth_headers).json()["reservation_id"]
+    assign(client, auth_headers, res_id, table_id, "Outdoor")
+
+    response = client.get(
+        "/api/availability?start=2025-12-31T17:00:00&end=2025-12-31T23:00:00&duration_minutes=90&area=Outdoor",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    tables = response.json()["tables"]
+    assert [t["table_id"] for t in tables] == [table_id]
+    assert tables[0]["free"] == [
+        {"start": "2025-12-31T17:00:00", "end": "2025-12-31T19:00:00"},
+        {"start": "2025-12-31T20:30:00", "end": "2025-12-31T23:00:00"},
+    ]
+
+    bad = client.get("/api/availability?start=2025-12-31T23:00:00&end=2025-12-31T17:00:00", headers=auth_headers)
+    assert bad.status_code == 400
+
+def test_overlapping_loads_share_recorded_writes():
+    index = AvailabilityIndex()
+    table, first, second = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index.begin_load()
+    index.begin_load()
+    index.add(first, table, at(12), at(13))
+    index.load([])
+    assert index.loading
+    index.add(second, table, at(19), at(20))
+    index.load([])
+    assert sorted(index.conflicts(table, at(10), at(23))) == sorted([first, second])
+    assert not index.loading
+
+def test_failed_load_stops_recording(monkeypatch, db_session):
+    index = AvailabilityIndex()
+    monkeypatch.setattr(availability, "availability_index", index)
+
+    def broken(db, since):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(availability, "_read_index", broken)
+    with pytest.raises(RuntimeError):
+        availability.ensure_loaded(db_session)
+    assert not index.loading and not index.loaded
+
+def booked(db, table_id, start_time, status="CONFIRMED", joined_table_ids=()):
+    reservation_id = uuid.uuid4()
+    db.add(ReservationORM(
+        reservation_id=reservation_id, customer_id=uuid.uuid4(), status=status, start_time=start_time,
+        duration_minutes=90, table_id=table_id, table_area="Indoor",
+        contact_name="Budi", contact_phone="0812345", contact_email="budi@test.com"
+    ))
+    db.flush()
+    db.add_all(ReservationTableORM(reservation_id=reservation_id, table_id=tid) for tid in joined_table_ids)
+    db.commit()
+
+def test_stale_index_is_reloaded_in_the_background(client, auth_headers, db_session, committed_sessions, monkeypatch):
+    table_id = uuid.uuid4()
+    day = (datetime.utcnow() + timedelta(days=1)).date().isoformat()
+    window = f"/api/availability?start={day}T17:00:00&end={day}T23:00:00&table_id={table_id}"
+    assert len(client.get(window, headers=auth_headers).json()["tables"][0]["free"]) == 1
+
+    # booked through another worker: this process's index hasn't seen it
+    booked(db_session, table_id, datetime.fromisoformat(f"{day}T19:00:00"))
+    assert len(client.get(window, headers=auth_headers).json()["tables"][0]["free"]) == 1
+
+    monkeypatch.setattr(availability, "AVAILABILITY_REFRESH", 0)
+    # the request that finds the index stale is served the current copy
+    assert len(client.get(window, headers=auth_headers).json()["tables"][0]["free"]) == 1
+    availability.refresh_thread.join()
+    monkeypatch.setattr(availability, "AVAILABILITY_REFRESH", 30)
+    assert len(client.get(window, headers=auth_headers).json()["tables"][0]["free"]) == 2
+
+def test_failed_refresh_keeps_the_current_index(monkeypatch, committed_sessions):
+    index = AvailabilityIndex()
+    index.load([])
+    monkeypatch.setattr(availability, "availability_index", index)
+    monkeypatch.setattr(availability, "_read_index", lambda db, since: 1 / 0)
+    availability.start_refresh()
+    availability.refresh_thread.join()
+    assert index.loaded and not index.loading
+    # the next stale request can try again
+    assert availability._refreshing.acquire(blocking=False)
+    availability._refreshing.release()
+
+def test_only_recent_bookings_are_loaded(db_session):
+    table_id, joined = uuid.uuid4(), uuid.uuid4()
+    now = datetime.utcnow()
+    booked(db_session, table_id, now - availability.AVAILABILITY_LOOKBACK - timedelta(hours=1), status="COMPLETED")
+    booked(db_session, table_id, now - timedelta(hours=1))
+    booked(db_session, table_id, now + timedelta(days=1), joined_table_ids=[joined])
+
+    rows, _ = availability._read_index(db_session, now - availability.AVAILABILITY_LOOKBACK)
+    assert sorted((start, tid == joined) for _, tid, _, start, _ in rows) == [
+        (now - timedelta(hours=1), False), (now + timedelta(days=1), False), (now + timedelta(days=1), True)
+    ]
+
+# --- CONCURRENT BOOKINGS ---
+
+async def test_concurrent_assignments_book_a_table_once(threaded_app, monkeypatch):
+    respond = routes.respond
+
+    def slow_respond(db, result):
+        time.sleep(0.2)  # between the overlap check and the commit
+        return respond(db, result)
+
+    table = {"table_id": str(uuid.uuid4()), "capacity": 4, "area": "Indoor"}
+    transport = httpx.ASGITransport(app=threaded_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        created = [await client.post("/api/reservations", json=get_valid_payload()) for _ in range(2)]
+        monkeypatch.setattr(routes, "respond", slow_respond)
+        responses = await asyncio.gather(*(
+            client.post(f"/api/reservations/{r.json()['reservation_id']}/assign-table", json=table) for r in created
+        ))
+
+    assert sorted(r.status_code for r in responses) == [200, 409]
+
+async def test_busy_table_is_not_waited_for_on_the_event_loop():
+    table_id = uuid.uuid4()
+    held, release = threading.Event(), threading.Event()
+
+    def book():
+        with availability.booking_tables([table_id]):
+            held.set()
+            release.wait()
+
+    booking = threading.Thread(target=book)
+    booking.start()
+    held.wait()
+    with pytest.raises(availability.TableBusy):
+        with availability.booking_tables([table_id]):
+            pass
+    release.set()
+    booking.join()
+    with availability.booking_tables([table_id]):
+        pass
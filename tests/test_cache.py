@@ -0,0 +1,177 @@
+import fnmatch
+
+import pytest
+from sqlalchemy import event
+
+from src.infrastructure.cache import (
+    LRUTTLCache, RedisCache, NullCache, ReadThroughCache, build_backend, read_cache
+)
+from src.schemas.reservation import ReservationStats
+from tests.conftest import engine
+from tests.fakes import FakeClock
+from tests.test_api import get_valid_payload
+
+class FakeRedis:
+    """The slice of redis-py that RedisCache uses, with expiry on a fake clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or entry[0] <= self.clock():
+            self.data.pop(key, None)
+            return None
+        return entry[1]
+
+    def set(self, key, value, ex=None):
+        value = value.encode() if isinstance(value, str) else value
+        self.data[key] = (self.clock() + (ex or float("inf")), value)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*"):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+def stats(total=1):
+    return ReservationStats(
+        total_reservations=total, pending_count=total, confirmed_count=0, checked_in_count=0,
+        completed_count=0, cancelled_count=0, total_revenue=0.0
+    )
+
+@pytest.fixture
+def count_queries():
+    counter = {"n": 0}
+
+    def on_execute(*args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield counter
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+def test_lru_entries_expire():
+    clock = FakeClock()
+    cache = LRUTTLCache(clock=clock)
+    cache.set("a", 1, ttl=5)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+
+@pytest.mark.parametrize("backend_factory", [
+    lambda clock: LRUTTLCache(clock=clock),
+    lambda clock: RedisCache(FakeRedis(clock)),
+], ids=["memory", "redis"])
+def test_read_through(backend_factory):
+    clock = FakeClock()
+    cache = ReadThroughCache(backend_factory(clock))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return stats(len(loads))
+
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=5).total_reservations == 1
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=5).total_reservations == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate("stats")
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=5).total_reservations == 2
+
+    clock.now = 10
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=5).total_reservations == 3
+    assert cache.snapshot()["hit_ratio"] == 0.25
+
+def test_redis_round_trips_plain_dicts():
+    cache = ReadThroughCache(RedisCache(FakeRedis(FakeClock())))
+    value = {"reservation_id": "abc", "payment_info": {"amount": 1.5}}
+
+    assert cache.get_or_load("k", None, lambda: value, ttl=5) == value
+    assert cache.get_or_load("k", None, lambda: None, ttl=5) == value
+    assert cache.hits == 1
+
+def test_loader_errors_are_not_cached():
+    cache = ReadThroughCache(LRUTTLCache())
+
+    def missing():
+        raise LookupError("nope")
+
+    with pytest.raises(LookupError):
+        cache.get_or_load("k", ReservationStats, missing, ttl=5)
+    assert cache.backend.get("k") is None
+
+def test_value_loaded_across_an_invalidation_is_not_stored():
+    cache = ReadThroughCache(LRUTTLCache())
+    loads = []
+
+    def loader():
+        loads.append(1)
+        if len(loads) == 1:
+            # a write lands while the old value is being read
+            cache.invalidate("stats")
+        return stats(len(loads))
+
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=60).total_reservations == 1
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=60).total_reservations == 2
+    assert cache.get_or_load("stats", ReservationStats, loader, ttl=60).total_reservations == 2
+    assert cache.snapshot()["discarded"] == 1
+
+def test_build_backend():
+    assert isinstance(build_backend("memory"), LRUTTLCache)
+    assert isinstance(build_backend("none"), NullCache)
+    with pytest.raises(ValueError):
+        build_backend("memcached")
+
+# --- API ---
+
+def test_get_reservation_is_cached_and_invalidated(client, count_queries):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    read_cache.reset_counters()
+
+    client.get(f"/api/reservations/{res_id}")
+    executed = count_queries["n"]
+    assert client.get(f"/api/reservations/{res_id}").json()["status"] == "PENDING"
+    assert count_queries["n"] == executed
+
+    client.post(f"/api/reservations/{res_id}/confirm")
+    assert client.get(f"/api/reservations/{res_id}").json()["status"] == "CONFIRMED"
+
+    metrics = client.get("/api/admin/cache").json()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 2
+    assert metrics["invalidations"] >= 2
+
+def test_stats_follow_writes(client):
+    assert client.get("/api/stats").json()["total_reservations"] == 0
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    assert client.get("/api/stats").json()["pending_count"] == 1
+
+    client.post("/api/reservations/transitions:batch", json={"items": [{"reservation_id": res_id, "action": "confirm"}]})
+    stats = client.get("/api/stats").json()
+    assert stats["pending_count"] == 0
+    assert stats["confirmed_count"] == 1
+
+    client.post("/api/reservations:batch", json={"items": [get_valid_payload()]})
+    assert client.get("/api/stats").json()["total_reservations"] == 2
+
+def test_cached_stats_skip_the_database(client, count_queries):
+    client.post("/api/reservations", json=get_valid_payload())
+    client.get("/api/stats")
+    executed = count_queries["n"]
+    for _ in range(10):
+        assert client.get("/api/stats").json()["total_reservations"] == 1
+    assert count_queries["n"] == executed
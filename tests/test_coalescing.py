@@ -0,0 +1,234 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from src.api import routes
+from src.api.serialization import ORJSONResponse
+from src.core.security import get_current_user
+from src.infrastructure.database import get_db
+from src.infrastructure.singleflight import SingleFlight, read_flights
+from main import app
+from tests.test_api import get_valid_payload
+
+CALLERS = 20
+
+@pytest.fixture
+def slow_reads(committed_sessions):
+    """The app on one session per request, with every SELECT slowed down so
+    concurrent requests overlap; yields the SELECTs executed."""
+    bind = committed_sessions.kw["bind"]
+    selects = []
+
+    def on_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+            time.sleep(0.2)
+
+    def override_get_db():
+        db = committed_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: "admin_test"
+    event.listen(bind, "before_cursor_execute", on_execute)
+    yield selects
+    event.remove(bind, "before_cursor_execute", on_execute)
+    app.dependency_overrides.clear()
+
+async def fire(requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(url, params=params) for url, params in requests))
+
+async def test_concurrent_identical_lists_run_one_query(slow_reads):
+    responses = await fire([("/api/reservations", {"status": "PENDING"})] * CALLERS)
+
+    assert len(slow_reads) == 1
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    route = read_flights.snapshot()["routes"]["list_reservations"]
+    assert (route["requests"], route["executions"]) == (CALLERS, 1)
+    assert route["coalescing_ratio"] == round((CALLERS - 1) / CALLERS, 4)
+
+async def test_concurrent_stats_run_one_query(slow_reads):
+    responses = await fire([("/api/stats", {})] * CALLERS)
+    assert len(slow_reads) == 1
+    assert len({r.content for r in responses}) == 1
+
+async def test_keys_are_normalized_parameters(slow_reads):
+    await fire([
+        ("/api/reservations", {"status": "PENDING", "limit": "10"}),
+        ("/api/reservations", {"limit": "010", "status": "PENDING"}),
+        ("/api/reservations", {"status": "PENDING"}),  # limit defaults to 10
+        ("/api/reservations", {"status": "CONFIRMED"}),
+    ])
+    assert len(slow_reads) == 2
+
+def test_sequential_reads_still_see_writes(client):
+    assert client.get("/api/reservations").json() == []
+    client.post("/api/reservations", json=get_valid_payload())
+    assert len(client.get("/api/reservations").json()) == 1
+    assert client.get("/api/admin/coalescing").json()["routes"]["list_reservations"]["executions"] == 2
+
+def test_async_router_coalesces(async_client):
+    read_flights.reset_counters()
+    transport = httpx.ASGITransport(app=async_client.app)
+
+    async def storm():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/api/stats") for _ in range(CALLERS)))
+
+    responses = async_client.portal.call(storm)
+    assert {r.status_code for r in responses} == {200}
+    route = read_flights.snapshot()["routes"]["stats"]
+    assert route["requests"] == CALLERS
+    assert route["executions"] < CALLERS
+
+def test_coalesced_callers_get_their_own_response():
+    read_flights.reset_counters()
+    responses = []
+
+    def load():
+        time.sleep(0.1)
+        return ORJSONResponse({"total": 1})
+
+    threads = [threading.Thread(target=lambda: responses.append(routes.coalesced("test", ("k",), load))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    first, second = responses
+    assert first is not second and first.body == second.body == b'{"total":1}'
+    first.headers["X-Only-Mine"] = "1"
+    assert "X-Only-Mine" not in second.headers
+    assert read_flights.snapshot()["routes"]["test"]["executions"] == 1
+
+# --- SINGLE FLIGHT ---
+
+def run_together(flight, fn, callers=5, key="k"):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do("test", key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+def test_errors_are_shared_with_waiting_callers():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results, errors = run_together(SingleFlight(enabled=True), fail)
+    assert not results
+    assert len(errors) == 5 and all(str(e) == "boom" for e in errors)
+    assert len(calls) == 1
+    # each follower raises its own copy, chained from the leader's
+    [original] = [e for e in errors if e.__cause__ is None]
+    assert len({id(e) for e in errors}) == 5
+    assert all(e.__cause__ is original for e in errors if e is not original)
+
+def test_forget_starts_a_new_execution():
+    flight = SingleFlight(enabled=True)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return len(calls)
+
+    leader = threading.Thread(target=lambda: flight.do("test", "k", slow))
+    leader.start()
+    started.wait()
+    flight.forget()  # a write happened: the next reader must not join the old query
+    assert flight.do("test", "k", lambda: "fresh") == ("fresh", False)
+    release.set()
+    leader.join()
+    assert len(calls) == 1
+
+def test_disabled_flight_runs_every_call():
+    calls = []
+    run_together(SingleFlight(enabled=False), lambda: calls.append(1) or time.sleep(0.05))
+    assert len(calls) == 5
+
+async def test_async_errors_are_shared_with_waiting_callers():
+    flight = SingleFlight(enabled=True)
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do_async("test", "k", fail) for _ in range(5)), return_exceptions=True)
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len({id(r) for r in results}) == 5
+    assert flight.snapshot()["routes"]["test"]["executions"] == 1
+
+async def test_cancelled_async_leader_cancels_its_followers():
+    flight = SingleFlight(enabled=True)
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    leader = asyncio.create_task(flight.do_async("test", "k", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do_async("test", "k", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+    assert leader.cancelled()
+
+    async def fresh():
+        return "fresh"
+
+    assert await flight.do_async("test", "k", fresh) == ("fresh", False)
+
+async def test_cancelled_async_follower_leaves_the_leader_running():
+    flight = SingleFlight(enabled=True)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do_async("test", "k", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do_async("test", "k", slow))
+    await asyncio.sleep(0)
+    follower.cancel()
+    assert await leader == ("done", False)
+    assert follower.cancelled()
+
+async def test_disabled_flight_runs_every_async_call():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(SingleFlight(enabled=False).do_async("test", "k", load) for _ in range(3)))
+    assert len(calls) == 3
@@ -54,4 +54,28 @@ def test_cannot_cancel_completed_reservation(sample_reservation):
     
     reason = CancellationReason(reason_code="TEST", description="Testing")
     with pytest.raises(ValueError):
-        sample_reservation.cancel_reservation(reason)
\ No newline at end of file
+        sample_reservation.cancel_reservation(reason)
+
+def test_events_get_their_own_id_and_timestamp(sample_reservation):
+    sample_reservation.confirm_reservation()
+    created, confirmed = sample_reservation.collect_domain_events()
+    assert created.event_id != confirmed.event_id
+    assert created.occurred_on <= confirmed.occurred_on
+    assert sample_reservation.collect_domain_events() == []
+
+def test_aggregates_are_slotted(sample_reservation):
+    sample_reservation.assign_table(uuid.uuid4(), 4, "Indoor")
+    for obj in (sample_reservation, sample_reservation.table_assignment, sample_reservation.history[0]):
+        assert not hasattr(obj, "__dict__")
+
+def test_restored_reservation_builds_defaults_lazily():
+    reservation = Reservation.restore(
+        reservation_id=uuid.uuid4(), customer_id=uuid.uuid4(),
+        contact_info=ContactInfo(name="Test", phone="123", email="test@example.com"),
+        reservation_time=ReservationTime(start_time=datetime.now()),
+        status=ReservationStatus.CONFIRMED,
+    )
+    assert reservation._history is None and reservation._payment_detail is None
+    assert reservation.payment_detail.status == "UNPAID"
+    reservation.check_in()
+    assert [h.action for h in reservation.history] == ["CHECKED_IN"]
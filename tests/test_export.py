@@ -0,0 +1,70 @@
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+from sqlalchemy import insert
+
+from src.api import routes
+from src.infrastructure.orm_models import ReservationORM
+from tests.test_api import get_valid_payload
+
+STATUSES = ["PENDING", "CONFIRMED", "CANCELLED"]
+
+def seed(db, n):
+    start = datetime(2025, 3, 1, 10, 0)
+    db.execute(insert(ReservationORM), [{
+        "reservation_id": uuid.uuid4(), "customer_id": uuid.uuid4(), "status": STATUSES[i % 3],
+        "start_time": start + timedelta(minutes=30 * i), "duration_minutes": 90,
+        "contact_name": f"Guest {i}", "contact_phone": "0812345", "contact_email": f"guest{i}@test.com",
+        "payment_status": "UNPAID", "payment_amount": 0,
+    } for i in range(n)])
+    db.commit()
+
+def test_ndjson_export_streams_every_row_in_batches(client, db_session, monkeypatch):
+    monkeypatch.setattr(routes, "EXPORT_BATCH_SIZE", 7)
+    seed(db_session, 50)
+
+    response = client.get("/api/reservations/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert len(lines) == 50
+    assert lines[0]["customer_details"]["name"] == "Guest 0"
+    assert "meta" not in lines[0]
+    assert [line["booking_info"]["start_time"] for line in lines] == sorted(line["booking_info"]["start_time"] for line in lines)
+
+def test_export_uses_a_streaming_cursor():
+    stmt = routes.export_statement(("reservation_id", "status"))
+    assert stmt.get_execution_options()["yield_per"] == routes.EXPORT_BATCH_SIZE
+
+def test_csv_export_with_filters_and_fields(client, db_session):
+    seed(db_session, 30)
+
+    response = client.get(
+        "/api/reservations/export?format=csv&status=CONFIRMED&start_from=2025-03-01T12:00:00"
+        "&fields=status,booking_info.start_time"
+    )
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="reservations.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == ["reservation_id", "status", "booking_info.start_time"]
+    assert {row["status"] for row in rows} == {"CONFIRMED"}
+    # rows 4, 7, ..., 28 start at or after 12:00
+    assert len(rows) == 9
+    assert rows[0]["booking_info.start_time"] == "2025-03-01T12:00:00"
+
+def test_export_rejects_unknown_format_and_fields(client):
+    assert client.get("/api/reservations/export?format=xml").status_code == 422
+    assert client.get("/api/reservations/export?fields=bogus").status_code == 400
+
+def test_async_export(async_client):  # noqa: F811
+    for _ in range(3):
+        async_client.post("/api/reservations", json=get_valid_payload())
+
+    response = async_client.get("/api/reservations/export?fields=status")
+
+    assert [orjson.loads(line)["status"] for line in response.content.splitlines()] == ["PENDING"] * 3
@@ -0,0 +1,37 @@
+import uuid
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, select
+
+from benchmarks.common import spread_rows
+from src.infrastructure import stats
+from src.infrastructure.database import SessionLocal
+from src.infrastructure.orm_models import ReservationORM
+from tests.test_api import get_valid_payload
+
+@pytest.mark.parametrize("attempt", [1, 2])
+def test_writes_are_rolled_back_between_tests(client, db_session, attempt):
+    # the second run would see the first run's row if it had leaked
+    assert db_session.scalar(select(func.count()).select_from(ReservationORM)) == 0
+    assert client.post("/api/reservations", json=get_valid_payload()).status_code == 200
+    assert client.get("/api/stats").json()["total_reservations"] == 1
+
+def test_app_sessions_join_the_test_transaction(client, db_session):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    with SessionLocal() as other:
+        assert other.get(ReservationORM, uuid.UUID(res_id)) is not None
+
+@pytest.mark.parametrize("seeded", ["small", "medium"], indirect=True)
+def test_seeded_sizes_keep_stats_in_step(seeded, db_session):
+    by_status = Counter(row["status"] for row in seeded)
+    counts, revenue = stats.totals(db_session)
+    assert counts == dict(by_status)
+    assert revenue == sum(row["payment_amount"] for row in seeded)
+    assert stats.drift(db_session) == []
+
+def test_committed_sessions_see_each_other(committed_sessions, db_session):
+    db_session.add(ReservationORM(**next(spread_rows(1))))
+    db_session.commit()
+    with committed_sessions() as other:
+        assert other.scalar(select(func.count()).select_from(ReservationORM)) == 1
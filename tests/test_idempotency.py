@@ -0,0 +1,176 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+
+from src.api import routes
+from src.core.security import get_current_user
+from src.infrastructure.idempotency import idempotency_store, purge_expired
+from src.infrastructure.orm_models import IdempotencyKeyORM, ReservationORM
+from main import app
+from tests.test_api import get_valid_payload
+
+def keyed(key):
+    return {"Idempotency-Key": key}
+
+def count(db, model):
+    db.expire_all()
+    return db.scalar(select(func.count()).select_from(model))
+
+def test_retry_replays_the_first_response(client, db_session):
+    payload = get_valid_payload()
+    first = client.post("/api/reservations", json=payload, headers=keyed("retry-1"))
+    retry = client.post("/api/reservations", json=payload, headers=keyed("retry-1"))
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert count(db_session, ReservationORM) == 1
+    assert idempotency_store.snapshot()["executed"] == 1
+    assert idempotency_store.snapshot()["replayed"] == 1
+
+def test_requests_without_a_key_are_not_deduplicated(client, db_session):
+    payload = get_valid_payload()
+    client.post("/api/reservations", json=payload)
+    client.post("/api/reservations", json=payload)
+    assert count(db_session, ReservationORM) == 2
+    assert count(db_session, IdempotencyKeyORM) == 0
+
+def test_key_reused_for_another_request_is_rejected(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload(), headers=keyed("k"))
+    response = client.post("/api/reservations", json=get_valid_payload(), headers=keyed("k"))
+    assert response.status_code == 422
+    assert count(db_session, ReservationORM) == 1
+
+def test_keys_are_scoped_per_user(client, db_session):
+    payload = get_valid_payload()
+    client.post("/api/reservations", json=payload, headers=keyed("shared"))
+    app.dependency_overrides[get_current_user] = lambda: "someone_else"
+    response = client.post("/api/reservations", json=payload, headers=keyed("shared"))
+    assert "Idempotent-Replayed" not in response.headers
+    assert count(db_session, ReservationORM) == 2
+
+def test_retried_transition_is_replayed_not_rejected(client):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    client.post(f"/api/reservations/{res_id}/confirm")
+    assert client.post(f"/api/reservations/{res_id}/check-in", headers=keyed("c1")).status_code == 200
+    retry = client.post(f"/api/reservations/{res_id}/check-in", headers=keyed("c1"))
+    assert retry.status_code == 200
+    assert retry.json() == {"message": "Checked-in", "status": "CHECKED_IN"}
+    # without the key, checking in twice is an invalid transition
+    assert client.post(f"/api/reservations/{res_id}/check-in").status_code == 400
+
+def test_failed_request_frees_the_key(client, db_session):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    assert client.post(f"/api/reservations/{res_id}/check-in", headers=keyed("x")).status_code == 400
+    assert count(db_session, IdempotencyKeyORM) == 0
+
+    assert client.post(f"/api/reservations/{res_id}/confirm", headers=keyed("x")).status_code == 200
+    assert client.post(f"/api/reservations/{res_id}/check-in", headers=keyed("x")).status_code == 422
+
+def test_replay_from_the_table_when_not_cached(client, db_session):
+    payload = get_valid_payload()
+    first = client.post("/api/reservations:batch", json={"items": [payload, payload]}, headers=keyed("b"))
+    # as seen by another worker: nothing in its LRU
+    idempotency_store.cache.clear()
+    retry = client.post("/api/reservations:batch", json={"items": [payload, payload]}, headers=keyed("b"))
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert count(db_session, ReservationORM) == 2
+
+def test_expired_keys_are_purged_and_reusable(client, db_session):
+    payload = get_valid_payload()
+    client.post("/api/reservations", json=payload, headers=keyed("old"))
+    db_session.execute(update(IdempotencyKeyORM).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db_session.commit()
+    idempotency_store.cache.clear()
+
+    response = client.post("/api/reservations", json=payload, headers=keyed("old"))
+    assert "Idempotent-Replayed" not in response.headers
+    assert count(db_session, ReservationORM) == 2
+
+    db_session.execute(update(IdempotencyKeyORM).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    assert purge_expired(db_session) == 1
+    assert client.post("/api/admin/idempotency/purge").json() == {"purged": 0}
+
+def test_response_commits_with_the_write(client, db_session, monkeypatch):
+    def crash(*rids):
+        raise RuntimeError("worker died right after the commit")
+
+    payload = get_valid_payload()
+    monkeypatch.setattr(routes, "invalidate_reservations", crash)
+    with pytest.raises(RuntimeError):
+        client.post("/api/reservations", json=payload, headers=keyed("crashed"))
+    monkeypatch.undo()
+    idempotency_store.cache.clear()
+
+    retry = client.post("/api/reservations", json=payload, headers=keyed("crashed"))
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert count(db_session, ReservationORM) == 1
+
+def test_handler_must_respond_before_it_commits(db_session):
+    with pytest.raises(RuntimeError, match="respond"):
+        idempotency_store.execute(db_session, "silent", "fp", db_session.commit)
+    assert count(db_session, IdempotencyKeyORM) == 0
+
+    with pytest.raises(RuntimeError, match="committing"):
+        idempotency_store.execute(db_session, "uncommitted", "fp", lambda: idempotency_store.respond(db_session, 200, b"{}"))
+    assert count(db_session, IdempotencyKeyORM) == 0
+
+def test_key_without_a_response_answers_409(client, db_session):
+    # left by versions that stored the response in a second commit
+    payload = get_valid_payload()
+    client.post("/api/reservations", json=payload, headers=keyed("legacy"))
+    db_session.execute(update(IdempotencyKeyORM).values(status_code=None, response_body=None))
+    db_session.commit()
+    idempotency_store.cache.clear()
+
+    response = client.post("/api/reservations", json=payload, headers=keyed("legacy"))
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert count(db_session, ReservationORM) == 1
+
+# --- CONCURRENT DUPLICATES ---
+
+async def test_concurrent_duplicates_write_once(threaded_app, committed_sessions, monkeypatch):
+    new_reservation = routes.new_reservation
+
+    def slow_new_reservation(request):
+        time.sleep(0.2)  # keep the first attempt in flight while the others arrive
+        return new_reservation(request)
+
+    monkeypatch.setattr(routes, "new_reservation", slow_new_reservation)
+    payload = get_valid_payload()
+    transport = httpx.ASGITransport(app=threaded_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/reservations", json=payload, headers=keyed("storm")) for _ in range(8)
+        ))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["reservation_id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 7
+    assert idempotency_store.snapshot()["executed"] == 1
+    assert idempotency_store.snapshot()["collapsed"] >= 1
+    with committed_sessions() as db:
+        assert count(db, ReservationORM) == 1
+
+def test_async_router_collapses_duplicates(async_client):
+    payload = get_valid_payload()
+    transport = httpx.ASGITransport(app=async_client.app)
+
+    async def storm():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/api/reservations", json=payload, headers=keyed("async-storm")) for _ in range(5)
+            ))
+
+    responses = async_client.portal.call(storm)
+    assert len({r.json()["reservation_id"] for r in responses}) == 1
+    assert len(async_client.get("/api/reservations", params={"limit": 50}).json()) == 1
+    assert idempotency_store.snapshot()["executed"] == 1
@@ -0,0 +1,72 @@
+import uuid
+
+import orjson
+from sqlalchemy import func, select
+
+from src.api.imports import import_format, import_reservations, read_records
+from src.infrastructure.orm_models import ReservationORM
+from tests.conftest import engine
+from tests.test_api import get_valid_payload
+
+HEADER = "customer_id,contact_info.name,contact_info.phone,contact_info.email,start_time,duration_minutes,party_size\n"
+
+def csv_line(name="Budi", email="budi@test.com", start="2025-12-31T19:00:00", party=""):
+    return f"{uuid.uuid4()},{name},0812345,{email},{start},90,{party}\n"
+
+def count(db):
+    return db.scalar(select(func.count()).select_from(ReservationORM))
+
+def upload(client, name, content, **params):
+    return client.post("/api/reservations:import", params=params, files={"file": (name, content.encode())})
+
+def test_csv_import_reports_bad_rows(client, db_session):
+    content = HEADER + csv_line(party="4") + csv_line(email="not-an-email") + csv_line(name='"Sari, Jr."') + csv_line(start="tomorrow")
+
+    response = upload(client, "bookings.csv", content)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [e["line"] for e in report["errors"]] == [3, 5]
+    assert "contact_info.email" in report["errors"][0]["error"]
+    assert count(db_session) == 2
+    names = set(db_session.scalars(select(ReservationORM.contact_name)))
+    assert names == {"Budi", "Sari, Jr."}
+    party_sizes = sorted(db_session.scalars(select(ReservationORM.party_size)))
+    assert party_sizes == [2, 4]
+
+def test_ndjson_import(client, db_session):
+    lines = [orjson.dumps(get_valid_payload()).decode() for _ in range(3)]
+    content = "\n".join([lines[0], "{not json", "", lines[1], "[1, 2]", lines[2]]) + "\n"
+
+    report = upload(client, "bookings.ndjson", content).json()
+
+    assert (report["total"], report["imported"], report["failed"]) == (5, 3, 2)
+    assert [e["line"] for e in report["errors"]] == [2, 5]
+    assert client.get("/api/stats").json()["pending_count"] == 3
+
+def test_import_writes_in_chunks(db_session):
+    records = read_records((HEADER + "".join(csv_line() for _ in range(25))).splitlines(True), "csv")
+    report = import_reservations(db_session, records, chunk_size=10, max_errors=1)
+    assert report["imported"] == 25
+    assert count(db_session) == 25
+
+def test_error_list_is_capped(db_session):
+    records = [(n, {"customer_id": "nope"}) for n in range(1, 6)]
+    report = import_reservations(db_session, records, max_errors=2)
+    assert report["failed"] == 5
+    assert len(report["errors"]) == 2
+    assert report["errors_truncated"] is True
+
+def test_import_format():
+    assert import_format("a.CSV") == "csv"
+    assert import_format("a.jsonl") == "ndjson"
+    assert import_format("a.txt") is None
+
+def test_unknown_format_is_rejected(client):
+    assert upload(client, "bookings.txt", "x").status_code == 400
+    assert upload(client, "bookings.txt", HEADER + csv_line(), format="csv").json()["imported"] == 1
+
+def test_postgres_writes_through_copy(client):
+    expected = "copy" if engine.dialect.driver == "psycopg2" else "insert"
+    assert upload(client, "bookings.csv", HEADER + csv_line()).json()["method"] == expected
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import bcrypt
+import httpx
+import pytest
+
+from src.api import auth
+from src.core import security
+from src.core.password_pool import PasswordPool, PasswordPoolBusy
+from src.infrastructure.database import get_db
+from src.core.security import get_current_user
+from main import app
+from tests.test_api import get_valid_payload
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    pool = PasswordPool(workers=1, max_pending=16)
+    monkeypatch.setattr(security, "password_pool", pool)
+    monkeypatch.setattr(auth, "password_pool", pool)
+    yield pool
+    pool.shutdown()
+
+@pytest.fixture
+def storm_app(committed_sessions):
+    # one session per request: reads really run concurrently in the threadpool
+    def override_get_db():
+        db = committed_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: "admin_test"
+    yield app
+    app.dependency_overrides.clear()
+
+async def test_pool_rejects_when_full():
+    pool = PasswordPool(workers=1, max_pending=1)
+    results = await asyncio.gather(
+        *(pool.run(time.sleep, 0.2) for _ in range(3)), return_exceptions=True
+    )
+    assert sum(isinstance(r, PasswordPoolBusy) for r in results) == 1
+    assert pool.snapshot()["rejected"] == 1
+    assert pool.snapshot()["in_flight"] == 0
+    pool.shutdown()
+
+def test_seed_password_is_hashed_lazily_and_once(monkeypatch):
+    seed = {"password": "password123", "hashed_password": None}
+    calls = []
+    monkeypatch.setattr(auth, "get_password_hash", lambda p: calls.append(p) or "hashed")
+    assert auth._seed_hash(seed) == "hashed"
+    assert auth._seed_hash(seed) == "hashed"
+    assert calls == ["password123"]
+
+async def test_login_storm_rejected_with_503(storm_app, monkeypatch):
+    pool = PasswordPool(workers=1, max_pending=0)
+    monkeypatch.setattr(security, "password_pool", pool)
+    monkeypatch.setattr(auth, "password_pool", pool)
+    monkeypatch.setitem(auth.SEED_USERS["admin"], "hashed_password", bcrypt.hashpw(b"password123", bcrypt.gensalt(4)).decode())
+
+    transport = httpx.ASGITransport(app=storm_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/token", data={"username": "admin", "password": "password123"}) for _ in range(4)
+        ))
+    codes = sorted(r.status_code for r in responses)
+    assert 200 in codes and 503 in codes
+    assert all(r.headers.get("Retry-After") == "1" for r in responses if r.status_code == 503)
+    pool.shutdown()
+
+async def test_reads_stay_flat_during_login_storm(storm_app, small_pool, monkeypatch):
+    # load test: bcrypt on the event loop would stall every read for a full hash
+    hashed = bcrypt.hashpw(b"password123", bcrypt.gensalt())
+    t0 = time.perf_counter()
+    bcrypt.checkpw(b"password123", hashed)
+    hash_time = time.perf_counter() - t0
+    monkeypatch.setitem(auth.SEED_USERS["admin"], "hashed_password", hashed.decode())
+
+    transport = httpx.ASGITransport(app=storm_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res_id = (await client.post("/api/reservations", json=get_valid_payload())).json()["reservation_id"]
+
+        async def read_latencies(until):
+            samples = []
+            while not until():
+                started = time.perf_counter()
+                response = await client.get("/api/reservations", params={"limit": 5})
+                samples.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await client.get(f"/api/reservations/{res_id}")
+            return samples
+
+        baseline_started = time.perf_counter()
+        baseline = await read_latencies(lambda: time.perf_counter() - baseline_started > 0.3)
+
+        logins = [
+            asyncio.ensure_future(client.post("/api/token", data={"username": "admin", "password": "password123"}))
+            for _ in range(6)
+        ]
+        during = await read_latencies(lambda: all(task.done() for task in logins))
+        assert all(task.result().status_code == 200 for task in logins)
+
+    print(f"bcrypt {hash_time * 1000:.0f}ms; read p50/p99 baseline "
+          f"{percentile(baseline, 50) * 1000:.1f}/{percentile(baseline, 99) * 1000:.1f}ms, "
+          f"storm {percentile(during, 50) * 1000:.1f}/{percentile(during, 99) * 1000:.1f}ms over {len(during)} reads")
+    assert len(during) >= 10
+    assert percentile(during, 99) < hash_time / 2
+    assert small_pool.snapshot()["submitted"] == 6
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from src.api.async_routes import router as async_reservation_router
+from src.api.metrics import InstrumentationMiddleware, profiled
+from src.api.routes import router as reservation_router
+from src.core.security import get_current_user
+from src.infrastructure.database import Base, get_async_db, get_db, to_async_url
+from src.infrastructure.instrumentation import Histogram, RequestMetrics, instrument_engine, request_metrics
+from tests.test_api import get_valid_payload
+
+def server_timing(response) -> dict:
+    timings = {}
+    for part in response.headers["server-timing"].split(", "):
+        name, _, value = part.partition(";")
+        timings[name] = value
+    return timings
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(("/a",), value)
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 4.05',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+def test_requests_are_timed_per_route(client):
+    request_metrics.reset()
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    response = client.get(f"/api/reservations/{res_id}")
+
+    timings = server_timing(response)
+    assert timings["sql"] == 'desc="1 queries"'
+    assert {"db", "serialize", "total"} <= set(timings)
+
+    labels = ("GET", "/api/reservations/{reservation_id}")
+    assert request_metrics.queries.series(labels) == {"count": 1, "sum": 1}
+    assert request_metrics.latency.series(labels)["count"] == 1
+    assert request_metrics.requests.value(("GET", "/api/reservations/{reservation_id}", "200")) == 1
+
+    # served from the read cache the second time: no SQL
+    assert server_timing(client.get(f"/api/reservations/{res_id}"))["sql"] == 'desc="0 queries"'
+
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/reservations/{reservation_id}"} 2' in text
+    assert 'http_requests_total{method="POST",route="/api/reservations",status="200"} 1' in text
+
+def test_unmatched_paths_share_one_label(client):
+    request_metrics.reset()
+    client.get("/nope/1")
+    client.get("/nope/2")
+    assert request_metrics.requests.value(("GET", "unmatched", "404")) == 2
+
+@pytest.fixture
+def async_instrumented_client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    async_engine = create_async_engine(to_async_url(url), poolclass=NullPool)
+    instrument_engine(async_engine.sync_engine)
+    AsyncTestingSession = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    async def create_schema():
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    app = FastAPI()
+    app.include_router(async_reservation_router, prefix="/api")
+    app.add_middleware(InstrumentationMiddleware, metrics=RequestMetrics())
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_user] = lambda: "admin_test"
+    with TestClient(app) as c:
+        c.portal.call(create_schema)
+        yield c
+
+def test_async_queries_are_counted(async_instrumented_client):
+    response = async_instrumented_client.get("/api/reservations")
+    assert response.status_code == 200
+    assert server_timing(response)["sql"] == 'desc="1 queries"'
+
+def test_profile_header_writes_report(db_session, tmp_path):
+    def override_get_db():
+        yield db_session
+
+    app = FastAPI()
+    app.include_router(reservation_router, prefix="/api")
+    app.add_middleware(InstrumentationMiddleware, metrics=RequestMetrics(), profiling=True, profile_dir=str(tmp_path))
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: "admin_test"
+    client = TestClient(app)
+
+    assert "x-profile-report" not in client.get("/api/reservations").headers
+    report = client.get("/api/reservations", headers={"X-Profile": "1"}).headers["x-profile-report"]
+    assert os.path.exists(report) and os.path.exists(report[:-len(".txt")] + ".prof")
+    # the sync endpoint ran in a worker thread and is still in the profile
+    with open(report) as f:
+        assert "list_reservations" in f.read()
+
+def test_profiled_endpoint_keeps_its_signature():
+    def endpoint(reservation_id: int, fields: str = None):
+        return reservation_id
+
+    wrapped = profiled(endpoint)
+    assert profiled(wrapped) is wrapped
+    assert wrapped(3) == 3
+    assert wrapped.__wrapped__ is endpoint
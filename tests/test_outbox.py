@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+from sqlalchemy import select
+
+from src.infrastructure.orm_models import OutboxEventORM
+from src.infrastructure.outbox import (
+    FileSink, OutboxDispatcher, QueueSink, SubscriberSink, build_sinks, outbox_counts
+)
+from tests.conftest import TestingSessionLocal
+from tests.fakes import FakeClock
+from tests.test_api import get_valid_payload
+
+class FlakySink:
+    def __init__(self, failures):
+        self.failures = failures
+        self.batches = []
+
+    async def deliver(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("broker unavailable")
+        self.batches.append([m.id for m in messages])
+
+def outbox(db):
+    db.expire_all()
+    return db.scalars(select(OutboxEventORM).order_by(OutboxEventORM.id)).all()
+
+def dispatcher(*sinks, **kwargs):
+    # rows are stamped with the real time when written
+    kwargs.setdefault("clock", FakeClock(datetime.utcnow() + timedelta(seconds=1)))
+    return OutboxDispatcher(TestingSessionLocal, sinks, **kwargs)
+
+# --- WRITES ---
+
+def test_state_changes_write_events_in_the_same_transaction(client, db_session):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    client.post(f"/api/reservations/{res_id}/confirm")
+    client.post(f"/api/reservations/{res_id}/check-in")
+    client.post(f"/api/reservations/{res_id}/complete")
+
+    rows = outbox(db_session)
+    assert [r.event_type for r in rows] == ["ReservationCreated", "ReservationConfirmed"]
+    assert {str(r.aggregate_id) for r in rows} == {res_id}
+    assert rows[1].payload["confirmed_by"] == "admin_test"
+
+def test_rejected_transitions_write_no_event(client, db_session):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    client.post(f"/api/reservations/{res_id}/cancel", json={"reason_code": "CUSTOMER", "description": "-"})
+    assert client.post(f"/api/reservations/{res_id}/confirm").status_code == 400
+
+    rows = outbox(db_session)
+    assert [r.event_type for r in rows] == ["ReservationCreated", "ReservationCancelled"]
+    assert rows[1].payload["reason"] == "CUSTOMER"
+
+def test_batch_endpoints_write_events(client, db_session):
+    created = client.post("/api/reservations:batch", json={"items": [get_valid_payload(), get_valid_payload()]}).json()
+    ids = [r["reservation_id"] for r in created["results"]]
+    client.post("/api/reservations/transitions:batch", json={"items": [
+        {"reservation_id": ids[0], "action": "confirm"},
+        {"reservation_id": ids[1], "action": "cancel", "reason_code": "DUPLICATE"},
+        {"reservation_id": ids[1], "action": "confirm"},
+    ]})
+
+    types = [r.event_type for r in outbox(db_session)]
+    assert types == ["ReservationCreated"] * 2 + ["ReservationConfirmed", "ReservationCancelled"]
+
+# --- DISPATCH ---
+
+def test_dispatcher_delivers_in_order_and_marks_rows(client, db_session):
+    for _ in range(5):
+        client.post("/api/reservations", json=get_valid_payload())
+    bus, seen = SubscriberSink(), []
+
+    async def on_created(message):
+        seen.append(message.id)
+
+    bus.subscribe("ReservationCreated", on_created)
+    bus.subscribe("*", lambda message: seen.append("any"))
+    d = dispatcher(bus, batch_size=3)
+
+    assert asyncio.run(d.run_once()) == 3
+    assert asyncio.run(d.run_once()) == 2
+    assert asyncio.run(d.run_once()) == 0
+    ids = [r.id for r in outbox(db_session)]
+    assert [s for s in seen if s != "any"] == ids
+    assert all(r.dispatched_at is not None for r in outbox(db_session))
+    assert d.snapshot()["delivered"] == 5
+
+def test_failed_batches_back_off_and_are_redelivered(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    sink = FlakySink(failures=2)
+    d = dispatcher(sink, base_delay=10)
+    clock = d._clock
+
+    assert asyncio.run(d.run_once()) == 0
+    [row] = outbox(db_session)
+    assert row.attempts == 1
+    assert row.available_at == clock.now + timedelta(seconds=10)
+    assert "broker unavailable" in row.last_error
+
+    # not due yet
+    assert asyncio.run(d.run_once()) == 0
+    assert outbox(db_session)[0].attempts == 1
+
+    clock.now += timedelta(seconds=10)
+    assert asyncio.run(d.run_once()) == 0
+    assert outbox(db_session)[0].available_at == clock.now + timedelta(seconds=20)
+
+    clock.now += timedelta(seconds=20)
+    assert asyncio.run(d.run_once()) == 1
+    assert sink.batches == [[row.id]]
+
+def test_dead_letters_stop_being_claimed(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    d = dispatcher(FlakySink(failures=99), base_delay=0, max_attempts=2)
+
+    for _ in range(3):
+        asyncio.run(d.run_once())
+
+    assert outbox(db_session)[0].attempts == 2
+    assert d.dead_lettered == 1
+    assert outbox_counts(db_session, max_attempts=2) == {"pending": 0, "dead": 1}
+
+def test_file_and_queue_sinks(client, tmp_path):
+    client.post("/api/reservations", json=get_valid_payload())
+    path = tmp_path / "events.ndjson"
+
+    async def scenario():
+        queue_sink = QueueSink()
+        assert await dispatcher(FileSink(str(path)), queue_sink).run_once() == 1
+        return queue_sink.queue.get_nowait()
+
+    message = asyncio.run(scenario())
+    [line] = path.read_bytes().splitlines()
+    assert orjson.loads(line)["event_type"] == message.event_type == "ReservationCreated"
+
+def test_sinks_are_chosen_by_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("OUTBOX_FILE", str(tmp_path / "events.ndjson"))
+    monkeypatch.setenv("OUTBOX_QUEUE", "true")
+    monkeypatch.setenv("OUTBOX_QUEUE_SIZE", "5")
+    bus, file_sink, queue_sink = build_sinks()
+    assert isinstance(file_sink, FileSink) and isinstance(queue_sink, QueueSink)
+    assert queue_sink.queue.maxsize == 5
+
+def test_events_stay_pending_without_a_consumer(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    bus = SubscriberSink()
+    d = dispatcher(bus)
+    assert asyncio.run(d.run_once()) == 0
+    assert outbox(db_session)[0].dispatched_at is None
+    assert d.snapshot()["sinks"] == []
+
+    bus.subscribe("*", lambda message: None)
+    assert asyncio.run(d.run_once()) == 1
+    assert outbox(db_session)[0].dispatched_at is not None
+
+def test_dispatcher_runs_in_the_background(client):
+    client.post("/api/reservations", json=get_valid_payload())
+    delivered = []
+    bus = SubscriberSink()
+    bus.subscribe("*", delivered.append)
+
+    async def scenario():
+        d = dispatcher(bus, poll_interval=0.01, clock=datetime.utcnow)
+        d.start()
+        for _ in range(200):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+        await d.stop()
+        return d
+
+    d = asyncio.run(scenario())
+    assert len(delivered) == 1
+    assert d.snapshot()["running"] is False
+
+def test_admin_outbox_metrics(client):
+    client.post("/api/reservations", json=get_valid_payload())
+    metrics = client.get("/api/admin/outbox").json()
+    assert metrics["pending"] == 1
+    assert metrics["dead"] == 0
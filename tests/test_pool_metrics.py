@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy import exc as sa_exc
+
+from src.infrastructure.database import pool_options
+from src.infrastructure.pool_metrics import PoolMetrics, timed_pool_class
+
+@pytest.fixture
+def small_pool(tmp_path):
+    metrics = PoolMetrics()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_pool_class(metrics),
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    metrics.attach(engine)
+    yield engine, metrics
+    engine.dispose()
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = pool_options("postgresql://u:p@db/x", PoolMetrics())
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+    assert pool_options("sqlite:///./x.db", PoolMetrics()) == {}
+
+def test_checkout_events_and_wait_time(small_pool):
+    engine, metrics = small_pool
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        snapshot = metrics.snapshot(engine.pool)
+        assert snapshot["checked_out"] == 1
+        assert snapshot["pool"]["checked_out"] == 1
+        assert snapshot["pool"]["overflow"] == 0
+
+    snapshot = metrics.snapshot(engine.pool)
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checkins"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["wait_ms"]["count"] == 1
+
+def test_pool_exhaustion_counts_timeout(small_pool):
+    engine, metrics = small_pool
+    with engine.connect():
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["peak_checked_out"] == 1
+    assert snapshot["wait_ms"]["max"] >= 50
+
+def test_admin_pool_endpoint(client):
+    response = client.get("/api/admin/pool")
+    assert response.status_code == 200
+    assert "checkouts" in response.json()["sync"]
+
+@pytest.mark.parametrize("path, field", [
+    ("/api/admin/tokens", "hits"),
+    ("/api/admin/password-pool", "workers"),
+    ("/api/admin/idempotency", "executed"),
+    ("/api/admin/coalescing", "in_flight"),
+])
+def test_admin_snapshot_endpoints(client, path, field):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert field in response.json()
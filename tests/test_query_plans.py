@@ -0,0 +1,83 @@
+import os
+import pytest
+from sqlalchemy import select, func, text, tuple_
+
+from benchmarks.common import reservation_rows, insert_rows
+from src.infrastructure.orm_models import ReservationORM
+from tests.conftest import engine
+
+# EXPLAIN_SEED_ROWS=1000000 reproduces the full-size check; the default keeps CI fast
+# while still large enough for the Postgres planner to prefer the indexes.
+SEED_ROWS = int(os.getenv("EXPLAIN_SEED_ROWS", "50000"))
+
+@pytest.fixture(scope="module")
+def connection(schema):
+    # the rows live in one transaction for the module and are rolled back afterwards
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        yield conn
+        transaction.rollback()
+
+@pytest.fixture(scope="module")
+def seeded(connection):
+    rows = list(reservation_rows(SEED_ROWS))
+    insert_rows(connection, rows)
+    connection.execute(text("ANALYZE"))
+    return rows
+
+def explain(connection, stmt) -> str:
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    plan = connection.exec_driver_sql(prefix + sql).all()
+    return "\n".join(str(line[-1]) for line in plan)
+
+def test_list_by_status_uses_status_start_time_index(seeded, connection):
+    stmt = (
+        select(ReservationORM)
+        .where(ReservationORM.status == "CONFIRMED")
+        .order_by(ReservationORM.start_time)
+        .limit(10)
+    )
+    plan = explain(connection, stmt)
+    # Postgres may walk the active-bookings partial index in start_time order
+    # and filter on status; either way it's an index scan, not sort + seq scan
+    assert "ix_reservations_status_start_time" in plan or "ix_reservations_active_start_time" in plan
+
+def test_stats_group_by_uses_status_index(seeded, connection):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("Postgres may legitimately prefer a seq scan when aggregating every row")
+    stmt = select(ReservationORM.status, func.count()).group_by(ReservationORM.status)
+    assert "ix_reservations_status_start_time" in explain(connection, stmt)
+
+def test_customer_lookup_uses_customer_index(seeded, connection):
+    stmt = select(ReservationORM).where(ReservationORM.customer_id == seeded[0]["customer_id"])
+    assert "ix_reservations_customer_id" in explain(connection, stmt)
+
+def test_table_lookup_uses_partial_table_index(seeded, connection):
+    row = next(r for r in seeded if r["table_id"] is not None)
+    stmt = select(ReservationORM).where(
+        ReservationORM.table_id == row["table_id"],
+        ReservationORM.start_time >= row["start_time"],
+    ).order_by(ReservationORM.start_time)
+    assert "ix_reservations_table_id_start_time" in explain(connection, stmt)
+
+def test_upcoming_active_uses_partial_index(seeded, connection):
+    stmt = (
+        select(ReservationORM.reservation_id)
+        .where(
+            ReservationORM.status.in_(["PENDING", "CONFIRMED", "CHECKED_IN"]),
+            ReservationORM.start_time >= seeded[-100]["start_time"],
+        )
+    )
+    plan = explain(connection, stmt)
+    assert "ix_reservations_active_start_time" in plan or "ix_reservations_status_start_time" in plan
+
+def test_keyset_page_seeks_on_start_time_index(seeded, connection):
+    last = seeded[SEED_ROWS // 2]
+    stmt = (
+        select(ReservationORM)
+        .where(tuple_(ReservationORM.start_time, ReservationORM.reservation_id) > tuple_(last["start_time"], last["reservation_id"]))
+        .order_by(ReservationORM.start_time, ReservationORM.reservation_id)
+        .limit(11)
+    )
+    assert "ix_reservations_start_time_id" in explain(connection, stmt)
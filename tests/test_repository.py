@@ -0,0 +1,129 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from src.domain.events import ReservationConfirmed
+from src.domain.models import Reservation
+from src.domain.transitions import TRANSITIONS, InvalidTransition
+from src.domain.value_objects import CancellationReason, ContactInfo, ReservationPolicy, ReservationTime
+from src.infrastructure.orm_models import OutboxEventORM, ReservationORM, ReservationTableORM
+from src.infrastructure.repository import ConcurrentUpdate, ReservationRepository
+from src.infrastructure.state_machine import ReservationNotFound
+
+def new_reservation(party_size=2):
+    return Reservation(
+        customer_id=uuid.uuid4(),
+        contact_info=ContactInfo(name="Budi", phone="0812345", email="budi@test.com"),
+        reservation_time=ReservationTime(start_time=datetime(2025, 12, 31, 19)),
+        policy=ReservationPolicy(),
+        party_size=party_size,
+    )
+
+REASON = CancellationReason(reason_code="REQ", description="-")
+
+def stored(db, count=1):
+    repo = ReservationRepository(db)
+    reservations = [new_reservation() for _ in range(count)]
+    for reservation in reservations:
+        repo.add(reservation)
+    repo.commit()
+    return [r.reservation_id for r in reservations]
+
+def test_add_writes_row_and_created_event(db_session):
+    repo = ReservationRepository(db_session)
+    reservation = new_reservation(party_size=5)
+    repo.add(reservation)
+    repo.commit()
+
+    row = repo.saved[reservation.reservation_id]
+    assert (row.status, row.party_size, row.contact_name) == ("PENDING", 5, "Budi")
+    events = db_session.scalars(select(OutboxEventORM.event_type)).all()
+    assert events == ["ReservationCreated"]
+
+def test_identity_map_loads_once(db_session, statements):
+    first, second = stored(db_session, 2)
+    repo = ReservationRepository(db_session)
+    statements.clear()
+
+    reservation = repo.get(first)
+    assert repo.get(first) is reservation
+    assert repo.get_many([first, second])[first] is reservation
+    assert repo.get(second) is repo.get_many([second])[second]
+    assert len(statements) == 2
+
+def test_hydrated_reservation_carries_stored_state(db_session):
+    (rid,) = stored(db_session)
+    reservation = ReservationRepository(db_session).get(rid)
+    assert reservation.reservation_id == rid
+    assert reservation.status == "PENDING"
+    assert reservation.contact_info.email == "budi@test.com"
+    assert reservation.reservation_time.end_time == datetime(2025, 12, 31, 20, 30)
+    # rebuilding from storage records no new history or events
+    assert not reservation.history and not reservation.collect_domain_events()
+
+def test_missing_and_invalid(db_session):
+    repo = ReservationRepository(db_session)
+    with pytest.raises(ReservationNotFound):
+        repo.get(uuid.uuid4())
+    (rid,) = stored(db_session)
+    with pytest.raises(InvalidTransition):
+        repo.get(rid).complete()
+
+def test_commit_flushes_only_changed_aggregates(db_session, statements):
+    first, second, third = stored(db_session, 3)
+    repo = ReservationRepository(db_session)
+    repo.get_many([first, second, third])
+    repo.get(first).confirm_reservation(confirmed_by="staff")
+    repo.get(second).assign_table(uuid.uuid4(), 4, "Indoor", joined_table_ids=(uuid.uuid4(),))
+    statements.clear()
+    repo.commit()
+
+    updates = [s for s in statements if s.startswith("UPDATE reservations")]
+    assert len(updates) == 2
+    assert set(repo.saved) == {first, second}
+    assert repo.reseated == {second: repo.get(second).table_assignment.joined_table_ids}
+    assert db_session.scalar(select(ReservationTableORM.reservation_id)) == second
+    # nothing changed since the last commit
+    statements.clear()
+    repo.commit()
+    assert not [s for s in statements if s.startswith("UPDATE")]
+
+def test_stale_aggregate_raises_concurrent_update(db_session, committed_sessions):
+    (rid,) = stored(db_session)
+    repo = ReservationRepository(db_session)
+    repo.get(rid).confirm_reservation()
+
+    with committed_sessions() as other:
+        rival = ReservationRepository(other)
+        rival.get(rid).cancel_reservation(REASON)
+        rival.commit()
+
+    with pytest.raises(ConcurrentUpdate):
+        repo.commit()
+    db_session.rollback()
+    assert db_session.get(ReservationORM, rid).status == "CANCELLED"
+
+def test_transition_is_one_guarded_update(db_session, statements):
+    (rid,) = stored(db_session)
+    repo = ReservationRepository(db_session)
+    statements.clear()
+
+    reservation = repo.transition(rid, TRANSITIONS["confirm"], [ReservationConfirmed(reservation_id=rid, confirmed_by="staff")])
+    assert [s.split()[0] for s in statements] == ["UPDATE"]
+    assert reservation.status == "CONFIRMED" and repo.get(rid) is reservation
+    repo.commit()
+    assert repo.saved[rid].status == "CONFIRMED"
+    assert db_session.scalars(select(OutboxEventORM.event_type)).all() == ["ReservationCreated", "ReservationConfirmed"]
+
+def test_transition_endpoint_loads_nothing_first(client, db_session, statements):
+    (rid,) = stored(db_session)
+    statements.clear()
+    assert client.post(f"/api/reservations/{rid}/confirm").status_code == 200
+    touching = [s.split()[0] for s in statements if "reservations" in s.split("WHERE")[0]]
+    assert touching == ["UPDATE"]
+    # the loser of a race sees the winner's status in the guard
+    client.post(f"/api/reservations/{rid}/cancel", json={"reason_code": "REQ", "description": "-"})
+    response = client.post(f"/api/reservations/{rid}/confirm")
+    assert (response.status_code, response.json()["detail"]) == (400, "Cannot confirm cancelled reservation.")
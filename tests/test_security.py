@@ -1,7 +1,11 @@
 from datetime import timedelta
 import pytest
 from fastapi import HTTPException
-from src.core.security import verify_password, get_password_hash, create_access_token, get_current_user
+from src.core.security import (
+    verify_password, get_password_hash, create_access_token, get_current_user, SECRET_KEY, ALGORITHM
+)
+from src.core.tokens import TokenVerifier, Principal, InvalidToken, JoseBackend, build_backend
+from tests.fakes import FakeClock
 
 def test_password_hashing():
     password = "secret"
@@ -22,4 +26,88 @@ def test_jwt_creation_custom_expire():
 async def test_get_current_user_invalid_token():
     with pytest.raises(HTTPException) as excinfo:
         await get_current_user("invalid.token.here")
-    assert excinfo.value.status_code == 401
\ No newline at end of file
+    assert excinfo.value.status_code == 401
+
+# --- DECODED-TOKEN CACHE ---
+
+class CountingBackend:
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = 0
+
+    def decode(self, token):
+        self.calls += 1
+        if token.startswith("bad"):
+            raise InvalidToken("bad signature")
+        user, exp = token.split(":")
+        if float(exp) <= self.clock():
+            raise InvalidToken("expired")
+        return {"sub": user, "exp": float(exp), "roles": ["staff"]}
+
+@pytest.fixture
+def verifier():
+    clock = FakeClock(1000.0)
+    return TokenVerifier(CountingBackend(clock), maxsize=2, clock=clock), clock
+
+def test_verifier_caches_until_expiry(verifier):
+    verifier, clock = verifier
+    principal = verifier.verify("alice:1060")
+    assert (principal.username, principal.roles, principal.expires_at) == ("alice", ("staff",), 1060)
+    assert verifier.verify("alice:1060").username == "alice"
+    assert verifier.backend.calls == 1
+
+    clock.now = 1060
+    with pytest.raises(InvalidToken):
+        verifier.verify("alice:1060")
+    assert len(verifier) == 0
+
+def test_verifier_is_bounded_and_skips_invalid_tokens(verifier):
+    verifier, _ = verifier
+    for user in ("a", "b", "c"):
+        verifier.verify(f"{user}:2000")
+    assert len(verifier) == 2
+
+    for _ in range(2):
+        with pytest.raises(InvalidToken):
+            verifier.verify("bad:2000")
+    assert verifier.backend.calls == 5
+    assert verifier.snapshot()["misses"] == 5
+
+def test_verifier_resolves_user_once():
+    clock = FakeClock(1000.0)
+    resolved = []
+
+    def resolver(payload):
+        resolved.append(payload["sub"])
+        return Principal(payload["sub"], ("admin",))
+
+    verifier = TokenVerifier(CountingBackend(clock), resolver=resolver, resolve_ttl=30, clock=clock)
+    assert verifier.verify("alice:2000").roles == ("admin",)
+    verifier.verify("alice:2000")
+    clock.now += 30
+    verifier.verify("alice:2000")
+    assert resolved == ["alice", "alice"]
+
+@pytest.mark.asyncio
+async def test_get_current_user_valid_token():
+    token = create_access_token(data={"sub": "testuser"})
+    assert await get_current_user(token) == "testuser"
+    assert await get_current_user(token) == "testuser"
+
+def test_build_backend_rejects_unknown():
+    with pytest.raises(ValueError):
+        build_backend("secret", ["HS256"], kind="nope")
+
+def test_cached_token_is_not_decoded_again():
+    # timings: python -m benchmarks.bench_auth
+    token = create_access_token(data={"sub": "bench"}, expires_delta=timedelta(minutes=5))
+    backend = JoseBackend(SECRET_KEY, [ALGORITHM])
+    decodes = []
+    decode = backend.decode
+    backend.decode = lambda t: decodes.append(t) or decode(t)
+    verifier = TokenVerifier(backend)
+
+    for _ in range(100):
+        assert verifier.verify(token).username == "bench"
+    assert len(decodes) == 1
+    assert verifier.snapshot()["hits"] == 99
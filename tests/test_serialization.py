@@ -0,0 +1,111 @@
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.api.serialization import (
+    FIELDS, dumps, parse_fields, reservation_dict, reservation_dicts, response_meta, sparse_dict
+)
+from src.schemas.reservation import ReservationResponse, ReservationPage
+from tests.test_api import get_valid_payload
+
+def row(**overrides):
+    values = dict(
+        reservation_id=uuid.uuid4(), customer_id=uuid.uuid4(), status="CONFIRMED", table_area="Patio",
+        contact_name="Budi", contact_phone="0812345", contact_email="budi@test.com",
+        start_time=datetime(2025, 12, 31, 19, 30, 15, 123456), duration_minutes=90, party_size=None,
+        payment_status=None, payment_amount=150000,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+def test_fast_path_matches_the_pydantic_model():
+    for r in (row(), row(start_time=datetime(2025, 1, 1, 12, 0), party_size=6, payment_amount=None, table_area=None)):
+        fast = orjson.loads(orjson.dumps(reservation_dict(r, response_meta())))
+        validated = json.loads(ReservationResponse.model_validate(reservation_dict(r, response_meta())).model_dump_json())
+        for payload in (fast, validated):
+            payload["meta"].pop("response_generated_at")
+        assert fast == validated
+
+def test_list_items_share_one_meta():
+    items = reservation_dicts([row(), row(), row()])
+    assert items[0]["meta"] is items[1]["meta"] is items[2]["meta"]
+
+def test_driver_uuid_subclasses_are_rendered():
+    # asyncpg returns its own uuid.UUID subclass, which orjson rejects by default
+    class DriverUUID(uuid.UUID):
+        pass
+
+    rid = uuid.uuid4()
+    payload = orjson.loads(dumps(reservation_dict(row(reservation_id=DriverUUID(str(rid))), None)))
+    assert payload["reservation_id"] == str(rid)
+
+def test_api_responses_validate_against_the_schema(client):
+    created = client.post("/api/reservations", json=get_valid_payload())
+    assert created.headers["content-type"] == "application/json"
+    res_id = created.json()["reservation_id"]
+    ReservationResponse.model_validate(created.json())
+    ReservationResponse.model_validate(client.get(f"/api/reservations/{res_id}").json())
+
+    client.post("/api/reservations", json=get_valid_payload())
+    listed = client.get("/api/reservations").json()
+    assert len(listed) == 2
+    assert listed[0]["meta"] == listed[1]["meta"]
+    ReservationPage.model_validate(client.get("/api/reservations?paginate=cursor&limit=1").json())
+
+# --- SPARSE FIELDSETS ---
+
+def selected_columns(statement):
+    projection = statement.split("FROM", 1)[0].replace("SELECT", "", 1)
+    return {column.strip().split(".")[-1].split(" ")[0] for column in projection.split(",")}
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("status, booking_info.start_time") == ("reservation_id", "status", "booking_info.start_time")
+    assert "payment_info.currency" in parse_fields("payment_info")
+    with pytest.raises(ValueError, match="bogus"):
+        parse_fields("status,bogus")
+
+def test_full_fieldset_matches_the_fast_path():
+    r, meta = row(), response_meta()
+    assert sparse_dict(r, parse_fields(",".join([*FIELDS, "meta"])), meta) == reservation_dict(r, meta)
+
+def test_list_projects_only_requested_columns(client, statements):
+    client.post("/api/reservations", json=get_valid_payload())
+    statements.clear()
+
+    body = client.get("/api/reservations?fields=status,booking_info.start_time,table_area").json()
+
+    assert body == [{
+        "reservation_id": body[0]["reservation_id"], "status": "PENDING",
+        "booking_info": {"start_time": "2025-12-31T19:00:00"}, "table_area": None,
+    }]
+    [select] = [s for s in statements if "FROM reservations" in s]
+    assert selected_columns(select) == {"reservation_id", "status", "start_time", "table_area"}
+
+def test_get_projects_only_requested_columns(client, statements):
+    res_id = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    statements.clear()
+
+    body = client.get(f"/api/reservations/{res_id}?fields=payment_info,meta").json()
+
+    assert body["payment_info"] == {"status": "UNPAID", "amount": 0.0, "currency": "IDR"}
+    assert set(body) == {"reservation_id", "payment_info", "meta"}
+    [select] = [s for s in statements if "FROM reservations" in s]
+    assert selected_columns(select) == {"reservation_id", "payment_status", "payment_amount"}
+
+def test_cursor_pages_with_fields(client):
+    for _ in range(3):
+        client.post("/api/reservations", json=get_valid_payload())
+    page = client.get("/api/reservations?paginate=cursor&limit=2&fields=status").json()
+    assert [set(item) for item in page["items"]] == [{"reservation_id", "status"}] * 2
+    rest = client.get(f"/api/reservations?paginate=cursor&limit=2&fields=status&cursor={page['next_cursor']}").json()
+    assert len(rest["items"]) == 1
+
+def test_unknown_field_is_rejected(client):
+    response = client.get("/api/reservations?fields=status,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
@@ -0,0 +1,84 @@
+import threading
+import uuid
+import pytest
+from datetime import datetime
+
+from src.domain.transitions import TRANSITIONS, InvalidTransition
+from src.infrastructure.orm_models import ReservationORM
+from src.infrastructure.state_machine import apply_transition, ReservationNotFound
+
+THREADS = 24
+
+@pytest.fixture
+def race_sessions(committed_sessions):
+    # every thread needs its own connection, and to see the others' commits
+    return committed_sessions
+
+def make_reservation(Session, status):
+    rid = uuid.uuid4()
+    with Session() as db:
+        db.add(ReservationORM(
+            reservation_id=rid, customer_id=uuid.uuid4(), status=status,
+            start_time=datetime(2025, 12, 31, 19), duration_minutes=90,
+            contact_name="Budi", contact_phone="0812345", contact_email="budi@test.com"
+        ))
+        db.commit()
+    return rid
+
+def hammer(Session, rid, actions):
+    barrier = threading.Barrier(len(actions))
+    outcomes = []
+
+    def worker(action):
+        with Session() as db:
+            barrier.wait()
+            try:
+                apply_transition(db, rid, TRANSITIONS[action])
+                db.commit()
+                outcomes.append((action, True))
+            except InvalidTransition:
+                db.rollback()
+                outcomes.append((action, False))
+
+    threads = [threading.Thread(target=worker, args=(a,)) for a in actions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with Session() as db:
+        final = db.get(ReservationORM, rid).status
+    return outcomes, final
+
+def test_transition_returns_updated_row(race_sessions):
+    rid = make_reservation(race_sessions, "PENDING")
+    with race_sessions() as db:
+        row = apply_transition(db, rid, TRANSITIONS["confirm"])
+        assert row.status == "CONFIRMED"
+        assert row.reservation_id == rid
+
+def test_not_found_vs_invalid(race_sessions):
+    rid = make_reservation(race_sessions, "PENDING")
+    with race_sessions() as db:
+        with pytest.raises(ReservationNotFound):
+            apply_transition(db, uuid.uuid4(), TRANSITIONS["confirm"])
+        with pytest.raises(InvalidTransition):
+            apply_transition(db, rid, TRANSITIONS["complete"])
+
+def test_concurrent_check_in_succeeds_once(race_sessions):
+    rid = make_reservation(race_sessions, "CONFIRMED")
+    outcomes, final = hammer(race_sessions, rid, ["check_in"] * THREADS)
+
+    assert sum(ok for _, ok in outcomes) == 1
+    assert final == "CHECKED_IN"
+
+def test_concurrent_cancel_and_complete_never_both_win(race_sessions):
+    rid = make_reservation(race_sessions, "CHECKED_IN")
+    outcomes, final = hammer(race_sessions, rid, ["cancel", "complete"] * (THREADS // 2))
+
+    completes = sum(ok for action, ok in outcomes if action == "complete")
+    cancels = sum(ok for action, ok in outcomes if action == "cancel")
+    if final == "COMPLETED":
+        assert (completes, cancels) == (1, 0)
+    else:
+        assert final == "CANCELLED"
+        assert completes == 0 and cancels >= 1
@@ -0,0 +1,93 @@
+import uuid
+
+from sqlalchemy import delete, event, update
+
+from src.infrastructure import stats
+from src.infrastructure.orm_models import ReservationORM, ReservationStatsORM
+from src.infrastructure.cache import read_cache
+from tests.conftest import engine
+from tests.test_api import get_valid_payload
+
+DAY = "2025-12-31"
+
+def daily(client, **params):
+    return client.get("/api/stats/daily", params={"start": DAY, "end": DAY, **params}).json()
+
+def test_stats_follow_every_write_path(client):
+    first = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    second = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    client.post("/api/reservations:batch", json={"items": [get_valid_payload(), get_valid_payload()]})
+
+    client.post(f"/api/reservations/{first}/confirm")
+    client.post("/api/reservations/transitions:batch", json={"items": [{"reservation_id": second, "action": "cancel"}]})
+
+    result = client.get("/api/stats").json()
+    assert result["total_reservations"] == 4
+    assert result["pending_count"] == 2
+    assert result["confirmed_count"] == 1
+    assert result["cancelled_count"] == 1
+
+def test_daily_breakdown_by_area(client):
+    seated = client.post("/api/reservations", json=get_valid_payload()).json()["reservation_id"]
+    client.post("/api/reservations", json=get_valid_payload())
+    client.post(f"/api/reservations/{seated}/assign-table", json={"table_id": str(uuid.uuid4()), "capacity": 4, "area": "Outdoor"})
+
+    rows = {row["area"]: row for row in daily(client)}
+    assert rows["Outdoor"]["pending_count"] == 1
+    assert rows[None]["pending_count"] == 1
+    assert all(row["day"] == DAY for row in rows.values())
+
+    only_outdoor = daily(client, area="Outdoor")
+    assert [row["area"] for row in only_outdoor] == ["Outdoor"]
+    assert client.get("/api/stats/daily", params={"start": DAY, "end": "2025-12-30"}).status_code == 400
+
+def test_stats_read_does_not_scan_reservations(client):
+    client.post("/api/reservations", json=get_valid_payload())
+    read_cache.clear()
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert client.get("/api/stats").json()["total_reservations"] == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements
+    assert all("FROM reservations" not in sql for sql in statements)
+
+def test_reconcile_repairs_drift(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    client.post("/api/reservations", json=get_valid_payload())
+    assert client.get("/api/stats").json()["pending_count"] == 2
+
+    db_session.execute(update(ReservationStatsORM).values(reservation_count=99))
+    db_session.commit()
+    assert [(d["day"], d["status"]) for d in stats.drift(db_session)] == [("*", "PENDING")]
+
+    report = client.post("/api/admin/stats/reconcile").json()
+    assert report["rebuilt"] is True
+    assert client.get("/api/stats").json()["pending_count"] == 2
+
+def test_raw_sql_writes_keep_stats_in_step(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    client.post("/api/reservations", json=get_valid_payload())
+    db_session.execute(delete(ReservationORM).where(ReservationORM.status == "PENDING"))
+    db_session.commit()
+
+    assert stats.drift(db_session) == []
+    assert client.post("/api/admin/stats/reconcile").json()["rebuilt"] is False
+    assert client.get("/api/stats").json()["total_reservations"] == 0
+
+def test_reconcile_rebuilds_missing_rows(client, db_session):
+    client.post("/api/reservations", json=get_valid_payload())
+    db_session.execute(delete(ReservationStatsORM))
+    db_session.execute(delete(stats.ReservationDailyStatsORM))
+    db_session.commit()
+
+    report = client.post("/api/admin/stats/reconcile").json()
+    assert report["rebuilt"] is True
+    assert report["drifted_keys"] == 2  # the day row and the per-status total
+    assert client.get("/api/stats").json()["pending_count"] == 1
+    assert daily(client)[0]["pending_count"] == 1